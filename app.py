@@ -1,11 +1,8 @@
+import os
+
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import google.generativeai as genai
-import requests
-from datetime import datetime, timedelta
+from contextlib import nullcontext
+from datetime import datetime
 
 # --- 페이지 설정 ---
 st.set_page_config(
@@ -46,346 +43,157 @@ with st.sidebar:
     else:
         api_key = st.text_input("Google API Key", type="password", help="AI 기능을 사용하려면 Gemini API 키가 필요합니다.")
         st.caption("팁: .streamlit/secrets.toml 파일에 키를 저장하세요.")
+    stream_ai = st.toggle("AI 리포트 실시간 출력 (스트리밍)", value=True)
+    reuse_reports = st.toggle("같은 입력이면 저장된 AI 리포트 재사용", value=True)
+    local_thumbnails = st.toggle("기업 이미지 썸네일을 로컬에 저장해서 표시", value=False)
+    ignore_news_dates = st.checkbox("뉴스 날짜만 바뀐 경우도 같은 입력으로 취급", value=True,
+                                    disabled=not reuse_reports)
     
     st.markdown("---")
-    st.header("종목 검색")
-    ticker_symbol = st.text_input("티커 입력 (예: NVDA, AAPL)", value="NVDA").upper()
-    
-    if st.button("분석 시작"):
-        st.session_state['run_analysis'] = True
+    mode = st.radio("모드", ["단일 종목", "워치리스트"], horizontal=True)
+    
+    if mode == "단일 종목":
+        st.header("종목 검색")
+        ticker_symbol = st.text_input("티커 입력 (예: NVDA, AAPL)", value="NVDA").upper()
+        chart_interval = st.radio("차트 간격", ["일봉", "1m", "5m"], horizontal=True,
+                                  help="1m/5m: 당일 분봉을 받고 이후에는 새 봉과 시세만 주기적으로 갱신")
+        poll_seconds = st.number_input("분봉 갱신 주기 (초)", min_value=5, max_value=300, value=15, step=5,
+                                       disabled=chart_interval == "일봉")
+        
+        if st.button("분석 시작"):
+            st.session_state['run_analysis'] = True
     else:
-        if 'run_analysis' not in st.session_state:
-            st.session_state['run_analysis'] = False
-
-# --- 데이터 가져오기 통합 함수 ---
-from duckduckgo_search import DDGS
-from difflib import SequenceMatcher
+        st.header("워치리스트")
+        ticker_symbol = ""
+        watchlist_text = st.text_area("티커 목록 (쉼표/줄바꿈 구분, 최대 200개)",
+                                      value="NVDA, AAPL, MSFT, GOOGL, AMZN, META, TSLA, AMD")
+        include_news = st.checkbox("뉴스 포함 (종목 수가 많으면 느림)", value=False)
+        
+        if st.button("워치리스트 분석"):
+            st.session_state['run_watchlist'] = True
+    
+    if 'run_analysis' not in st.session_state:
+        st.session_state['run_analysis'] = False
+    if 'run_watchlist' not in st.session_state:
+        st.session_state['run_watchlist'] = False
 
-def similar(a, b):
-    return SequenceMatcher(None, a, b).ratio()
+# --- 가벼운 모듈만 먼저 (무거운 데이터/차트/AI 모듈은 분석을 시작할 때 import) ---
+from dashboard.ai_router import router_stats
+from dashboard.progressive import PageTimer, fill_as_completed, submit
+from dashboard.telemetry import PROCESS, Registry, bind_session, to_jsonl, to_prometheus
+from dashboard.warmup import is_loaded, warm_up
 
-# 한국어 번역 헬퍼 함수
-def translate_to_korean(text):
-    try:
-        from deep_translator import GoogleTranslator
-        return GoogleTranslator(source='auto', target='ko').translate(text)
-    except:
-        return text
-
-# 기업 대표 이미지 검색 함수 - 핵심 매출 제품 기반
-def get_company_images(ticker, company_name="", industry=""):
-    """DuckDuckGo 이미지 검색으로 기업 핵심 제품 이미지 4장 가져오기"""
-    images = []
-    
-    # 티커별 핵심 제품 키워드 매핑
-    product_keywords = {
-        'NVDA': 'data center GPU AI chip H100',
-        'AAPL': 'iPhone MacBook Apple products',
-        'MSFT': 'Azure cloud Microsoft Office',
-        'GOOGL': 'Google Search AI Cloud',
-        'GOOG': 'Google Search AI Cloud',
-        'AMZN': 'AWS cloud Amazon warehouse',
-        'META': 'Facebook Instagram VR Quest',
-        'TSLA': 'Tesla Model electric car',
-        'AMD': 'AMD EPYC Ryzen processor',
-        'INTC': 'Intel processor data center',
-    }
-    
-    try:
-        with DDGS() as ddgs:
-            # 티커에 맞는 키워드 사용, 없으면 기본값
-            keyword = product_keywords.get(ticker, f"{company_name} main product")
-            query = f"{keyword}"
-            
-            results = list(ddgs.images(query, max_results=4))
-            for r in results:
-                images.append({
-                    'url': r.get('image', ''),
-                    'title': r.get('title', ''),
-                    'source': r.get('source', '')
-                })
-    except Exception as e:
-        print(f"Image search error: {e}")
-    
-    return images
+# 첫 화면을 그리는 동안 무거운 모듈을 백그라운드에서 미리 불러 둠
+warm_up()
 
+# 이 세션에서 실행한 단계별 소요 시간 (백그라운드 워커 기록 포함)
+session_telemetry = st.session_state.setdefault('telemetry', Registry())
+bind_session(session_telemetry)
 
-def get_hybrid_news(ticker):
-    news_items = []
-    
-    # 1. DuckDuckGo Search (금융 미디어 타겟)
-    target_sites = [
-        ('CNBC', 'site:cnbc.com'),
-        ('Reuters', 'site:reuters.com'),
-        ('Investing.com', 'site:investing.com'),
-        ('Bloomberg', 'site:bloomberg.com')
-    ]
-    
-    try:
-        with DDGS() as ddgs:
-            for source_name, site_query in target_sites:
-                query = f"{ticker} stock news {site_query}"
-                results = list(ddgs.text(query, max_results=2))
-                for r in results:
-                    news_items.append({
-                        'title': r['title'],
-                        'link': r['href'],
-                        'publisher': source_name,
-                        'date': datetime.now().isoformat()
-                    })
-    except Exception as e:
-        print(f"DDGS Error: {e}")
-
-    # 2. Yahoo Finance News
+def load_company_images(ticker, info_future, thumbnails=False):
+    """기업 정보(회사 이름)가 도착하면 이어서 기업 이미지 조회 (백그라운드 작업용)"""
     try:
-        stock = yf.Ticker(ticker)
-        yf_news = stock.news[:5]
-        for item in yf_news:
-            news_items.append({
-                'title': item.get('title'),
-                'link': item.get('link'),
-                'publisher': 'Yahoo Finance',
-                'date': str(item.get('providerPublishTime', ''))
-            })
-    except Exception as e:
-        print(f"Yahoo News Error: {e}")
-
-    # 3. Google News RSS (가장 안정적인 소스)
-    try:
-        import xml.etree.ElementTree as ET
-        url = f"https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            root = ET.fromstring(resp.content)
-            for item in root.findall('.//item')[:5]:
-                title_raw = item.find('title').text if item.find('title') is not None else 'No Title'
-                parts = title_raw.rsplit(' - ', 1)
-                title = parts[0].strip()
-                publisher = parts[1].strip() if len(parts) > 1 else 'Google News'
-                
-                # Google News 리다이렉트 링크에서 실제 URL 추출
-                google_link = item.find('link').text if item.find('link') is not None else '#'
-                try:
-                    # 리다이렉트를 따라가서 실제 URL 가져오기
-                    redirect_resp = requests.head(google_link, allow_redirects=True, timeout=5)
-                    actual_link = redirect_resp.url
-                except:
-                    actual_link = google_link
-                
-                pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
-                date_str = pub_date[:16] if pub_date else datetime.now().strftime('%Y-%m-%d')
-                
-                news_items.append({
-                    'title': title,
-                    'link': actual_link,
-                    'publisher': publisher,
-                    'date': date_str
-                })
-    except Exception as e:
-        print(f"Google RSS Error: {e}")
-
-
-    # 4. 중복 제거 (제목 유사도 80% 이상)
-    unique_news = []
-    for item in news_items:
-        if not item.get('title'): continue
-        is_duplicate = False
-        for existing in unique_news:
-            if similar(item['title'].lower(), existing['title'].lower()) > 0.8:
-                is_duplicate = True
-                break
-        if not is_duplicate:
-            unique_news.append(item)
-    
-    # 5. 뉴스 제목 한국어 번역 + 대표 이미지 추출
-    for item in unique_news:
-        original_title = item.get('title', '')
-        item['title_en'] = original_title
-        item['title'] = translate_to_korean(original_title)
-        
-        # og:image 추출 시도
-        try:
-            from bs4 import BeautifulSoup
-            resp = requests.get(item.get('link', ''), timeout=5, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                og_image = soup.find('meta', property='og:image')
-                if og_image and og_image.get('content'):
-                    item['image_url'] = og_image['content']
-                else:
-                    item['image_url'] = ''
-            else:
-                item['image_url'] = ''
-        except:
-            item['image_url'] = ''
-            
-    return unique_news[:10]
+        info = info_future.result() or {}
+    except Exception:
+        info = {}
+    return get_company_images(ticker, info.get('longName', info.get('shortName', ticker)), thumbnails)
 
-@st.cache_data
-def get_dashboard_data(ticker):
-    """주가, 정보, 뉴스를 한 번에 가져와서 serializable한 형태로 반환"""
-    df = None
-    error_msg = None
-    
-    # 1. 주가 데이터
-    try:
-        df = yf.download(ticker, period="1y", progress=False)
+
+def render_metrics(info):
+    """사이드바 주요 지표"""
+    if info and info.get('currentPrice'):
+        current_price = info.get('currentPrice', info.get('regularMarketPrice', 'N/A'))
+        market_cap = info.get('marketCap', 'N/A')
+        per = info.get('trailingPE', 'N/A')
         
-        # yfinance가 MultiIndex 컬럼을 반환할 수 있으므로 평탄화
-        if df is not None and not df.empty:
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
+        def format_num(num):
+            if isinstance(num, (int, float)):
+                return f"{num:,.0f}"
+            return num
         
-        if df is None or df.empty:
-            try:
-                import pandas_datareader.data as web
-                start = datetime.now() - timedelta(days=365)
-                end = datetime.now()
-                try:
-                    df = web.DataReader(f"{ticker}.US", 'stooq', start, end).sort_index()
-                except:
-                    df = web.DataReader(ticker, 'stooq', start, end).sort_index()
-            except Exception as e:
-                error_msg = f"데이터 수신 실패: {str(e)}"
+        st.metric("현재 주가", f"${current_price}")
+        st.write(f"**시가총액**: {format_num(market_cap)}")
+        st.write(f"**PER**: {per}")
+    else:
+        st.caption("재무 정보를 불러올 수 없습니다.")
+
+
+def render_company_images(ticker, company_images):
+    """기업 대표 이미지 섹션"""
+    if company_images:
+        st.subheader(f"{ticker} 기업 이미지")
+        img_cols = st.columns(4)
+        for idx, img in enumerate(company_images[:4]):
+            with img_cols[idx]:
+                if img.get('url'):
+                    # 로컬 썸네일이 있으면 원격 원본 대신 사용
+                    thumb = img.get('thumb')
+                    source = thumb if thumb and os.path.exists(thumb) else img['url']
+                    st.image(source, caption=img.get('source', ''), use_container_width=True)
+                    st.caption(f"[이미지 링크]({img['url']})")
+
+
+def render_news(news_list):
+    """최신 뉴스 목록"""
+    if not news_list:
+        st.info("최신 뉴스를 찾을 수 없습니다.")
+        return
+    for idx, item in enumerate(news_list):
+        title = item.get('title', '제목 없음')
+        link = item.get('link', '#')
+        publisher = item.get('publisher', 'Unknown')
+        date = item.get('date', '')
+        image_url = item.get('image_url', '')
         
-        if df is not None and df.empty:
-            error_msg = "데이터가 비어있습니다"
-    except Exception as e:
-        error_msg = f"오류: {str(e)}"
-    
-    # 2. 상세 정보
-    info = {}
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-    except:
-        info = {}
-    
-    # 3. 뉴스 (Hybrid 방식)
-    news = get_hybrid_news(ticker)
+        st.markdown(f"**{idx+1}. [{title}]({link})**")
+        if image_url:
+            st.caption(f"출처: {publisher} | 날짜: {date}")
+            st.caption(f"이미지: {image_url}")
+        else:
+            st.caption(f"출처: {publisher} | 날짜: {date}")
 
-    return df, info, news, error_msg
 
-# --- AI 분석 요청 함수 (Gemini 1 -> Gemini 2 -> Groq 순차 시도) ---
-def generate_ai_analysis(ticker, df_summary, news_summary, image_list, api_key):
-    # 여러 API 키 가져오기
-    gemini_key_1 = st.secrets.get('general', {}).get('GOOGLE_API_KEY_1', api_key)
-    gemini_key_2 = st.secrets.get('general', {}).get('GOOGLE_API_KEY_2', '')
-    groq_key = st.secrets.get('general', {}).get('GROQ_API_KEY', '')
-    
-    if not gemini_key_1 and not api_key:
-        return "API 키가 입력되지 않았습니다."
-    
-    # 이미지 리스트 포맷팅
-    images_str = ""
-    if image_list:
-        images_str = "\n[사용 가능한 이미지 목록 - 이 중 적절한 것을 골라 글 내용 중간에 마크다운 ![](url) 으로 삽입하세요]\n"
-        for i, img in enumerate(image_list):
-            images_str += f"{i+1}. {img['title']} (URL: {img['url']})\n"
-    
-    prompt = f"""
-    당신은 한국의 투자 분석 블로거입니다.
-    
-    '{ticker}' 주식에 대해 블로그 글을 작성해주세요.
-    
-    [참고 데이터]
-    주가 정보: {df_summary}
-    최근 뉴스: {news_summary}
-    {images_str}
+# --- AI 분석 요청 (Gemini 1 -> Gemini 2 -> Groq 순차 시도) ---
+def get_ai_keys(api_key):
+    """secrets의 여러 API 키 (첫 번째 Gemini 키가 없으면 사이드바 입력값 사용)"""
+    general = st.secrets.get('general', {})
+    return {
+        'gemini_1': general.get('GOOGLE_API_KEY_1', api_key),
+        'gemini_2': general.get('GOOGLE_API_KEY_2', ''),
+        'groq': general.get('GROQ_API_KEY', ''),
+    }
+
+
+
+def render_live_chart(ticker, interval):
+    """분봉 차트 + 시세 (fragment로 감싸서 이 부분만 주기적으로 다시 실행)"""
+    from dashboard.intraday import load_series
+
+    series_by_key = st.session_state.setdefault('intraday', {})
+    series = series_by_key.get((ticker, interval))
+    if series is None:
+        series = series_by_key[(ticker, interval)] = load_series(ticker, interval)
+    else:
+        series.poll()
+
+    quote = series.quote
+    if quote.get('price') is not None:
+        prev = quote.get('previous_close')
+        delta = f"{(quote['price'] / prev - 1) * 100:+.2f}%" if prev else None
+        st.metric(f"{ticker} 현재가 ({quote.get('currency', 'USD')})", f"{quote['price']:,.2f}", delta)
+    if len(series):
+        st.plotly_chart(series.figure(), use_container_width=True, key=f"live_{ticker}_{interval}")
+        st.caption(f"{interval} 봉 {len(series)}개 | 마지막 봉 {series.times[-1]:%m-%d %H:%M}")
+    else:
+        st.info("분봉 데이터가 없습니다 (장 시작 전이거나 조회 실패).")
+    if series.error:
+        st.caption(f"갱신 실패 (이전 값 표시 중): {series.error}")
 
-    
-    [글쓰기 스타일 - 반드시 지킬 것]
-    
-    1. 모든 문장 끝에 반드시 줄바꿈 2번 (빈 줄 삽입)
-    2. 절대로 두 문장을 한 줄에 쓰지 않음
-    3. 한 문장은 30~50자, 핵심만
-    4. "~이다", "~했다" 간결체 사용
-    5. 이모지, 특수문자 금지
-    6. 뉴스 인용 시 출처와 날짜 명시
-    
-    [줄바꿈 예시 - 반드시 이 형식으로]
-    
-    첫 번째 문장이다.
-    
-    두 번째 문장이다.
-    
-    세 번째 문장이다.
-    
-    [필수 포함 내용 - 제목 없이 내용만]
-    
-    먼저 이 회사의 주요 사업 부문별 매출 비중을 구체적 숫자(%)로 제시한다.
-    현재 가장 큰 매출원이 어디인지, 향후 성장이 기대되는 부문은 어디인지 설명한다.
-    
-    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
-    
-    현재 주가와 52주 최고/최저 비교, 1년 수익률과 최근 흐름을 설명한다.
-    
-    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
-    
-    주요 뉴스 2-3개를 아래 형식으로 인용한다:
-    "뉴스 제목" (출처: 매체명, 기사링크: URL)
-    
-    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
-    
-    핵심 투자 포인트 2-3개와 주요 리스크 요인 2-3개를 나열한다.
-    
-    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
-    
-    현재 이 종목에 대한 종합 의견 1-2문장으로 마무리한다.
-    (투자 권유가 아닌 정보 공유 목적임을 명시)
-    
-    [중요: 형식 규칙]
-    - "##" 같은 마크다운 헤더 기호는 절대 사용하지 않음
-    - 제목 대신 위처럼 "ㅡㅡㅡㅡㅡ" 구분선으로 섹션을 나눔
-    
-    총 50문장 이내로 핵심만 작성.
-    """
-    
-    # 1. Gemini 키 1 시도
-    try:
-        genai.configure(api_key=gemini_key_1)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e1:
-        if "429" not in str(e1):
-            return f"AI 오류: {str(e1)}"
-    
-    # 2. Gemini 키 2 시도
-    if gemini_key_2:
-        try:
-            genai.configure(api_key=gemini_key_2)
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt)
-            return f"[Gemini 키2 사용]\n\n{response.text}"
-        except Exception as e2:
-            if "429" not in str(e2):
-                return f"AI 오류: {str(e2)}"
-    
-    # 3. Groq로 fallback
-    if groq_key:
-        try:
-            from groq import Groq
-            client = Groq(api_key=groq_key)
-            
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "당신은 한국의 투자 분석 블로거입니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="llama-3.3-70b-versatile",
-                temperature=0.7,
-                max_tokens=2000
-            )
-            
-            return f"[Groq AI 사용]\n\n{chat_completion.choices[0].message.content}"
-        except Exception as e3:
-            return f"모든 AI 서비스 실패: {str(e3)}"
-    
-    return "모든 API 제한 초과. 잠시 후 다시 시도하세요."
 
+# 워치리스트에서 한 번에 생성할 수 있는 AI 리포트 수
+WATCHLIST_REPORT_LIMIT = 10
+# 워치리스트에서 기업 이미지를 미리 받아둘 종목 수
+WATCHLIST_IMAGE_PREFETCH = 20
 
 
 #------ 메인 앱 로직 ------
@@ -393,185 +201,269 @@ def generate_ai_analysis(ticker, df_summary, news_summary, image_list, api_key):
 st.title("지능형 주식 블로그 비서")
 st.markdown("주가 데이터 시각화, 뉴스 분석, 그리고 AI 기반의 미래 전망 리포트까지 한 번에 확인하세요.")
 
-if st.session_state['run_analysis'] and ticker_symbol:
-    
-    # 데이터 가져오기
-    with st.spinner(f"'{ticker_symbol}' 데이터 검색 및 분석 준비 중..."):
-        df, info, news_list, error_msg = get_dashboard_data(ticker_symbol)
+if mode == "워치리스트":
+    from dashboard.ai_report import collect_image_list, generate_batch, summarize_news, summarize_price_data
+    from dashboard.data import get_company_name, get_news, get_prices, get_watchlist_data
+    from dashboard.images import prefetch_company_images
+    from dashboard.report_cache import get_report_cache, report_keys
+    from dashboard.watchlist import TooManyTickers, parse_tickers
+
+    try:
+        tickers = parse_tickers(watchlist_text)
+    except TooManyTickers as e:
+        st.warning(f"{e} 앞의 {len(e.tickers)}개 종목만 분석합니다.")
+        tickers = e.tickers
+    
+    if st.session_state['run_watchlist'] and tickers:
+        with st.spinner(f"워치리스트 {len(tickers)}개 종목 데이터 수집 중..."):
+            summary_df, watchlist_news = get_watchlist_data(tuple(tickers), include_news)
+        
+        st.subheader(f"워치리스트 요약 ({len(tickers)}개 종목)")
+        st.caption("컬럼 제목을 클릭하면 정렬됩니다.")
+        st.dataframe(summary_df, use_container_width=True, hide_index=True)
+        
+        # 종목을 단일 분석으로 열 때 바로 보이도록 기업 이미지 캐시를 미리 채움
+        prefetch_company_images(tickers[:WATCHLIST_IMAGE_PREFETCH], get_company_name, local_thumbnails)
+        
+        if include_news:
+            for ticker in tickers:
+                items = watchlist_news.get(ticker, [])
+                if not items:
+                    continue
+                with st.expander(f"{ticker} 뉴스 ({len(items)}건)"):
+                    for item in items:
+                        st.markdown(f"- [{item.get('title', '제목 없음')}]({item.get('link', '#')}) "
+                                    f"({item.get('publisher', 'Unknown')})")
+        
+        # 워치리스트 AI 리포트 일괄 생성 (제공자 한도 안에서 동시 실행)
+        st.markdown("---")
+        st.subheader("AI 리포트 일괄 생성")
+        report_targets = st.multiselect("대상 종목", tickers, default=tickers[:3],
+                                        max_selections=WATCHLIST_REPORT_LIMIT)
+        if st.button("선택 종목 AI 리포트 생성") and report_targets:
+            report_cache = get_report_cache()
+            jobs, keys_by_ticker, reports = {}, {}, {}
+            with st.spinner("리포트 입력 데이터 준비 중..."):
+                for ticker in report_targets:
+                    df_t, _ = get_prices(ticker)
+                    news_t = watchlist_news.get(ticker) or get_news(ticker)
+                    jobs[ticker] = (summarize_price_data(ticker, df_t), summarize_news(news_t),
+                                    collect_image_list(ticker, [], news_t))
+                    keys_by_ticker[ticker] = report_keys(ticker, *jobs[ticker], ignore_dates=ignore_news_dates)
+                    cached_report = report_cache.find(keys_by_ticker[ticker]) if reuse_reports else None
+                    if cached_report:
+                        reports[ticker] = (cached_report['text'], "저장된 리포트 재사용")
+            
+            pending = {t: job for t, job in jobs.items() if t not in reports}
+            if pending:
+                with st.spinner(f"AI 리포트 {len(pending)}건 생성 중..."):
+                    for ticker, (text, stats) in generate_batch(pending, get_ai_keys(api_key)).items():
+                        reports[ticker] = (text, stats.describe())
+                        if stats.ok:
+                            report_cache.store(keys_by_ticker[ticker], text, ticker, stats)
+            
+            for ticker in report_targets:
+                text, note = reports[ticker]
+                with st.expander(f"{ticker} AI 리포트", expanded=len(report_targets) == 1):
+                    st.markdown(text)
+                    if note:
+                        st.caption(note)
+                    st.text_area("블로그 포스팅용 텍스트 복사", value=text, height=200, key=f"copy_{ticker}")
+    else:
+        st.info("사이드바에서 티커 목록을 입력하고 '워치리스트 분석' 버튼을 눌러주세요.")
+
+elif st.session_state['run_analysis'] and ticker_symbol:
+    page_timer = PageTimer(ticker_symbol)
+    from dashboard.ai_report import (StreamStats, collect_image_list, generate_ai_analysis,
+                                     stream_ai_analysis, summarize_news, summarize_price_data)
+    from dashboard.charts import CHART_RANGES, MAX_HISTORY_DAYS, get_price_chart
+    from dashboard.data import get_info, get_news, get_prices
+    from dashboard.images import get_company_images
+    from dashboard.price_store import HISTORY_DAYS
+    from dashboard.report_cache import get_report_cache, report_flight, report_keys
+    
+    # 느린 단계(기업 정보 / 뉴스 / 기업 이미지)는 백그라운드에서 먼저 시작
+    info_future = submit(get_info, ticker_symbol)
+    news_future = submit(get_news, ticker_symbol)
+    images_future = submit(load_company_images, ticker_symbol, info_future, local_thumbnails)
+    
+    # 주가 데이터만 기다림
+    with st.spinner(f"'{ticker_symbol}' 주가 데이터 불러오는 중..."):
+        df, error_msg = get_prices(ticker_symbol)
     
     # 에러 경고 (있으면)
     if error_msg:
         st.warning(f"주가 데이터: {error_msg}")
     
-    # 사이드바 정보
+    # 각 단계가 채울 자리 (사이드바 지표 / 기업 이미지)
     with st.sidebar:
         st.markdown("---")
         st.subheader(f"{ticker_symbol} 주요 지표")
-        if info and info.get('currentPrice'):
-            current_price = info.get('currentPrice', info.get('regularMarketPrice', 'N/A'))
-            market_cap = info.get('marketCap', 'N/A')
-            per = info.get('trailingPE', 'N/A')
-            
-            def format_num(num):
-                if isinstance(num, (int, float)):
-                    return f"{num:,.0f}"
-                return num
-            
-            st.metric("현재 주가", f"${current_price}")
-            st.write(f"**시가총액**: {format_num(market_cap)}")
-            st.write(f"**PER**: {per}")
-        else:
-            st.caption("재무 정보를 불러올 수 없습니다.")
+        metrics_slot = st.empty()
+        metrics_slot.caption("재무 정보 불러오는 중...")
+    images_slot = st.empty()
 
-    # 기업 대표 이미지 섹션
-    company_name = info.get('longName', info.get('shortName', ticker_symbol))
-    company_images = get_company_images(ticker_symbol, company_name)
-    
-    if company_images:
-        st.subheader(f"{ticker_symbol} 기업 이미지")
-        img_cols = st.columns(4)
-        for idx, img in enumerate(company_images[:4]):
-            with img_cols[idx]:
-                if img.get('url'):
-                    st.image(img['url'], caption=img.get('source', ''), use_container_width=True)
-                    st.caption(f"[이미지 링크]({img['url']})")
-
-    # 차트 시각화 (데이터 있을 때만)
-    if df is not None and not df.empty and len(df) > 0:
-        st.subheader(f"{ticker_symbol} 주가 및 거래량 차트 (지난 1년)")
-        
-        # 이동평균선
-        df['MA20'] = df['Close'].rolling(window=20).mean()
-        df['MA60'] = df['Close'].rolling(window=60).mean()
+    # 차트 시각화 (분봉 모드는 주기적으로 새 봉만 이어 붙임, 일봉은 데이터 있을 때만)
+    if chart_interval != "일봉":
+        st.subheader(f"{ticker_symbol} 분봉 차트 ({chart_interval}, {poll_seconds}초마다 갱신)")
+        st.fragment(run_every=poll_seconds)(render_live_chart)(ticker_symbol, chart_interval)
+    elif df is not None and not df.empty and len(df) > 0:
+        chart_range = st.radio("차트 기간", list(CHART_RANGES), index=list(CHART_RANGES).index('1Y'), horizontal=True)
+        st.subheader(f"{ticker_symbol} 주가 및 거래량 차트 ({chart_range})")
         
-        # 차트 생성
-        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, 
-                            vertical_spacing=0.03, 
-                            subplot_titles=(f'{ticker_symbol} Price Chart', 'Volume'), 
-                            row_heights=[0.7, 0.3])
-        
-        # 캔들스틱
-        fig.add_trace(go.Candlestick(
-            x=df.index,
-            open=df['Open'], 
-            high=df['High'],
-            low=df['Low'], 
-            close=df['Close'], 
-            name='OHLC'
-        ), row=1, col=1)
-        
-        # 이동평균선
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df['MA20'], 
-            opacity=0.7, 
-            line=dict(color='orange', width=2), 
-            name='MA 20'
-        ), row=1, col=1)
-        
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df['MA60'], 
-            opacity=0.7, 
-            line=dict(color='purple', width=2), 
-            name='MA 60'
-        ), row=1, col=1)
-        
-        # 거래량 (색상: 하락=red, 상승=green)
-        import numpy as np
-        colors = np.where(df['Close'].values < df['Open'].values, 'red', 'green')
-        fig.add_trace(go.Bar(
-            x=df.index, 
-            y=df['Volume'], 
-            marker_color=colors, 
-            name='Volume'
-        ), row=2, col=1)
-        
-        fig.update_layout(
-            height=600, 
-            showlegend=True, 
-            xaxis_rangeslider_visible=False,
-            title_text=f"{ticker_symbol} Analysis Chart"
-        )
+        # 1년 이하는 이미 받은 데이터 사용, 그보다 길면 저장소에서 긴 히스토리 로드
+        chart_df = df
+        range_days = CHART_RANGES[chart_range] or MAX_HISTORY_DAYS
+        if range_days > HISTORY_DAYS:
+            long_df, _ = get_prices(ticker_symbol, range_days)
+            if long_df is not None:
+                chart_df = long_df
         
+        # 보이는 구간만 다운샘플링 + (티커, 기간, 해상도) 단위 캐시
+        fig = get_price_chart(ticker_symbol, chart_df, chart_range)
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("데이터를 표시할 수 없습니다.")
+    page_timer.mark('chart')
 
     # 뉴스 및 AI 분석
     col1, col2 = st.columns([1, 1])
-    news_summary_text = ""
     
     with col1:
         st.subheader("최신 뉴스")
-        
-        if not news_list:
-            st.info("최신 뉴스를 찾을 수 없습니다.")
-            news_summary_text = "뉴스 데이터 없음"
-        else:
-            for idx, item in enumerate(news_list):
-                title = item.get('title', '제목 없음')
-                link = item.get('link', '#')
-                publisher = item.get('publisher', 'Unknown')
-                date = item.get('date', '')
-                image_url = item.get('image_url', '')
-                
-                st.markdown(f"**{idx+1}. [{title}]({link})**")
-                if image_url:
-                    st.caption(f"출처: {publisher} | 날짜: {date}")
-                    st.caption(f"이미지: {image_url}")
-                else:
-                    st.caption(f"출처: {publisher} | 날짜: {date}")
-                
-                # AI용 뉴스 요약에 이미지 URL 포함
-                news_summary_text += f"- {title} (출처: {publisher}, 날짜: {date}, 기사링크: {link}"
-                if image_url:
-                    news_summary_text += f", 이미지URL: {image_url}"
-                news_summary_text += ")\n"
-
-    
+        news_slot = st.empty()
+        news_slot.caption("뉴스 수집 및 번역 중...")
     with col2:
         st.subheader("AI 투자 분석 리포트")
+        ai_slot = st.empty()
+        ai_slot.caption("뉴스와 이미지 수집이 끝나면 리포트를 작성합니다.")
+
+    # 끝나는 순서대로 자리 채우기
+    loaded = {}
+
+    def fill(name, slot, render):
+        def on_done(result, error):
+            loaded[name] = result
+            with slot.container():
+                render(result)
+        return name, on_done
+
+    jobs = {
+        info_future: fill('info', metrics_slot, render_metrics),
+        images_future: fill('images', images_slot, lambda images: render_company_images(ticker_symbol, images)),
+        news_future: fill('news', news_slot, render_news),
+    }
+    for name in fill_as_completed(jobs):
+        page_timer.mark(name)
+
+    info = loaded['info'] or {}
+    news_list = loaded['news'] or []
+    company_images = loaded['images'] or []
+
+    with ai_slot.container():
+        # AI 프롬프트 입력 (주가 요약 / 뉴스 요약 / 삽입 가능한 이미지 목록)
+        data_summary = summarize_price_data(ticker_symbol, df)
+        news_summary_text = summarize_news(news_list)
+        ai_image_list = collect_image_list(ticker_symbol, company_images, news_list)
+
+        # 같은 입력(+모델)으로 만든 리포트가 있으면 재사용
+        report_cache = get_report_cache()
+        cache_keys = report_keys(ticker_symbol, data_summary, news_summary_text, ai_image_list,
+                                 ignore_dates=ignore_news_dates)
+        # 다른 세션/프로세스가 같은 리포트를 만드는 중이면 끝날 때까지 기다렸다가 그 결과를 씀
+        with report_flight(cache_keys) if reuse_reports else nullcontext():
+            cached_report = report_cache.find(cache_keys) if reuse_reports else None
         
-        # 데이터 요약
-        if df is not None and not df.empty and len(df) > 0:
-            last_close = float(df['Close'].iloc[-1])
-            first_close = float(df['Close'].iloc[0])
-            high_max = float(df['High'].max())
-            low_min = float(df['Low'].min())
-            price_change_1y = ((last_close - first_close) / first_close) * 100
-            data_summary = f"""
-            - 종목: {ticker_symbol}
-            - 현재 주가: ${last_close:.2f}
-            - 1년 수익률: {price_change_1y:.2f}%
-            - 52주 최고가: ${high_max:.2f}
-            - 52주 최저가: ${low_min:.2f}
-            """
-        else:
-            data_summary = f"- 종목: {ticker_symbol}\n- 주가 데이터: 수신 실패"
-        
-        # AI 분석을 위한 이미지 리스트 수집
-        ai_image_list = []
-        
-        # 1. 기업 대표 이미지
-        if company_images:
-            for img in company_images:
-                if img.get('url'):
-                    ai_image_list.append({'title': f"{ticker_symbol} 관련 이미지", 'url': img['url']})
-        
-        # 2. 뉴스 이미지
-        for item in news_list:
-            if item.get('image_url'):
-                ai_image_list.append({'title': f"뉴스 이미지: {item.get('title')}", 'url': item.get('image_url')})
-
-        # AI 분석 생성
-        with st.spinner("AI가 데이터를 분석하고 글을 작성 중입니다..."):
-            # API 키 (순차적으로 시도하므로 첫 번째 키 전달)
-            api_key = st.secrets.get('general', {}).get('GOOGLE_API_KEY_1', st.session_state.get('api_key', ''))
+            if cached_report:
+                ai_report = cached_report['text']
+                st.markdown(ai_report)
+                created = datetime.fromtimestamp(cached_report['created_at']).strftime('%Y-%m-%d %H:%M')
+                st.caption(f"저장된 리포트 재사용 ({cached_report['provider']}, {created} 생성)")
+            else:
+                # AI 분석 생성 (스트리밍이면 토큰이 도착하는 대로 표시)
+                ai_keys = get_ai_keys(api_key)
+                ai_stats = StreamStats()
+                if stream_ai:
+                    ai_report = st.write_stream(stream_ai_analysis(
+                        ticker_symbol, data_summary, news_summary_text, ai_image_list, ai_keys, ai_stats))
+                else:
+                    with st.spinner("AI가 데이터를 분석하고 글을 작성 중입니다..."):
+                        ai_report = generate_ai_analysis(
+                            ticker_symbol, data_summary, news_summary_text, ai_image_list, ai_keys, ai_stats)
+                    st.markdown(ai_report)
             
-            ai_report = generate_ai_analysis(ticker_symbol, data_summary, news_summary_text, ai_image_list, api_key)
-
+                if ai_stats.ttft is not None:
+                    st.caption(ai_stats.describe())
+                    print(f"[ai:{ticker_symbol}] {ai_stats.describe()}")
+                if ai_stats.ok:
+                    report_cache.store(cache_keys, ai_report, ticker_symbol, ai_stats)
         
-        st.markdown(ai_report)
         st.text_area("블로그 포스팅용 텍스트 복사", value=ai_report, height=200)
+    page_timer.mark('ai')
+
+    # 페이지 완성까지 걸린 시간
+    print(page_timer.finish())
+    st.caption(f"차트 표시 {page_timer.marks['chart']:.1f}초 | 페이지 완성 {page_timer.total:.1f}초")
 
 else:
     st.info("사이드바에서 주식 티커를 입력하고 '분석 시작' 버튼을 눌러주세요.")
+
+# AI 제공자별 호출/오류/429 카운터
+provider_stats = router_stats()
+if provider_stats:
+    with st.sidebar.expander("AI 제공자 상태"):
+        for name, entries in provider_stats.items():
+            calls = sum(e['calls'] for e in entries)
+            errors = sum(e['errors'] for e in entries)
+            limited = sum(e['rate_limited'] for e in entries)
+            latencies = [e['avg_latency'] for e in entries if e['avg_latency'] is not None]
+            cooldown = max(e['cooldown'] for e in entries)
+            avg = f"{sum(latencies) / len(latencies):.1f}초" if latencies else "-"
+            st.write(f"**{name}**: 호출 {calls} | 오류 {errors} (429: {limited}) | 평균 {avg}"
+                     + (f" | 쿨다운 {cooldown:.0f}초" if cooldown else ""))
+
+# 단계별 소요 시간 / 오류 (외부 호출 + 계산 단계)
+with st.sidebar.expander("진단 (단계별 소요 시간)"):
+    scope = st.radio("범위", ["이번 세션", "전체 프로세스"], horizontal=True, key='telemetry_scope')
+    registry, scope_name = (session_telemetry, 'session') if scope == "이번 세션" else (PROCESS, 'process')
+    rows = registry.rows()
+    if rows:
+        st.dataframe(
+            [{'단계': r['span'], '호출': r['count'], '오류': r['errors'], '합계(초)': round(r['total'], 3),
+              '평균(초)': round(r['avg'], 3), '최대(초)': round(r['max'], 3), '최근 오류': r['last_error'] or ''}
+             for r in rows],
+            hide_index=True, use_container_width=True,
+        )
+        col_jsonl, col_prom = st.columns(2)
+        col_jsonl.download_button("JSON lines", to_jsonl(registry, scope_name),
+                                  file_name=f"telemetry-{scope_name}.jsonl", mime='application/x-ndjson')
+        col_prom.download_button("Prometheus", to_prometheus(registry),
+                                 file_name=f"telemetry-{scope_name}.prom", mime='text/plain')
+    else:
+        st.caption("아직 기록된 단계가 없습니다.")
+
+    # 가격 소스 건강 점수 (높은 순으로 먼저 요청)
+    if is_loaded('dashboard.price_sources'):
+        from dashboard.price_sources import source_stats
+        for name, h in source_stats().items():
+            if h['calls']:
+                st.caption(f"가격 소스 {name}: 점수 {h['score']:.2f} | 평균 {h['latency']:.2f}초 | "
+                           f"실패 {h['failures']}/{h['calls']}" + (f" | {h['last_error'][:60]}" if h['last_error'] else ""))
+    if is_loaded('dashboard.shared_cache'):
+        from dashboard.shared_cache import shared_stats
+        for name, c in shared_stats().items():
+            if any(c.values()):
+                st.caption(f"공유 캐시 {name}: 적중 {c['hits']} | 직접 조회 {c['fetches']} | 대기 {c['waits']}")
+
+    # 종목별 캐시 메모리 (프로세스 전체, KB) - 데이터 모듈을 아직 안 불러왔으면 캐시도 비어 있음
+    memory = []
+    if is_loaded('dashboard.data'):
+        from dashboard.data import cache_memory
+        memory = cache_memory()
+    if memory:
+        st.caption(f"캐시 메모리: 종목 {len(memory)}개, 합계 {sum(r['total'] for r in memory) / 1024:.0f}KB")
+        st.dataframe(
+            [{'종목': r['ticker'], '주가(KB)': round(r['prices'] / 1024, 1), '정보(KB)': round(r['info'] / 1024, 1),
+              '뉴스(KB)': round(r['news'] / 1024, 1), '합계(KB)': round(r['total'] / 1024, 1)} for r in memory],
+            hide_index=True, use_container_width=True,
+        )
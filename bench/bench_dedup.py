@@ -0,0 +1,161 @@
+"""뉴스 제목 중복 제거 벤치마크: 기존 similar() 전수 비교 vs TitleDeduper
+
+실행: python bench/bench_dedup.py [--sizes 20 100 500 1000] [--seed 7]
+
+  - 판정 일치: 실제 기사 제목처럼 티커/'stock' 같은 흔한 토큰을 공유하며 겹치는 제목 목록(OVERLAPPING)을
+    워치리스트처럼 한 deduper로 넣어 기존 루프와 판정을 비교한다. max_postings를 아주 작게 한 경우도
+    함께 확인하며, 하나라도 다르면 종료 코드 1.
+  - 속도: 네트워크 없이 합성 헤드라인(원본 + 변형)으로 측정한다.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard.dedup import MAX_POSTINGS, TitleDeduper, similar  # noqa: E402
+
+TICKERS = ['NVDA', 'AAPL', 'MSFT', 'TSLA', 'AMZN', 'META', 'AMD', 'INTC']
+SUBJECTS = ['shares', 'stock', 'earnings', 'revenue', 'guidance', 'outlook', 'chip sales',
+            'data center demand', 'AI spending', 'buyback', 'dividend', 'valuation']
+VERBS = ['jumps', 'falls', 'surges', 'slips', 'beats estimates', 'misses estimates',
+         'hits record', 'rebounds', 'stalls', 'draws analyst upgrade', 'faces probe']
+TAILS = ['after earnings', 'ahead of Fed meeting', 'as investors rotate', 'on China export curbs',
+         'amid AI boom', 'in premarket trading', 'despite supply concerns', 'this week',
+         'as rivals ramp production', 'following CEO comments']
+PUBLISHERS = ['Reuters', 'CNBC', 'Bloomberg', 'Investing.com', 'Yahoo Finance', 'MarketWatch']
+
+# 여러 소스/종목에서 겹치는 제목 (출처 접미사, 단어 교체, 흔한 토큰만 공유하는 근사 중복 포함)
+OVERLAPPING = [
+    "Nvidia stock news today: shares rise ahead of earnings",
+    "Nvidia stock news today: shares rise ahead of earnings - Reuters",
+    "NVIDIA Stock News Today: Shares Rise Ahead Of Earnings",
+    "Nvidia stock news today: shares fall ahead of earnings",
+    "nvda stock news today",
+    "nvda stock news toda qqz",
+    "nvda stock news today - cnbc",
+    "Nvidia shares jump as AI chip demand stays strong",
+    "Nvidia shares jump as AI chip demand stays strong, analysts say",
+    "Nvidia shares slip as AI chip demand cools",
+    "Apple stock news today: iPhone sales beat estimates",
+    "Apple stock news today: iPhone sales beat estimates | Bloomberg",
+    "Apple stock news today: iPhone sales miss estimates",
+    "aapl stock news today",
+    "aapl stock news toady",
+    "Microsoft stock news today: Azure growth accelerates",
+    "Microsoft stock news today: Azure growth slows",
+    "msft stock news today",
+    "Tesla stock falls after delivery numbers disappoint",
+    "Tesla stock falls after delivery numbers disappoint - MarketWatch",
+    "Tesla stock rises after delivery numbers beat",
+    "tsla stock news today",
+    "Stock market today: Dow, S&P 500, Nasdaq rise as Nvidia rallies",
+    "Stock market today: Dow, S&P 500, Nasdaq fall as Nvidia slides",
+    "Stock market today: Dow, S&P 500 and Nasdaq rise as Nvidia rallies",
+    "stock market today live updates",
+    "stock market today: live updates",
+    "Is Nvidia stock a buy now?",
+    "Is Apple stock a buy now?",
+    "Is Microsoft stock a buy now?",
+    "Is Nvidia Stock a Buy Now? - The Motley Fool",
+    "AMD stock news today",
+    "amd stocks news today",
+    "Intel stock news today: foundry update",
+    "intel stock news today",
+]
+
+
+def make_headlines(n, seed):
+    """n개 헤드라인 생성 - 약 40%는 앞선 헤드라인의 근사 중복"""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        if out and rng.random() < 0.4:
+            base = rng.choice(out)
+            kind = rng.randrange(4)
+            if kind == 0:
+                title = f"{base} - {rng.choice(PUBLISHERS)}"
+            elif kind == 1:
+                words = base.split()
+                words[rng.randrange(len(words))] = rng.choice(VERBS).split()[0]
+                title = " ".join(words)
+            elif kind == 2:
+                title = base.upper() if rng.random() < 0.5 else base.replace(' ', '  ', 1)
+            else:
+                title = f"{rng.choice(TICKERS)} {rng.choice(SUBJECTS)} {rng.choice(VERBS)}"
+        else:
+            title = (f"{rng.choice(TICKERS)} {rng.choice(SUBJECTS)} {rng.choice(VERBS)} "
+                     f"{rng.choice(TAILS)}")
+        out.append(title)
+    return out
+
+
+def baseline_decisions(titles):
+    """app.py에 있던 기존 O(n²) 루프와 동일"""
+    kept = []
+    decisions = []
+    for title in titles:
+        is_duplicate = False
+        for existing in kept:
+            if similar(title.lower(), existing.lower()) > 0.8:
+                is_duplicate = True
+                break
+        if not is_duplicate:
+            kept.append(title)
+        decisions.append(not is_duplicate)
+    return decisions
+
+
+def engine_decisions(titles, **kwargs):
+    deduper = TitleDeduper(**kwargs)
+    return [deduper.add(t) for t in titles], deduper.comparisons
+
+
+def check_agreement(titles):
+    """기존 루프와 판정이 다른 (max_postings, 제목) 목록"""
+    expected = baseline_decisions(titles)
+    mismatches = []
+    for max_postings in (2, 8, MAX_POSTINGS):
+        decisions, _ = engine_decisions(titles, max_postings=max_postings)
+        mismatches += [(max_postings, t, b) for t, a, b in zip(titles, decisions, expected) if a != b]
+    return mismatches
+
+
+def timed(fn, *args, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 500, 1000])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    titles = OVERLAPPING + [t.replace('today', 'this week') for t in OVERLAPPING]
+    mismatches = check_agreement(titles)
+    print(f"agreement on {len(titles)} overlapping titles: "
+          f"{'ok' if not mismatches else f'{len(mismatches)} mismatches'}")
+    for max_postings, title, kept in mismatches:
+        print(f"  max_postings={max_postings}: {title!r} baseline {'keeps' if kept else 'drops'} it")
+
+    print(f"{'n':>6} {'baseline':>10} {'engine':>10} {'speedup':>8} {'kept b/e':>11} {'ratio() calls':>14}")
+    for n in args.sizes:
+        titles = make_headlines(n, args.seed)
+        repeat = 1 if n > 1000 else 3
+        t_base, base = timed(baseline_decisions, titles, repeat=repeat)
+        t_eng, (eng, comparisons) = timed(engine_decisions, titles, repeat=repeat)
+        print(f"{n:>6} {t_base * 1000:>8.1f}ms {t_eng * 1000:>8.1f}ms {t_base / t_eng:>7.1f}x "
+              f"{sum(base):>5}/{sum(eng):<5} {comparisons:>14}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
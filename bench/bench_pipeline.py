@@ -0,0 +1,227 @@
+"""데이터 파이프라인 벤치마크 (녹화/합성 fixture 재생, 네트워크 불필요)
+
+실행: python bench/bench_pipeline.py [--fixtures bench/fixtures/sample.pkl] [--profile typical]
+                                     [--iterations 10] [--tickers NVDA AAPL MSFT] [--json out.json]
+
+fixture를 지정하지 않으면 dashboard.replay.synthetic_fixtures()로 만든 합성 데이터를 쓴다.
+외부 호출은 모두 fixture 응답 + 지연 프로필(none/fast/typical/slow)로 대체되고 소켓 연결은 차단된다.
+
+측정 항목
+  - dashboard_cold / dashboard_warm : get_dashboard_data (캐시 비운 상태 / 단계 캐시 적중)
+  - news_collect / news_dedup / news_translate / news_enrich / news_total : get_hybrid_news 단계별
+  - indicators_<n> / indicators_append : compute_indicators, 새 봉 1개 증분 갱신
+  - figure_<기간> / figure_cached : build_price_chart, 캐시 적중
+  - watchlist_<n> : 종목 n개(기본 120) 워치리스트 info+뉴스 한 번 - 모든 행의 info/뉴스 조회가
+                    시간 초과나 오류 없이 끝났는지 확인 (빠진 행이 있으면 종료 코드 1)
+항목마다 지연 시간 백분위(p50/p90/p99)와 tracemalloc 최대 할당량을 출력한다.
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 캐시 폴더는 dashboard import 전에 정해야 함 (실사용 캐시를 건드리지 않도록 임시 폴더)
+os.environ['STOCK_DASHBOARD_CACHE_DIR'] = tempfile.mkdtemp(prefix='bench-pipeline-')
+
+import numpy as np  # noqa: E402
+
+from dashboard.replay import (LATENCY_PROFILES, Fixtures, Replayer, block_network,  # noqa: E402
+                              reset_caches, synthetic_fixtures)
+
+# 결과 표는 항상 원래 stdout으로 (파이프라인 로그는 --verbose일 때만)
+REPORT = sys.stdout
+
+DEFAULT_TICKERS = ['NVDA', 'AAPL', 'MSFT']
+INDICATOR_SIZES = [252, 2520, 10080]
+FIGURE_RANGES = ['1Y', '10Y', 'MAX']
+
+
+def percentiles(samples):
+    arr = np.asarray(samples) * 1000
+    return {
+        'n': len(arr),
+        'p50': float(np.percentile(arr, 50)),
+        'p90': float(np.percentile(arr, 90)),
+        'p99': float(np.percentile(arr, 99)),
+        'max': float(arr.max()),
+        'mean': float(arr.mean()),
+    }
+
+
+def run_case(name, fn, iterations, setup=None, results=None):
+    """setup() -> fn(state) 을 iterations번 측정 + 한 번 더 실행해 메모리 최대치 측정"""
+    samples = []
+    for i in range(iterations):
+        state = setup(i) if setup else i
+        start = time.perf_counter()
+        fn(state)
+        samples.append(time.perf_counter() - start)
+
+    state = setup(iterations) if setup else iterations
+    tracemalloc.start()
+    fn(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = percentiles(samples)
+    stats['peak_mb'] = peak / 1024 / 1024
+    if results is not None:
+        results[name] = stats
+    print(f"{name:<20} {stats['n']:>4} {stats['p50']:>9.1f} {stats['p90']:>9.1f} {stats['p99']:>9.1f} "
+          f"{stats['max']:>9.1f} {stats['peak_mb']:>9.2f}", file=REPORT, flush=True)
+    return stats
+
+
+def bench_dashboard(tickers, iterations, results):
+    from dashboard.data import get_dashboard_data
+
+    def cold_setup(i):
+        reset_caches()
+        return tickers[i % len(tickers)]
+
+    run_case('dashboard_cold', get_dashboard_data, iterations, cold_setup, results)
+    for ticker in tickers:
+        get_dashboard_data(ticker)
+    run_case('dashboard_warm', get_dashboard_data, iterations, lambda i: tickers[i % len(tickers)], results)
+
+
+def bench_news(tickers, iterations, results):
+    from dashboard.dedup import dedup_news
+    from dashboard.news import collect_news, get_hybrid_news, translate_news
+    from dashboard.og_image import enrich_images
+
+    def ticker_at(i):
+        return tickers[i % len(tickers)]
+
+    def fresh(i):
+        reset_caches()
+        return ticker_at(i)
+
+    run_case('news_collect', collect_news, iterations, ticker_at, results)
+    collected = {t: collect_news(t) for t in tickers}
+
+    run_case('news_dedup', lambda items: dedup_news(items)[:10], iterations,
+             lambda i: collected[ticker_at(i)], results)
+
+    def deduped_copy(i):
+        reset_caches()
+        return [dict(item) for item in dedup_news(collected[ticker_at(i)])[:10]]
+
+    run_case('news_translate', translate_news, iterations, deduped_copy, results)
+    run_case('news_enrich', enrich_images, iterations, deduped_copy, results)
+    run_case('news_total', get_hybrid_news, iterations, fresh, results)
+
+
+def bench_indicators(fixtures, ticker, iterations, results):
+    from dashboard.indicators import compute_indicators, get_indicators
+
+    df = fixtures.get('prices', ticker)
+    for n in INDICATOR_SIZES:
+        part = df.iloc[-n:]
+        h, l, c = (part[col].to_numpy() for col in ('High', 'Low', 'Close'))
+        run_case(f'indicators_{n}', lambda _: compute_indicators(h, l, c), iterations, None, results)
+
+    base = df.iloc[-2521:-1]
+
+    def appended(i):
+        # 캐시에 2520봉을 올려 둔 뒤 한 봉이 붙은 프레임으로 조회
+        reset_caches()
+        get_indicators(ticker, base)
+        return df.iloc[-2521:]
+
+    run_case('indicators_append', lambda frame: get_indicators(ticker, frame), iterations, appended, results)
+
+
+def bench_figures(fixtures, ticker, iterations, results):
+    from dashboard.charts import build_price_chart, get_price_chart
+
+    df = fixtures.get('prices', ticker)
+    for range_key in FIGURE_RANGES:
+        run_case(f'figure_{range_key}', lambda _, r=range_key: build_price_chart(ticker, df, r),
+                 iterations, None, results)
+    get_price_chart(ticker, df, 'MAX')
+    run_case('figure_cached', lambda _: get_price_chart(ticker, df, 'MAX'), iterations, None, results)
+
+
+def bench_watchlist(size, results):
+    from dashboard.watchlist import build_watchlist_summary
+
+    tickers = [f"W{i:03d}" for i in range(size)]
+    start = time.perf_counter()
+    table, _ = build_watchlist_summary(tickers, with_info=True, with_news=True)
+    elapsed = time.perf_counter() - start
+    failed = table['오류'].notna() if '오류' in table else False
+    missing = table[table['이름'].isna() | failed]
+    stats = percentiles([elapsed])
+    stats.update({'peak_mb': 0.0, 'rows': len(table), 'incomplete': len(missing)})
+    results[f'watchlist_{size}'] = stats
+    print(f"{f'watchlist_{size}':<20} {1:>4} {stats['p50']:>9.1f} {'':>9} {'':>9} {stats['max']:>9.1f} {'':>9}  "
+          f"complete {len(table) - len(missing)}/{len(table)}", file=REPORT, flush=True)
+    for _, row in missing.head(5).iterrows():
+        print(f"  incomplete {row['종목']}: {row.get('오류', '')}", file=REPORT)
+    return len(missing) == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', help="녹화된 fixture 파일 (없으면 합성 데이터)")
+    parser.add_argument('--profile', default='typical', choices=sorted(LATENCY_PROFILES))
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--tickers', nargs='+', default=None)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--only', nargs='+', choices=['dashboard', 'news', 'indicators', 'figures', 'watchlist'],
+                        default=['dashboard', 'news', 'indicators', 'figures', 'watchlist'])
+    parser.add_argument('--watchlist-size', type=int, default=120)
+    parser.add_argument('--json', help="결과를 JSON으로 저장할 경로")
+    parser.add_argument('--verbose', action='store_true', help="파이프라인 로그 출력")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = Fixtures.load(args.fixtures)
+        tickers = args.tickers or fixtures.meta.get('tickers') or DEFAULT_TICKERS
+    else:
+        tickers = args.tickers or DEFAULT_TICKERS
+        fixtures = synthetic_fixtures(tickers, seed=args.seed)
+    if 'watchlist' in args.only:
+        # 워치리스트 종목은 합성 데이터로 추가 (가격은 짧게)
+        extra = synthetic_fixtures([f"W{i:03d}" for i in range(args.watchlist_size)], seed=args.seed, years=2)
+        for source, entries in extra.sources.items():
+            fixtures.sources.setdefault(source, {}).update(entries)
+    print(f"fixtures: {fixtures.meta.get('kind', 'recorded')} {fixtures.counts()}")
+    print(f"profile: {args.profile}, iterations: {args.iterations}, tickers: {' '.join(tickers)}")
+    print(f"{'case':<20} {'n':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'peak MB':>9}")
+
+    results = {}
+    complete = True
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    with block_network(), Replayer(fixtures, args.profile, seed=args.seed), quiet:
+        if 'dashboard' in args.only:
+            bench_dashboard(tickers, args.iterations, results)
+        if 'news' in args.only:
+            bench_news(tickers, args.iterations, results)
+        if 'indicators' in args.only:
+            bench_indicators(fixtures, tickers[0], args.iterations, results)
+        if 'figures' in args.only:
+            bench_figures(fixtures, tickers[0], args.iterations, results)
+        if 'watchlist' in args.only:
+            complete = bench_watchlist(args.watchlist_size, results)
+
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"max RSS: {max_rss_mb:.0f} MB")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'profile': args.profile, 'tickers': tickers, 'fixtures': fixtures.meta,
+                       'max_rss_mb': max_rss_mb, 'results': results}, f, ensure_ascii=False, indent=2)
+    if not complete:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""앱 콜드 스타트 벤치마크 (-X importtime 기반)
+
+실행: python bench/bench_startup.py [--runs 3] [--top 15] [--json out.json]
+
+새 파이썬 프로세스에서 측정한다.
+  - landing : 첫 화면에 필요한 import (streamlit + 가벼운 dashboard 모듈)
+  - heavy   : landing 이후 분석 시작 시 추가로 불러오는 모듈 (warmup.HEAVY_MODULES)
+  - render  : AppTest로 첫 화면을 그리는 시간 + 그 시점에 이미 로드된 무거운 모듈
+              (예열 스레드는 끄고 측정 - 첫 화면이 무거운 모듈 없이 그려지는지 확인)
+import 항목은 -X importtime 출력의 누적 시간(cumulative) 기준 상위 모듈을 함께 보여준다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from dashboard.warmup import HEAVY_MODULES  # noqa: E402
+
+LANDING_MODULES = ('streamlit', 'dashboard.ai_router', 'dashboard.progressive',
+                   'dashboard.telemetry', 'dashboard.warmup')
+# 첫 화면에서 로드되면 안 되는 모듈 (plotly는 streamlit 자체가 불러오므로 제외)
+HEAVY_MARKERS = ('pandas', 'yfinance', 'google.ai.generativelanguage', 'groq', 'deep_translator',
+                 'dashboard.data', 'dashboard.charts')
+
+RENDER_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {repo!r})
+import dashboard.warmup
+dashboard.warmup.warm_up = lambda *a, **k: None
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.secrets['general'] = {{}}
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'exceptions': len(at.exception),
+                  'loaded': [m for m in {markers!r} if m in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 -> [(모듈, self_us, cumulative_us, 깊이)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def import_profile(preload, modules):
+    """preload를 먼저 불러 둔 프로세스에서 modules import에 걸린 시간만 측정"""
+    code = "import sys; sys.path.insert(0, %r)\n" % REPO_DIR
+    code += "".join(f"import {m}\n" for m in preload)
+    code += "import importlib, sys; sys.stderr.write('--mark--\\n')\n"
+    code += "".join(f"importlib.import_module({m!r})\n" for m in modules)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=REPO_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    rows = parse_importtime(proc.stderr.split('--mark--', 1)[1])
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    return total_us / 1e6, rows
+
+
+def render_landing():
+    script = RENDER_SCRIPT.format(repo=REPO_DIR, app=os.path.join(REPO_DIR, 'app.py'), markers=HEAVY_MARKERS)
+    env = dict(os.environ, STOCK_DASHBOARD_CACHE_DIR=tempfile.mkdtemp(prefix='bench-startup-'))
+    proc = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=REPO_DIR, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_top(title, rows, top):
+    print(f"  {title} - top {top} by cumulative time")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"    {cumulative_us / 1000:>8.1f} ms  {self_us / 1000:>7.1f} ms self  {'  ' * min(depth, 4)}{name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    results = {}
+    for label, preload, modules in (('landing', (), LANDING_MODULES),
+                                    ('heavy', LANDING_MODULES, HEAVY_MODULES)):
+        samples, rows = [], []
+        for _ in range(args.runs):
+            seconds, rows = import_profile(preload, modules)
+            samples.append(seconds)
+        results[label] = {'median_s': statistics.median(samples), 'min_s': min(samples), 'modules': len(rows)}
+        print(f"{label:<8} import {results[label]['median_s'] * 1000:>8.1f} ms median "
+              f"(min {results[label]['min_s'] * 1000:.1f} ms, {len(rows)} modules)")
+        print_top(label, rows, args.top)
+
+    renders = [render_landing() for _ in range(args.runs)]
+    results['render'] = {
+        'median_s': statistics.median(r['elapsed'] for r in renders),
+        'exceptions': max(r['exceptions'] for r in renders),
+        'heavy_loaded': sorted({m for r in renders for m in r['loaded']}),
+    }
+    print(f"render   landing page {results['render']['median_s'] * 1000:>8.1f} ms median, "
+          f"exceptions {results['render']['exceptions']}, "
+          f"heavy modules loaded: {', '.join(results['render']['heavy_loaded']) or 'none'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""주식 대시보드 데이터 수집/분석 헬퍼 모음 (Streamlit 페이지 코드와 분리)"""
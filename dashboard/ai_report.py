@@ -0,0 +1,226 @@
+"""AI 블로그 리포트 생성 (Gemini 1 / Gemini 2 / Groq, 스트리밍 지원)
+
+응답을 토큰 단위로 흘려보내는 제너레이터를 기본으로 하고, 첫 토큰까지 걸린 시간(TTFT)과
+초당 토큰 수를 StreamStats에 기록한다. API 키는 호출하는 쪽(Streamlit secrets 등)에서 넘긴다.
+"""
+import threading
+import time
+
+from dashboard.ai_router import INTERACTIVE_MAX_WAIT, get_router
+from dashboard.fanout import fan_out, format_report
+from dashboard.indicators import get_indicators, price_summary
+from dashboard.links import resolve_links
+
+BATCH_WORKERS = 3
+BATCH_MAX_WAIT = 120.0          # 배치는 한도가 빌 때까지 이 시간만큼 기다림
+BATCH_JOB_TIMEOUT = 180.0
+
+
+class StreamStats:
+    """스트리밍 응답 측정값"""
+
+    def __init__(self):
+        self.provider = None
+        self.model = None           # 실제로 응답한 모델 (리포트 캐시 키)
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.chunks = 0
+        self.chars = 0
+        self.tokens = None          # 제공자가 알려준 출력 토큰 수 (없으면 청크 수로 대신)
+        self.ok = False             # 제공자 응답을 끝까지 받았는지 (오류 메시지는 캐시하지 않음)
+        self.cancelled = threading.Event()  # 켜지면 라우터가 대기/스트림을 중단
+
+    def on_chunk(self, text):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.chunks += 1
+        self.chars += len(text)
+
+    def finish(self, tokens=None):
+        self.finished_at = time.perf_counter()
+        if tokens:
+            self.tokens = tokens
+
+    @property
+    def ttft(self):
+        return None if self.first_token_at is None else self.first_token_at - self.started_at
+
+    @property
+    def tokens_per_sec(self):
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        count = self.tokens or self.chunks
+        return count / elapsed if elapsed > 0 else None
+
+    def describe(self):
+        if self.ttft is None:
+            return ""
+        parts = [f"{self.provider}", f"첫 토큰 {self.ttft:.2f}초"]
+        if self.tokens_per_sec:
+            unit = "토큰" if self.tokens else "청크"
+            parts.append(f"{self.tokens_per_sec:.1f} {unit}/초")
+        if self.finished_at is not None:
+            parts.append(f"총 {self.finished_at - self.started_at:.1f}초")
+        return " | ".join(parts)
+
+
+def build_prompt(ticker, df_summary, news_summary, image_list):
+    # 이미지 리스트 포맷팅
+    images_str = ""
+    if image_list:
+        images_str = "\n[사용 가능한 이미지 목록 - 이 중 적절한 것을 골라 글 내용 중간에 마크다운 ![](url) 으로 삽입하세요]\n"
+        for i, img in enumerate(image_list):
+            images_str += f"{i+1}. {img['title']} (URL: {img['url']})\n"
+    
+    prompt = f"""
+    당신은 한국의 투자 분석 블로거입니다.
+    
+    '{ticker}' 주식에 대해 블로그 글을 작성해주세요.
+    
+    [참고 데이터]
+    주가 정보: {df_summary}
+    최근 뉴스: {news_summary}
+    {images_str}
+
+    
+    [글쓰기 스타일 - 반드시 지킬 것]
+    
+    1. 모든 문장 끝에 반드시 줄바꿈 2번 (빈 줄 삽입)
+    2. 절대로 두 문장을 한 줄에 쓰지 않음
+    3. 한 문장은 30~50자, 핵심만
+    4. "~이다", "~했다" 간결체 사용
+    5. 이모지, 특수문자 금지
+    6. 뉴스 인용 시 출처와 날짜 명시
+    
+    [줄바꿈 예시 - 반드시 이 형식으로]
+    
+    첫 번째 문장이다.
+    
+    두 번째 문장이다.
+    
+    세 번째 문장이다.
+    
+    [필수 포함 내용 - 제목 없이 내용만]
+    
+    먼저 이 회사의 주요 사업 부문별 매출 비중을 구체적 숫자(%)로 제시한다.
+    현재 가장 큰 매출원이 어디인지, 향후 성장이 기대되는 부문은 어디인지 설명한다.
+    
+    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
+    
+    현재 주가와 52주 최고/최저 비교, 1년 수익률과 최근 흐름을 설명한다.
+    
+    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
+    
+    주요 뉴스 2-3개를 아래 형식으로 인용한다:
+    "뉴스 제목" (출처: 매체명, 기사링크: URL)
+    
+    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
+    
+    핵심 투자 포인트 2-3개와 주요 리스크 요인 2-3개를 나열한다.
+    
+    ㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡㅡ
+    
+    현재 이 종목에 대한 종합 의견 1-2문장으로 마무리한다.
+    (투자 권유가 아닌 정보 공유 목적임을 명시)
+    
+    [중요: 형식 규칙]
+    - "##" 같은 마크다운 헤더 기호는 절대 사용하지 않음
+    - 제목 대신 위처럼 "ㅡㅡㅡㅡㅡ" 구분선으로 섹션을 나눔
+    
+    총 50문장 이내로 핵심만 작성.
+    """
+    return prompt
+
+
+def stream_ai_analysis(ticker, df_summary, news_summary, image_list, keys, stats=None,
+                       max_wait=INTERACTIVE_MAX_WAIT):
+    """리포트 텍스트를 조각 단위로 yield
+
+    keys: {'gemini_1': ..., 'gemini_2': ..., 'groq': ...}
+    제공자 선택/대체는 ai_router가 담당 (한도가 남은 키부터 사용)
+    """
+    stats = stats or StreamStats()
+    if not keys.get('gemini_1'):
+        yield "API 키가 입력되지 않았습니다."
+        return
+
+    prompt = build_prompt(ticker, df_summary, news_summary, image_list)
+    yield from get_router(keys).stream(prompt, stats, max_wait)
+
+
+def generate_ai_analysis(ticker, df_summary, news_summary, image_list, keys, stats=None,
+                         max_wait=INTERACTIVE_MAX_WAIT):
+    """스트리밍 없이 완성된 리포트 문자열 반환"""
+    return "".join(stream_ai_analysis(ticker, df_summary, news_summary, image_list, keys, stats, max_wait))
+
+
+def generate_batch(jobs, keys, max_workers=BATCH_WORKERS, max_wait=BATCH_MAX_WAIT):
+    """여러 종목 리포트를 한도 안에서 동시에 생성
+
+    jobs: {ticker: (df_summary, news_summary, image_list)}
+    반환: {ticker: (report_text, StreamStats)} - 한도가 비면 라우터가 max_wait까지 기다림
+    시간 초과된 작업은 cancelled를 켜서 백그라운드 스레드가 한도를 계속 쓰지 않게 한다.
+    """
+    stats = {ticker: StreamStats() for ticker in jobs}
+    results, report = fan_out(
+        [(ticker, lambda t=ticker: generate_ai_analysis(t, *jobs[t], keys, stats[t], max_wait),
+          max_wait + BATCH_JOB_TIMEOUT) for ticker in jobs],
+        total_timeout=max_wait * len(jobs) + BATCH_JOB_TIMEOUT,
+        max_workers=max_workers,
+        on_timeout=lambda t: stats[t].cancelled.set()
+    )
+    print(f"[ai:batch] {format_report(report)}")
+    for ticker in jobs:
+        if ticker not in results:
+            stats[ticker].ok = False
+    return {ticker: (results.get(ticker, "AI 리포트 생성 시간 초과"), stats[ticker]) for ticker in jobs}
+
+
+# --- 프롬프트 입력 만들기 (화면 / 워치리스트 / 배치 공용) ---
+
+def summarize_price_data(ticker, df):
+    """일봉 DataFrame -> 프롬프트용 주가 요약 텍스트"""
+    if df is None or df.empty:
+        return f"- 종목: {ticker}\n- 주가 데이터: 수신 실패"
+    indicators = get_indicators(ticker, df)
+    summary = price_summary(df['High'], df['Low'], df['Close'])
+    return f"""
+            - 종목: {ticker}
+            - 현재 주가: ${summary['last_close']:.2f}
+            - 1년 수익률: {summary['return_pct']:.2f}%
+            - 52주 최고가: ${summary['high_max']:.2f}
+            - 52주 최저가: ${summary['low_min']:.2f}
+            - 20일/60일 이동평균: ${indicators['sma_20'][-1]:.2f} / ${indicators['sma_60'][-1]:.2f}
+            - RSI(14): {indicators['rsi_14'][-1]:.1f}
+            - 52주 고점 대비: {indicators['drawdown'][-1] * 100:.2f}%
+            """
+
+
+def summarize_news(news_list):
+    """뉴스 목록 -> 프롬프트용 뉴스 요약 텍스트 (이미지 URL 포함)"""
+    if not news_list:
+        return "뉴스 데이터 없음"
+    text = ""
+    # 프롬프트에는 Google News 리다이렉트 대신 원문 기사 URL을 넣음
+    links = resolve_links([item.get('link', '#') for item in news_list])
+    for item, link in zip(news_list, links):
+        text += (f"- {item.get('title', '제목 없음')} (출처: {item.get('publisher', 'Unknown')}, "
+                 f"날짜: {item.get('date', '')}, 기사링크: {link}")
+        if item.get('image_url'):
+            text += f", 이미지URL: {item['image_url']}"
+        text += ")\n"
+    return text
+
+
+def collect_image_list(ticker, company_images, news_list):
+    """AI가 본문에 넣을 수 있는 이미지 목록 (기업 이미지 + 뉴스 이미지)"""
+    images = []
+    for img in company_images or []:
+        if img.get('url'):
+            images.append({'title': f"{ticker} 관련 이미지", 'url': img['url']})
+    for item in news_list or []:
+        if item.get('image_url'):
+            images.append({'title': f"뉴스 이미지: {item.get('title')}", 'url': item.get('image_url')})
+    return images
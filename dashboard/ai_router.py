@@ -0,0 +1,266 @@
+"""AI 제공자 라우터 (키별 토큰 버킷 + 429 쿨다운)
+
+기존에는 Gemini 키1 → 429 대기 → 키2 → 429 대기 → Groq 순서로 매번 시도했다.
+라우터는 키마다 분당 요청 한도(토큰 버킷)와 최근 429를 기억해 지금 쓸 수 있는
+제공자부터 고르고, 키별 클라이언트를 따로 보관한다. Gemini는 전역 설정(genai.configure) 대신
+google.ai.generativelanguage의 GenerativeServiceClient를 키마다 만들어 쓴다.
+라우터는 같은 키 조합이면 프로세스 안에서 공유되므로 여러 세션의 요청이 같은 한도를 나눠 쓴다.
+"""
+import re
+import threading
+import time
+
+from dashboard.telemetry import record
+
+GEMINI_MODEL = 'gemini-2.5-flash'
+GROQ_MODEL = 'llama-3.3-70b-versatile'
+MODELS = {'gemini': GEMINI_MODEL, 'groq': GROQ_MODEL}
+SYSTEM_PROMPT = "당신은 한국의 투자 분석 블로거입니다."
+
+# 무료 등급 기준 분당 요청 수
+RPM_LIMITS = {'gemini': 10, 'groq': 30}
+DEFAULT_COOLDOWN = 60.0         # 429 응답에 재시도 시간이 없을 때
+INTERACTIVE_MAX_WAIT = 5.0      # 화면 요청은 이 이상 기다리지 않고 실패 메시지 반환
+
+_RETRY_RE = re.compile(r'retry(?:_delay)?[^0-9]{0,20}(\d+(?:\.\d+)?)\s*s', re.IGNORECASE)
+
+
+class RateLimited(Exception):
+    """쓸 수 있는 제공자가 없음 (모두 쿨다운 또는 한도 소진)"""
+
+
+class TokenBucket:
+    def __init__(self, capacity, refill_per_sec):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+        self.updated = now
+
+    def wait_time(self, now):
+        """토큰 하나가 생길 때까지 남은 시간 (0이면 바로 사용 가능)"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.refill_per_sec
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class Provider:
+    def __init__(self, name, kind, key, prefix='', rpm=None):
+        self.name = name
+        self.kind = kind
+        self.key = key
+        self.prefix = prefix
+        self.model = MODELS[kind]
+        rpm = rpm or RPM_LIMITS[kind]
+        self.bucket = TokenBucket(rpm, rpm / 60.0)
+        self.cooldown_until = 0.0
+        self._client = None
+        self.stats = {'calls': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0,
+                      'latency_total': 0.0, 'last_latency': None, 'last_error': None}
+
+    def wait_time(self, now):
+        return max(self.cooldown_until - now, 0.0, self.bucket.wait_time(now))
+
+    def client(self):
+        """키별 클라이언트 (전역 genai.configure 대신)"""
+        if self._client is None:
+            if self.kind == 'gemini':
+                from google.ai import generativelanguage as glm
+                self._client = glm.GenerativeServiceClient(client_options={'api_key': self.key})
+            else:
+                from groq import Groq
+                self._client = Groq(api_key=self.key)
+        return self._client
+
+    def stream(self, prompt, stats):
+        if self.kind == 'gemini':
+            from google.ai import generativelanguage as glm
+            request = glm.GenerateContentRequest(
+                model=f"models/{GEMINI_MODEL}",
+                contents=[glm.Content(role='user', parts=[glm.Part(text=prompt)])]
+            )
+            tokens = None
+            for chunk in self.client().stream_generate_content(request):
+                # 안전 필터 등으로 텍스트 파트가 없는 청크는 건너뜀
+                text = "".join(part.text for part in chunk.candidates[0].content.parts) if chunk.candidates else ''
+                if text:
+                    stats.on_chunk(text)
+                    yield text
+                if chunk.usage_metadata.candidates_token_count:
+                    tokens = chunk.usage_metadata.candidates_token_count
+            stats.finish(tokens)
+        else:
+            stream = self.client().chat.completions.create(
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                model=GROQ_MODEL,
+                temperature=0.7,
+                max_tokens=2000,
+                stream=True
+            )
+            tokens = None
+            for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    stats.on_chunk(text)
+                    yield text
+                usage = getattr(getattr(chunk, 'x_groq', None), 'usage', None)
+                if usage is not None:
+                    tokens = usage.completion_tokens
+            stats.finish(tokens)
+
+
+def is_rate_limit(error):
+    text = str(error)
+    return '429' in text or 'RESOURCE_EXHAUSTED' in text or 'rate limit' in text.lower()
+
+
+def retry_after(error):
+    m = _RETRY_RE.search(str(error))
+    return float(m.group(1)) if m else DEFAULT_COOLDOWN
+
+
+class ProviderRouter:
+    def __init__(self, providers):
+        self.providers = providers
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait=INTERACTIVE_MAX_WAIT, exclude=(), cancelled=None):
+        """지금 쓸 수 있는 제공자 중 우선순위가 가장 높은 것. 없으면 max_wait까지 대기 (cancelled가 켜지면 중단)"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                candidates = [p for p in self.providers if p not in exclude]
+                if not candidates:
+                    raise RateLimited("no provider left")
+                if cancelled is not None and cancelled.is_set():
+                    raise RateLimited("cancelled")
+                waits = [(p.wait_time(now), i, p) for i, p in enumerate(candidates)]
+                ready = [p for w, _, p in waits if w == 0]
+                if ready:
+                    ready[0].bucket.take(now)
+                    return ready[0]
+                soonest = min(w for w, _, _ in waits)
+            if now + soonest > deadline:
+                raise RateLimited(f"next provider available in {soonest:.0f}s")
+            pause = min(soonest, max(deadline - now, 0.0)) + 0.01
+            if cancelled is not None:
+                cancelled.wait(pause)
+            else:
+                time.sleep(pause)
+
+    def stream(self, prompt, stats, max_wait=INTERACTIVE_MAX_WAIT):
+        """사용 가능한 제공자부터 시도하며 텍스트 조각 yield
+
+        첫 토큰 전에 실패하면 다음 제공자로 넘어가고, 429면 해당 키를 쿨다운시킨다.
+        stats.cancelled가 켜지면 (배치 시간 초과) 대기/스트림을 멈춰 한도를 더 쓰지 않는다.
+        """
+        tried = []
+        last_error = None
+        while True:
+            try:
+                provider = self.acquire(max_wait, exclude=tried, cancelled=stats.cancelled)
+            except RateLimited:
+                if stats.cancelled.is_set():
+                    return
+                if last_error is not None and not is_rate_limit(last_error):
+                    yield f"모든 AI 서비스 실패: {str(last_error)}"
+                else:
+                    yield "모든 API 제한 초과. 잠시 후 다시 시도하세요."
+                return
+            tried.append(provider)
+            stats.provider = provider.name
+            stats.model = provider.model
+            started = False
+            start = time.perf_counter()
+            with self._lock:
+                provider.stats['calls'] += 1
+            try:
+                for text in provider.stream(prompt, stats):
+                    if stats.cancelled.is_set():
+                        self._record(provider, start, 'cancelled')
+                        return
+                    if not started:
+                        started = True
+                        if provider.prefix:
+                            yield provider.prefix
+                    yield text
+                self._record(provider, start, None)
+                stats.ok = started and not stats.cancelled.is_set()
+                return
+            except Exception as e:
+                self._record(provider, start, e)
+                if started:
+                    yield f"\n\n(AI 응답 중단: {str(e)})"
+                    return
+                last_error = e
+
+    def _record(self, provider, start, error):
+        latency = time.perf_counter() - start
+        record(f"ai.{provider.name}", latency, error)
+        with self._lock:
+            s = provider.stats
+            s['latency_total'] += latency
+            s['last_latency'] = latency
+            if error is None:
+                s['ok'] += 1
+                return
+            s['errors'] += 1
+            s['last_error'] = str(error)[:200]
+            if is_rate_limit(error):
+                s['rate_limited'] += 1
+                provider.cooldown_until = time.monotonic() + retry_after(error)
+        print(f"[ai-router] {provider.name} failed after {latency:.1f}s: {str(error)[:120]}")
+
+    def summary(self):
+        """제공자별 호출/성공/오류/429 횟수, 평균 지연, 남은 쿨다운"""
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for p in self.providers:
+                s = dict(p.stats)
+                s['avg_latency'] = s['latency_total'] / s['calls'] if s['calls'] else None
+                s['cooldown'] = max(0.0, p.cooldown_until - now)
+                out[p.name] = s
+        return out
+
+
+_routers = {}
+_routers_lock = threading.Lock()
+
+
+def get_router(keys):
+    """키 조합별 공용 라우터. keys: {'gemini_1', 'gemini_2', 'groq'}"""
+    spec = (
+        ('gemini-1', 'gemini', keys.get('gemini_1'), ''),
+        ('gemini-2', 'gemini', keys.get('gemini_2'), "[Gemini 키2 사용]\n\n"),
+        ('groq', 'groq', keys.get('groq'), "[Groq AI 사용]\n\n"),
+    )
+    cache_key = tuple(key or '' for _, _, key, _ in spec)
+    with _routers_lock:
+        router = _routers.get(cache_key)
+        if router is None:
+            router = ProviderRouter([Provider(name, kind, key, prefix)
+                                     for name, kind, key, prefix in spec if key])
+            _routers[cache_key] = router
+        return router
+
+
+def router_stats():
+    """모든 라우터의 제공자별 카운터 (키 값은 노출하지 않음)"""
+    with _routers_lock:
+        routers = list(_routers.values())
+    merged = {}
+    for router in routers:
+        for name, s in router.summary().items():
+            merged.setdefault(name, []).append(s)
+    return merged
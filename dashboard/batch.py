@@ -0,0 +1,188 @@
+"""헤드리스 AI 리포트 일괄 생성 (cron 등에서 Streamlit 없이 실행)
+
+실행: python -m dashboard.batch NVDA AAPL MSFT [--file tickers.txt] [--out reports] [--workers 3]
+
+종목마다 화면과 같은 파이프라인(주가 → 기업 정보/뉴스/이미지 → 요약 → AI 리포트)을
+제한된 개수의 워커에서 동시에 실행하고, 종목별 Markdown 파일과 manifest.json을 쓴다.
+API 키는 환경 변수(GOOGLE_API_KEY_1 / GOOGLE_API_KEY / GOOGLE_API_KEY_2 / GROQ_API_KEY)나
+.streamlit/secrets.toml의 [general] 섹션에서 읽는다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime
+
+from dashboard.ai_report import (BATCH_MAX_WAIT, BATCH_WORKERS, StreamStats, collect_image_list,
+                                 generate_ai_analysis, summarize_news, summarize_price_data)
+from dashboard.data import get_company_name, get_news, get_prices
+from dashboard.images import get_company_images
+from dashboard.report_cache import get_report_cache, report_flight, report_keys
+from dashboard.telemetry import PROCESS
+from dashboard.watchlist import TooManyTickers, parse_tickers
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRETS_PATH = os.path.join(REPO_DIR, '.streamlit', 'secrets.toml')
+DEFAULT_OUT_DIR = 'reports'
+MANIFEST_NAME = 'manifest.json'
+
+
+def load_keys(secrets_path=SECRETS_PATH):
+    """환경 변수 우선, 없으면 secrets.toml [general] 값 (app.get_ai_keys와 같은 키 이름)"""
+    general = {}
+    if os.path.exists(secrets_path):
+        import tomllib
+        with open(secrets_path, 'rb') as f:
+            general = tomllib.load(f).get('general', {})
+
+    def pick(*names):
+        for name in names:
+            value = os.environ.get(name) or general.get(name)
+            if value:
+                return value
+        return ''
+
+    return {
+        'gemini_1': pick('GOOGLE_API_KEY_1', 'GOOGLE_API_KEY'),
+        'gemini_2': pick('GOOGLE_API_KEY_2'),
+        'groq': pick('GROQ_API_KEY'),
+    }
+
+
+def build_report(ticker, keys, out_dir, reuse=True, max_wait=BATCH_MAX_WAIT):
+    """종목 하나 처리 -> manifest 항목 dict (단계별 소요 시간 포함)"""
+    timings = {}
+    entry = {'ticker': ticker, 'ok': False, 'file': None, 'provider': None, 'cached': False,
+             'error': None, 'timings': timings}
+    started = time.perf_counter()
+
+    def lap(name, since):
+        timings[name] = round(time.perf_counter() - since, 3)
+
+    t = time.perf_counter()
+    df, error_msg = get_prices(ticker)
+    lap('prices', t)
+    if df is None:
+        entry['error'] = error_msg or "주가 데이터 없음"
+        timings['total'] = round(time.perf_counter() - started, 3)
+        return entry
+
+    t = time.perf_counter()
+    news_list = get_news(ticker)
+    lap('news', t)
+    t = time.perf_counter()
+    company_images = get_company_images(ticker, get_company_name(ticker))
+    lap('images', t)
+
+    data_summary = summarize_price_data(ticker, df)
+    news_summary = summarize_news(news_list)
+    image_list = collect_image_list(ticker, company_images, news_list)
+
+    t = time.perf_counter()
+    report_cache = get_report_cache()
+    cache_keys = report_keys(ticker, data_summary, news_summary, image_list, ignore_dates=True)
+    # 다른 배치/화면이 같은 리포트를 만드는 중이면 기다렸다가 저장된 것을 씀
+    with report_flight(cache_keys) if reuse else nullcontext():
+        cached = report_cache.find(cache_keys) if reuse else None
+        if cached:
+            text, entry['provider'], entry['cached'], entry['ok'] = cached['text'], cached['provider'], True, True
+        else:
+            stats = StreamStats()
+            text = generate_ai_analysis(ticker, data_summary, news_summary, image_list, keys, stats, max_wait)
+            entry['provider'], entry['ok'] = stats.provider, stats.ok
+            if stats.ok:
+                report_cache.store(cache_keys, text, ticker, stats)
+            else:
+                entry['error'] = text[:200]
+    lap('ai', t)
+
+    if entry['ok']:
+        path = os.path.join(out_dir, f"{ticker}.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"<!-- {ticker} | {datetime.now().strftime('%Y-%m-%d %H:%M')} | {entry['provider']} -->\n\n")
+            f.write(text)
+            f.write("\n")
+        entry['file'] = os.path.basename(path)
+    timings['total'] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def run_batch(tickers, out_dir=DEFAULT_OUT_DIR, workers=BATCH_WORKERS, keys=None, reuse=True,
+              max_wait=BATCH_MAX_WAIT):
+    """tickers를 workers개 동시 실행 -> manifest dict (manifest.json도 out_dir에 저장)"""
+    keys = keys if keys is not None else load_keys()
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    entries = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        futures = {executor.submit(build_report, t, keys, out_dir, reuse, max_wait): t for t in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                entry = {'ticker': ticker, 'ok': False, 'file': None, 'provider': None, 'cached': False,
+                         'error': str(e)[:200], 'timings': {}}
+            entries[ticker] = entry
+            status = 'ok' if entry['ok'] else f"FAILED ({entry['error']})"
+            print(f"[batch] {ticker}: {status} in {entry['timings'].get('total', 0):.1f}s")
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'elapsed': round(time.perf_counter() - started, 3),
+        'workers': workers,
+        'reports': [entries[t] for t in tickers],
+        # 외부 호출/계산 단계별 누적 소요 시간 (dashboard.telemetry)
+        'spans': [{k: (round(v, 4) if isinstance(v, float) else v) for k, v in row.items()}
+                  for row in PROCESS.rows()],
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def format_timings(manifest):
+    """종목별 단계 소요 시간 표 (텍스트)"""
+    stages = ('prices', 'news', 'images', 'ai', 'total')
+    lines = [f"{'ticker':<8}" + "".join(f"{s:>9}" for s in stages) + "  result"]
+    for entry in manifest['reports']:
+        t = entry['timings']
+        cells = "".join(f"{t[s]:>9.2f}" if s in t else f"{'-':>9}" for s in stages)
+        result = ('cached' if entry['cached'] else entry['provider']) if entry['ok'] else 'failed'
+        lines.append(f"{entry['ticker']:<8}{cells}  {result}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI 리포트 일괄 생성 (헤드리스)")
+    parser.add_argument('tickers', nargs='*', help="티커 목록 (쉼표/공백 구분)")
+    parser.add_argument('--file', help="티커 목록 파일 (쉼표/줄바꿈 구분)")
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help="리포트/manifest 저장 폴더")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help="동시에 처리할 종목 수")
+    parser.add_argument('--max-wait', type=float, default=BATCH_MAX_WAIT, help="AI 한도가 빌 때까지 기다릴 최대 시간(초)")
+    parser.add_argument('--no-reuse', action='store_true', help="저장된 리포트를 재사용하지 않음")
+    args = parser.parse_args(argv)
+
+    text = " ".join(args.tickers)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            text += "\n" + f.read()
+    try:
+        tickers = parse_tickers(text)
+    except TooManyTickers as e:
+        parser.error(f"{e} 목록을 나눠서 실행하세요")
+    if not tickers:
+        parser.error("티커를 하나 이상 지정하세요")
+
+    manifest = run_batch(tickers, args.out, max(1, args.workers), reuse=not args.no_reuse, max_wait=args.max_wait)
+    print(format_timings(manifest))
+    failed = sum(not entry['ok'] for entry in manifest['reports'])
+    print(f"[batch] {len(tickers) - failed}/{len(tickers)} reports in {manifest['elapsed']:.1f}s -> {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""주가/거래량 차트 생성
+
+긴 히스토리(10~20년 일봉, 분봉)에서도 figure JSON이 커지지 않도록
+  - 보이는 구간(viewport)만 잘라낸 뒤
+  - 봉을 버킷으로 묶어 OHLC를 유지한 채 다운샘플링 (시가=첫 값, 고가=최대, 저가=최소,
+    종가=마지막 값, 거래량=합계)
+  - 포인트 수가 많으면 Scattergl(WebGL) 트레이스를 사용한다.
+생성된 figure는 (ticker, 기간, 해상도, 마지막 봉) 단위로 캐시된다.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from dashboard.indicators import get_indicators
+from dashboard.telemetry import timed
+
+# 기간 선택지 -> 표시할 일수 (None = 전체)
+CHART_RANGES = {'3M': 92, '6M': 183, '1Y': 365, '5Y': 5 * 365, '10Y': 10 * 365, '20Y': 20 * 365, 'MAX': None}
+MAX_HISTORY_DAYS = 40 * 365
+DEFAULT_RESOLUTION = 1200       # 화면에 그릴 최대 봉 개수 (대략 차트 가로 픽셀 수)
+WEBGL_THRESHOLD = 800           # 이보다 포인트가 많으면 캔들 대신 WebGL 라인 사용
+FIGURE_CACHE_SIZE = 64
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+
+
+def slice_viewport(df, range_key):
+    days = CHART_RANGES.get(range_key)
+    if days is None or df.empty:
+        return df
+    return df[df.index >= df.index[-1] - pd.Timedelta(days=days)]
+
+
+def bucket_starts(n, max_points):
+    """n개 봉을 최대 max_points개 버킷으로 나눈 시작 인덱스 (마지막 버킷이 최신 봉으로 끝나도록)"""
+    size = -(-n // max_points) if n > max_points else 1
+    # 최신 구간이 잘리지 않도록 끝에서부터 버킷을 나눔
+    starts = np.arange(n - size, -1, -size)[::-1]
+    if starts.size == 0 or starts[0] != 0:
+        starts = np.concatenate(([0], starts))
+    return starts
+
+
+def downsample_ohlcv(df, max_points, extra=None):
+    """OHLCV(+지표 배열 dict)를 max_points 이하로 다운샘플링 -> (DataFrame, extra dict)"""
+    n = len(df)
+    if n <= max_points:
+        return df, extra or {}
+    starts = bucket_starts(n, max_points)
+    ends = np.concatenate((starts[1:], [n])) - 1
+    o = df['Open'].to_numpy(dtype=np.float64)
+    h = df['High'].to_numpy(dtype=np.float64)
+    l = df['Low'].to_numpy(dtype=np.float64)
+    c = df['Close'].to_numpy(dtype=np.float64)
+    v = df['Volume'].to_numpy(dtype=np.float64)
+    out = pd.DataFrame({
+        'Open': o[starts],
+        'High': np.maximum.reduceat(h, starts),
+        'Low': np.minimum.reduceat(l, starts),
+        'Close': c[ends],
+        'Volume': np.add.reduceat(np.nan_to_num(v), starts),
+    }, index=df.index[starts])
+    # 지표는 버킷 종가 시점의 값을 사용
+    return out, {k: np.asarray(arr)[ends] for k, arr in (extra or {}).items()}
+
+
+@timed('chart.build')
+def build_price_chart(ticker, df, range_key='1Y', resolution=DEFAULT_RESOLUTION):
+    """캔들(또는 WebGL 라인) + MA20/MA60 + 거래량 figure 생성"""
+    indicators = get_indicators(ticker, df)
+    ma = {k: indicators[k] for k in ('sma_20', 'sma_60') if k in indicators}
+
+    view = slice_viewport(df, range_key)
+    offset = len(df) - len(view)
+    view_ma = {k: arr[offset:] for k, arr in ma.items()}
+    data, data_ma = downsample_ohlcv(view, resolution, view_ma)
+    use_webgl = len(data) > WEBGL_THRESHOLD
+    line_trace = go.Scattergl if use_webgl else go.Scatter
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        vertical_spacing=0.03,
+                        subplot_titles=(f'{ticker} Price Chart', 'Volume'),
+                        row_heights=[0.7, 0.3])
+
+    if use_webgl:
+        fig.add_trace(go.Scattergl(x=data.index, y=data['Close'], mode='lines',
+                                   line=dict(color='#26a69a', width=1), name='Close'), row=1, col=1)
+    else:
+        fig.add_trace(go.Candlestick(
+            x=data.index,
+            open=data['Open'],
+            high=data['High'],
+            low=data['Low'],
+            close=data['Close'],
+            name='OHLC'
+        ), row=1, col=1)
+
+    for key, color, name in (('sma_20', 'orange', 'MA 20'), ('sma_60', 'purple', 'MA 60')):
+        if key in data_ma:
+            fig.add_trace(line_trace(x=data.index, y=data_ma[key], opacity=0.7,
+                                     line=dict(color=color, width=2), name=name), row=1, col=1)
+
+    # 거래량 (색상: 하락=red, 상승=green) - 봉마다 문자열 대신 0/1 + colorscale
+    up = (data['Close'].to_numpy() >= data['Open'].to_numpy()).astype(np.int8)
+    fig.add_trace(go.Bar(
+        x=data.index,
+        y=data['Volume'],
+        marker=dict(color=up, colorscale=[[0, 'red'], [1, 'green']], cmin=0, cmax=1),
+        name='Volume'
+    ), row=2, col=1)
+
+    fig.update_layout(
+        height=600,
+        showlegend=True,
+        xaxis_rangeslider_visible=False,
+        title_text=f"{ticker} Analysis Chart"
+    )
+    return fig
+
+
+def get_price_chart(ticker, df, range_key='1Y', resolution=DEFAULT_RESOLUTION):
+    """(ticker, 기간, 해상도, 마지막 봉) 단위로 캐시된 figure 반환"""
+    if df is None or df.empty:
+        return None
+    key = (ticker, range_key, resolution, df.index[-1], len(df), float(df['Close'].iloc[-1]))
+    with _figures_lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            _figures.move_to_end(key)
+            return fig
+    fig = build_price_chart(ticker, df, range_key, resolution)
+    with _figures_lock:
+        _figures[key] = fig
+        while len(_figures) > FIGURE_CACHE_SIZE:
+            _figures.popitem(last=False)
+    return fig
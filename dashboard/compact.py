@@ -0,0 +1,75 @@
+"""캐시에 오래 남는 값의 압축 표현 (주가 프레임 / 기업 정보) + 메모리 측정
+
+  - 주가: OHLC/Adj Close는 float32로 바꿔도 오차가 PRICE_TOLERANCE 이하일 때만 float32,
+    거래량은 정수이고 범위 안이면 uint32. 각 열은 읽기 전용 배열로 두어 캐시 적중 시
+    복사 없이 그대로 돌려준다 (수정하려 하면 ValueError).
+  - 기업 정보: yfinance info(수백 개 키) 중 화면/리포트가 쓰는 INFO_FIELDS만 남김
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+PRICE_TOLERANCE = 5e-4          # float32 변환 허용 오차 (달러, 0.05센트)
+INFO_FIELDS = ('currentPrice', 'regularMarketPrice', 'marketCap', 'trailingPE', 'longName', 'shortName')
+
+
+def _readonly(arr):
+    arr = np.ascontiguousarray(arr)
+    arr.setflags(write=False)
+    return arr
+
+
+def _compact_price(values):
+    values = np.asarray(values, dtype=np.float64)
+    small = values.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        err = np.nanmax(np.abs(small - values)) if len(values) else 0.0
+    return small if not err > PRICE_TOLERANCE else values
+
+
+def _compact_volume(values):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) and np.isfinite(values).all() and (values >= 0).all() \
+            and values.max() < 2 ** 32 and (values == np.floor(values)).all():
+        return values.astype(np.uint32)
+    return values
+
+
+def compact_prices(df):
+    """일봉 DataFrame -> 같은 인덱스/컬럼의 압축 + 읽기 전용 DataFrame"""
+    if df is None or df.empty:
+        return df
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col in PRICE_COLUMNS:
+            values = _compact_price(values)
+        elif col == 'Volume':
+            values = _compact_volume(values)
+        columns[col] = _readonly(values)
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def slim_info(info):
+    """info dict에서 INFO_FIELDS만 (값이 없는 키는 생략)"""
+    return {k: info[k] for k in INFO_FIELDS if info.get(k) is not None} if info else {}
+
+
+def deep_sizeof(obj, _seen=None):
+    """캐시 값이 차지하는 대략적인 바이트 수 (DataFrame / 배열 / dict / list / tuple)"""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    return size
@@ -0,0 +1,87 @@
+"""대시보드 데이터 단계 (주가 / 기업 정보 / 뉴스)
+
+각 단계는 갱신 주기가 달라 별도로 캐시한다.
+  - 주가: 1분 (장 마감 후에는 price_store가 로컬에서만 읽으므로 갱신 비용이 거의 없음)
+  - 뉴스: 15분
+  - 기업 정보: 하루
+캐시에는 압축한 값(float32 주가 프레임, 필요한 필드만 남긴 info)을 넣어 종목/세션이 늘어도
+메모리가 덜 늘어나게 한다. 반환값은 복사본이 아니므로 수정하지 않는다.
+주가/정보/뉴스는 공유 캐시(shared_cache)에도 저장해 다른 워커 프로세스가 같은 종목을 다시 받지 않는다.
+"""
+from dashboard.compact import compact_prices, slim_info
+from dashboard.info import fetch_info
+from dashboard.news import get_hybrid_news
+from dashboard.price_store import HISTORY_DAYS, load_prices
+from dashboard.stage_cache import cached_stage
+from dashboard.watchlist import build_watchlist_summary
+
+PRICE_TTL = 60
+NEWS_TTL = 15 * 60
+INFO_TTL = 24 * 3600
+WATCHLIST_TTL = 5 * 60
+
+
+def _restore_prices(value):
+    # 공유 캐시에서 읽은 프레임은 쓰기 가능한 배열이므로 다시 읽기 전용으로
+    df, error_msg = value
+    return (None if df is None else compact_prices(df)), error_msg
+
+
+@cached_stage('prices', ttl=PRICE_TTL, max_entries=256, shared=True, restore=_restore_prices)
+def get_prices(ticker, days=HISTORY_DAYS):
+    """일봉 -> (df 또는 None, error_msg)"""
+    df, error_msg = load_prices(ticker, days)
+    return (None if df.empty else compact_prices(df)), error_msg
+
+
+@cached_stage('info', ttl=INFO_TTL, max_entries=256, shared=True)
+def get_info(ticker):
+    """실패하면 예외 (실패 결과는 캐시하지 않고 다음 요청에서 다시 조회)"""
+    return slim_info(fetch_info(ticker))
+
+
+def get_info_or_empty(ticker):
+    try:
+        return get_info(ticker) or {}
+    except Exception as e:
+        print(f"Info fetch error ({ticker}): {e}")
+        return {}
+
+
+def get_company_name(ticker):
+    info = get_info_or_empty(ticker)
+    return info.get('longName', info.get('shortName', ticker))
+
+
+@cached_stage('news', ttl=NEWS_TTL, max_entries=128, shared=True)
+def get_news(ticker):
+    return get_hybrid_news(ticker)
+
+
+def get_dashboard_data(ticker):
+    """주가, 정보, 뉴스를 각 단계 캐시에서 모아 반환"""
+    df, error_msg = get_prices(ticker)
+    info = get_info_or_empty(ticker)
+    news = get_news(ticker)
+    return df, info, news, error_msg
+
+
+TICKER_STAGES = (('prices', get_prices), ('info', get_info), ('news', get_news))
+
+
+def cache_memory():
+    """종목별 단계 캐시 메모리 -> [{ticker, prices, info, news, total}] (바이트, 큰 순)"""
+    rows = {}
+    for name, stage in TICKER_STAGES:
+        for (args, _), size in stage.cache.memory_by_key().items():
+            row = rows.setdefault(args[0], {'ticker': args[0], 'prices': 0, 'info': 0, 'news': 0})
+            row[name] += size
+    for row in rows.values():
+        row['total'] = row['prices'] + row['info'] + row['news']
+    return sorted(rows.values(), key=lambda r: r['total'], reverse=True)
+
+
+@cached_stage('watchlist', ttl=WATCHLIST_TTL, max_entries=16)
+def get_watchlist_data(tickers, with_news):
+    """워치리스트 요약 (tickers는 캐시 키를 위해 tuple)"""
+    return build_watchlist_summary(list(tickers), with_news=with_news)
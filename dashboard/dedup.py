@@ -0,0 +1,96 @@
+"""뉴스 제목 중복 제거 엔진
+
+기존 방식은 새 제목을 지금까지 남긴 모든 제목과 SequenceMatcher로 비교(O(n²))했다.
+여기서는 단어 토큰 역색인으로 토큰을 하나라도 공유하는 제목만 후보로 추린 뒤, 길이 조건 →
+quick_ratio 상한 → ratio 순서로 걸러서 실제 비교 횟수를 줄인다. 드문 토큰을 공유하는 후보부터
+비교하므로 중복은 보통 몇 번 만에 찾는다. 공유 토큰이 하나도 없는 제목끼리는 비교하지 않으므로
+그런 쌍에서만 기존 similar() 전수 비교와 판정이 달라질 수 있다.
+"""
+import re
+import threading
+from difflib import SequenceMatcher
+
+SIMILARITY_THRESHOLD = 0.8
+# 이보다 많은 제목에 등장하는 토큰(티커명, 'stock' 등)을 공유하는 후보는 나중에 비교
+MAX_POSTINGS = 64
+
+_TOKEN_RE = re.compile(r'[0-9a-z가-힣]{2,}')
+
+
+def similar(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def normalize(title):
+    return (title or '').lower()
+
+
+class TitleDeduper:
+    """제목을 순서대로 넣으며 중복 여부를 판정. 여러 티커(워치리스트)에서 공유 가능"""
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_postings=MAX_POSTINGS):
+        self.threshold = threshold
+        self.max_postings = max_postings
+        self._titles = []           # 남긴 제목 (정규화)
+        self._exact = set()
+        self._postings = {}         # token -> [title index]
+        self._lock = threading.Lock()
+        self.comparisons = 0        # 실제 ratio() 호출 횟수
+
+    def __len__(self):
+        return len(self._titles)
+
+    def _candidates(self, tokens):
+        """토큰을 공유하는 제목 번호 - 드문 토큰 후보 먼저, 흔한 토큰만 공유하는 후보는 그 뒤에"""
+        postings = [self._postings[t] for t in tokens if t in self._postings]
+        rare = set()
+        for posting in postings:
+            if len(posting) <= self.max_postings:
+                rare.update(posting)
+        yield from rare
+        seen = set(rare)
+        for posting in postings:
+            if len(posting) > self.max_postings:
+                for idx in posting:
+                    if idx not in seen:
+                        seen.add(idx)
+                        yield idx
+
+    def _is_duplicate(self, text, tokens):
+        if text in self._exact:
+            return True
+        n = len(text)
+        for idx in self._candidates(tokens):
+            other = self._titles[idx]
+            m = len(other)
+            # ratio <= 2*min/(n+m) 이므로 길이 차이가 크면 비교 불필요
+            if 2.0 * min(n, m) / ((n + m) or 1) <= self.threshold:
+                continue
+            matcher = SequenceMatcher(None, text, other)
+            if matcher.quick_ratio() <= self.threshold:
+                continue
+            self.comparisons += 1
+            if matcher.ratio() > self.threshold:
+                return True
+        return False
+
+    def add(self, title):
+        """새 제목이면 등록하고 True, 기존 제목과 유사하면 False"""
+        text = normalize(title)
+        tokens = set(_TOKEN_RE.findall(text))
+        with self._lock:
+            if self._is_duplicate(text, tokens):
+                return False
+            idx = len(self._titles)
+            self._titles.append(text)
+            self._exact.add(text)
+            for token in tokens:
+                self._postings.setdefault(token, []).append(idx)
+            return True
+
+
+def dedup_news(items, deduper=None):
+    """제목 유사도 기준 중복 제거 (입력 순서 유지, 앞의 항목 우선)"""
+    if deduper is None:
+        deduper = TitleDeduper()
+    return [item for item in items if item.get('title') and deduper.add(item['title'])]
@@ -0,0 +1,121 @@
+"""여러 외부 소스를 동시에 호출하는 fan-out 유틸리티"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dashboard.telemetry import record, run_in_context
+
+MAX_WORKERS = 8
+QUEUE_POLL = 0.05            # 대기 중인 소스의 시작 여부를 확인하는 간격
+
+
+def fan_out(sources, total_timeout=15.0, max_workers=MAX_WORKERS, on_result=None, span=None,
+            on_timeout=None, source_spans=False):
+    """소스 목록을 bounded thread pool에서 동시에 실행
+
+    sources: [(name, fn, deadline_sec), ...] - fn은 인자 없는 callable
+    on_result: 소스 하나가 끝날 때마다 도착 순서대로 호출되는 콜백 (name, value)
+    on_timeout: 소스가 timeout 처리될 때 호출되는 콜백 (name) - 남은 스레드에 중단을 알릴 때 사용
+    span: 지정하면 fan_out 전체를 "<span>" 하나로 telemetry에 기록 (실패가 있으면 "k/n failed" 오류)
+    source_spans: 소스 이름이 고정된 목록일 때만 True - 소스마다 "<span>.<name>" 도 기록
+      (티커처럼 입력마다 달라지는 이름은 행/라벨이 끝없이 늘어나므로 로그 줄로만 남김)
+
+    반환: (results, report)
+      results: {name: value} - 성공한 소스만 포함
+      report: [{'source', 'ok', 'latency', 'error'}, ...] - sources 순서 유지
+
+    deadline은 워커가 그 소스를 실제로 시작한 시점부터 잰다 (max_workers 뒤에서 대기하는
+    시간은 포함하지 않음). 느린 소스는 자신의 deadline 또는 전체 예산(total_timeout)이 지나면
+    'timeout'으로 기록하고 기다리지 않는다. (스레드는 백그라운드에서 마저 끝남)
+    latency도 소스가 시작된 시점부터 (시작도 못 했으면 fan_out 시작부터) 잰다.
+    """
+    results = {}
+    report = {}
+    if not sources:
+        return results, []
+
+    start = time.monotonic()
+    budget_end = start + total_timeout
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(sources)))
+    pending = {}
+    limits = {}
+    started = {}
+
+    def starting(name, fn):
+        def run():
+            started[name] = time.monotonic()
+            return fn()
+        return run
+
+    def elapsed(name, now):
+        return now - started.get(name, start)
+
+    try:
+        for name, fn, deadline in sources:
+            # 워커에서도 호출한 쪽 세션으로 telemetry가 쌓이도록 context를 넘김
+            future = executor.submit(run_in_context(starting(name, fn)))
+            pending[future] = name
+            limits[name] = deadline
+
+        while pending:
+            now = time.monotonic()
+            # 시작한 지 deadline이 지난 소스는 timeout 처리
+            for future in [f for f in pending if not f.done() and pending[f] in started
+                           and started[pending[f]] + limits[pending[f]] <= now]:
+                name = pending.pop(future)
+                report[name] = {'source': name, 'ok': False, 'latency': elapsed(name, now), 'error': 'timeout'}
+                if on_timeout is not None:
+                    on_timeout(name)
+            if not pending:
+                break
+
+            wake = budget_end
+            for future, name in pending.items():
+                if name in started:
+                    wake = min(wake, started[name] + limits[name])
+                elif not future.done():
+                    # 대기 중인 소스가 언제 시작될지 모르므로 (timeout된 스레드가 워커를 비울 때) 짧게 확인
+                    wake = min(wake, now + QUEUE_POLL)
+            done, _ = wait(list(pending), timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                latency = elapsed(name, time.monotonic())
+                try:
+                    value = future.result()
+                except Exception as e:
+                    report[name] = {'source': name, 'ok': False,
+                                    'latency': latency, 'error': f"{type(e).__name__}: {e}"}
+                    continue
+                results[name] = value
+                report[name] = {'source': name, 'ok': True, 'latency': latency, 'error': None}
+                if on_result is not None:
+                    on_result(name, value)
+
+            if time.monotonic() >= budget_end:
+                now = time.monotonic()
+                for future, name in pending.items():
+                    future.cancel()
+                    report[name] = {'source': name, 'ok': False, 'latency': elapsed(name, now), 'error': 'timeout'}
+                    if on_timeout is not None:
+                        on_timeout(name)
+                pending.clear()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    ordered = [report[name] for name, _, _ in sources if name in report]
+    if span:
+        failed = [r['source'] for r in ordered if not r['ok']]
+        error = f"{len(failed)}/{len(ordered)} failed: {', '.join(failed)}" if failed else None
+        record(span, time.monotonic() - start, error)
+        if source_spans:
+            for r in ordered:
+                record(f"{span}.{r['source']}", r['latency'], r['error'])
+    return results, ordered
+
+
+def format_report(report):
+    """fan_out 리포트를 로그용 한 줄 문자열로 변환"""
+    parts = []
+    for r in report:
+        status = 'ok' if r['ok'] else f"FAIL({r['error']})"
+        parts.append(f"{r['source']}={r['latency']:.2f}s {status}")
+    return ", ".join(parts)
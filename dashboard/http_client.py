@@ -0,0 +1,187 @@
+"""공용 HTTP 클라이언트 (커넥션 풀 + 호스트별 동시성/속도 제한 + 재시도)
+
+모든 수집기가 같은 requests.Session을 써서 keep-alive 연결을 재사용하고,
+호스트마다 동시 요청 수와 초당 요청 수를 제한한다. 요청별 소요 시간은 호스트 단위로 집계된다.
+DuckDuckGo처럼 자체 클라이언트를 쓰는 라이브러리는 host_slot()으로 같은 제한을 적용한다.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from dashboard import telemetry
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.5              # 재시도 대기: 0.5s, 1s, 2s ... (+지터)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+POOL_SIZE = 16
+
+# 호스트별 (최대 동시 요청 수, 초당 요청 수)
+HOST_LIMITS = {
+    'news.google.com': (4, 5.0),
+    'duckduckgo.com': (2, 2.0),
+    'translate.google.com': (2, 5.0),
+}
+DEFAULT_HOST_LIMIT = (6, 10.0)
+
+
+class HostLimiter:
+    """호스트 하나의 동시성 세마포어 + 요청 시작 간격 제한"""
+
+    def __init__(self, max_concurrent, per_second):
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        with self.semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class HttpClient:
+    def __init__(self, pool_size=POOL_SIZE):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+        self._limiters = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, host):
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = HostLimiter(*HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+            return limiter
+
+    def record(self, host, elapsed, error=None, retried=False):
+        """error: 실패했으면 예외나 설명 문자열 (telemetry에 마지막 오류로 남음)"""
+        telemetry.record(f"http.{host}", elapsed, error or None)
+        with self._lock:
+            s = self._stats.setdefault(host, {'requests': 0, 'errors': 0, 'retries': 0,
+                                              'total_time': 0.0, 'max_time': 0.0})
+            s['requests'] += 1
+            s['total_time'] += elapsed
+            s['max_time'] = max(s['max_time'], elapsed)
+            if error:
+                s['errors'] += 1
+            if retried:
+                s['retries'] += 1
+
+    def request(self, method, url, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, **kwargs):
+        """호스트 제한 안에서 요청. 연결 오류/429/5xx는 지수 백오프로 재시도"""
+        host = urlsplit(url).hostname or ''
+        limiter = self.limiter(host)
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                with limiter.slot():
+                    resp = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.record(host, time.perf_counter() - start, error=e, retried=attempt < retries)
+                if attempt == retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            retryable = resp.status_code in RETRY_STATUS and attempt < retries
+            error = f"HTTP {resp.status_code}" if resp.status_code >= 400 else None
+            self.record(host, time.perf_counter() - start, error=error, retried=retryable)
+            if not retryable:
+                return resp
+            delay = self._retry_after(resp) or self._backoff(attempt)
+            resp.close()
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    @staticmethod
+    def _backoff(attempt):
+        return BACKOFF_BASE * (2 ** attempt) * (1 + random.random() * 0.25)
+
+    @staticmethod
+    def _retry_after(resp):
+        try:
+            return min(float(resp.headers.get('Retry-After', '')), 30.0)
+        except ValueError:
+            return None
+
+    def stats(self):
+        """호스트별 요청 수 / 오류 / 재시도 / 평균·최대 소요 시간"""
+        with self._lock:
+            out = {}
+            for host, s in self._stats.items():
+                out[host] = dict(s, avg_time=s['total_time'] / s['requests'] if s['requests'] else 0.0)
+            return out
+
+
+_client = None
+_client_lock = threading.Lock()
+_ddgs_pool = []                 # 쉬고 있는 DDGS 인스턴스 (최대 duckduckgo.com 동시 요청 수만큼 생김)
+_ddgs_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 공용 HttpClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+@contextmanager
+def host_slot(host):
+    """requests를 쓰지 않는 라이브러리 호출에도 같은 호스트 제한/통계 적용"""
+    client = get_client()
+    start = time.perf_counter()
+    failed = None
+    try:
+        with client.limiter(host).slot():
+            yield
+    except Exception as e:
+        failed = e
+        raise
+    finally:
+        client.record(host, time.perf_counter() - start, error=failed)
+
+
+@contextmanager
+def ddgs_session():
+    """duckduckgo.com 호스트 제한 안에서 DDGS 인스턴스를 풀에서 빌려 씀
+
+    fan_out이 호출마다 새 스레드 풀을 만들기 때문에 스레드별 인스턴스는 거의 재사용되지 않았다.
+    DDGS는 스레드 안전하지 않으므로 인스턴스는 한 번에 한 스레드만 쓰고, 풀 크기는 호스트
+    세마포어가 허용하는 동시 요청 수를 넘지 않는다 (슬롯 안에서만 빌리므로).
+    """
+    with host_slot('duckduckgo.com'):
+        with _ddgs_lock:
+            ddgs = _ddgs_pool.pop() if _ddgs_pool else None
+        if ddgs is None:
+            from duckduckgo_search import DDGS
+            ddgs = DDGS()
+        try:
+            yield ddgs
+        finally:
+            with _ddgs_lock:
+                _ddgs_pool.append(ddgs)
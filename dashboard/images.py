@@ -0,0 +1,165 @@
+"""기업 대표 이미지 서비스 (DuckDuckGo 이미지 검색 + 영속 캐시 + 로컬 썸네일)
+
+검색 결과는 (티커, 검색 키워드) 단위로 KVStore에 TTL과 함께 저장해 rerun마다
+검색하지 않는다. thumbnails=True면 원본 이미지를 한 번 내려받아 작은 JPEG 썸네일을
+디스크에 만들고, 화면은 원격 원본 대신 로컬 파일을 표시한다.
+워치리스트 종목은 prefetch_company_images로 백그라운드에서 미리 채울 수 있다.
+"""
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dashboard.http_client import ddgs_session, get_client
+from dashboard.kvstore import CACHE_DIR, KVStore
+from dashboard.shared_cache import get_shared
+from dashboard.telemetry import span, timed
+
+IMAGE_COUNT = 4
+HIT_TTL = 7 * 24 * 3600
+MISS_TTL = 3600                 # 검색 결과 없음 / 실패
+THUMB_DIR = os.path.join(CACHE_DIR, 'thumbs')
+THUMB_SIZE = (480, 320)
+THUMB_MAX_BYTES = 8 * 1024 * 1024
+THUMB_TIMEOUT = 8.0
+PREFETCH_WORKERS = 2
+
+# 티커별 핵심 제품 키워드 매핑
+PRODUCT_KEYWORDS = {
+    'NVDA': 'data center GPU AI chip H100',
+    'AAPL': 'iPhone MacBook Apple products',
+    'MSFT': 'Azure cloud Microsoft Office',
+    'GOOGL': 'Google Search AI Cloud',
+    'GOOG': 'Google Search AI Cloud',
+    'AMZN': 'AWS cloud Amazon warehouse',
+    'META': 'Facebook Instagram VR Quest',
+    'TSLA': 'Tesla Model electric car',
+    'AMD': 'AMD EPYC Ryzen processor',
+    'INTC': 'Intel processor data center',
+}
+
+_cache = None
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='image-prefetch')
+_prefetching = set()
+_prefetch_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = KVStore('company_images')
+    return _cache
+
+
+def image_keyword(ticker, company_name=""):
+    """티커에 맞는 키워드 사용, 없으면 기본값"""
+    return PRODUCT_KEYWORDS.get(ticker, f"{company_name or ticker} main product")
+
+
+@timed('images.search')
+def search_images(keyword, max_results=IMAGE_COUNT):
+    """DuckDuckGo 이미지 검색 (실패 시 예외)"""
+    with ddgs_session() as ddgs:
+        results = list(ddgs.images(keyword, max_results=max_results))
+    return [{'url': r.get('image', ''), 'title': r.get('title', ''), 'source': r.get('source', '')}
+            for r in results]
+
+
+def thumbnail_path(url):
+    return os.path.join(THUMB_DIR, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.jpg')
+
+
+def make_thumbnail(url):
+    """원본을 내려받아 썸네일 JPEG로 저장 -> 파일 경로 (실패 시 '')"""
+    path = thumbnail_path(url)
+    if os.path.exists(path):
+        return path
+    try:
+        from PIL import Image
+    except ImportError:
+        return ''
+    try:
+        with span('images.thumbnail'):
+            with get_client().get(url, timeout=THUMB_TIMEOUT, retries=0, stream=True) as resp:
+                if resp.status_code != 200:
+                    return ''
+                buf = io.BytesIO()
+                for chunk in resp.iter_content(chunk_size=65536):
+                    buf.write(chunk)
+                    if buf.tell() > THUMB_MAX_BYTES:
+                        return ''
+            buf.seek(0)
+            with Image.open(buf) as img:
+                img = img.convert('RGB')
+                img.thumbnail(THUMB_SIZE)
+                os.makedirs(THUMB_DIR, exist_ok=True)
+                # 다른 스레드가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                img.save(tmp, 'JPEG', quality=82)
+                os.replace(tmp, path)
+            return path
+    except Exception as e:
+        print(f"[images] thumbnail failed for {url[:80]}: {e}")
+        return ''
+
+
+def _needs_thumbnail(img):
+    # 실패한 이미지는 thumb=''로 남겨 다시 시도하지 않음, 파일이 지워졌으면 다시 만듦
+    if not img.get('url') or img.get('thumb') == '':
+        return False
+    return 'thumb' not in img or not os.path.exists(img['thumb'])
+
+
+def get_company_images(ticker, company_name="", thumbnails=False):
+    """기업 핵심 제품 이미지 최대 4장 [{url, title, source, thumb}] (캐시 우선)"""
+    keyword = image_keyword(ticker, company_name)
+    key = f"{ticker}|{keyword}"
+    cache = get_cache()
+    images = cache.get(key)
+    if images is None:
+        # 다른 세션/프로세스가 같은 종목을 검색 중이면 그 결과를 기다림
+        with get_shared('company_images').single_flight(key, ready=lambda: cache.get(key) is not None):
+            images = cache.get(key)
+            if images is None:
+                try:
+                    images = search_images(keyword)
+                    cache.set(key, images, ttl=HIT_TTL if images else MISS_TTL)
+                except Exception as e:
+                    print(f"Image search error: {e}")
+                    return []
+
+    if thumbnails and any(_needs_thumbnail(img) for img in images):
+        for img in images:
+            if _needs_thumbnail(img):
+                img['thumb'] = make_thumbnail(img['url'])
+        # 만든 썸네일 경로도 함께 저장
+        cache.set(key, images, ttl=HIT_TTL)
+    return images
+
+
+def _prefetch_one(ticker, name_lookup, thumbnails):
+    try:
+        name = name_lookup(ticker) if name_lookup and ticker not in PRODUCT_KEYWORDS else ""
+        get_company_images(ticker, name, thumbnails)
+    except Exception as e:
+        print(f"[images] prefetch failed for {ticker}: {e}")
+    finally:
+        with _prefetch_lock:
+            _prefetching.discard(ticker)
+
+
+def prefetch_company_images(tickers, name_lookup=None, thumbnails=False):
+    """종목 이미지 캐시를 백그라운드에서 미리 채움. 새로 예약한 종목 수 반환
+
+    name_lookup(ticker) -> 회사 이름 (키워드 매핑이 없는 종목에만 호출)
+    """
+    queued = 0
+    for ticker in tickers:
+        with _prefetch_lock:
+            if ticker in _prefetching:
+                continue
+            _prefetching.add(ticker)
+        _prefetch_executor.submit(_prefetch_one, ticker, name_lookup, thumbnails)
+        queued += 1
+    return queued
@@ -0,0 +1,301 @@
+"""기술적 지표 계산 엔진
+
+OHLC를 연속된 float64 배열로 한 번 꺼낸 뒤 설정된 지표를 NumPy로 한 번에 계산한다.
+결과 배열은 읽기 전용이며 티커별로 메모이즈된다. 같은 첫 봉에서 시작하는 프레임에 새 봉이
+뒤에 붙은 경우에는 전체를 다시 계산하지 않고, 캐시된 배열의 마지막 값으로 만든
+IncrementalIndicators 상태에서 이어서 계산한다. 첫 봉이 바뀌면(기간이 밀린 창) EMA 시작값과
+고점이 달라지므로 전체를 다시 계산한다.
+
+지표 스펙은 "이름:기간" 문자열 (예: "sma:20", "rsi:14", "macd:12:26:9").
+"""
+import copy
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dashboard.telemetry import timed
+
+DEFAULT_SPECS = ('sma:20', 'sma:60', 'ema:20', 'rsi:14', 'macd:12:26:9', 'bb:20:2', 'atr:14', 'drawdown')
+MEMO_SIZE = 256
+
+
+def parse_spec(spec):
+    name, *params = spec.split(':')
+    return name, [float(p) if '.' in p else int(p) for p in params]
+
+
+def _as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _sma(x, n):
+    out = np.full(x.shape, np.nan)
+    if len(x) >= n:
+        c = np.concatenate(([0.0], np.cumsum(x)))
+        out[n - 1:] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def _ema(x, alpha):
+    # 재귀 필터라 순수 벡터화가 어려워 pandas의 C 구현을 사용 (adjust=False: 표준 EMA)
+    return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _rolling_std(x, n):
+    out = np.full(x.shape, np.nan)
+    if len(x) >= n:
+        out[n - 1:] = sliding_window_view(x, n).std(axis=1)
+    return out
+
+
+def _true_range(high, low, close):
+    prev_close = np.concatenate(([close[0]], close[:-1])) if len(close) else close
+    return np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+
+
+@timed('indicators.compute')
+def compute_indicators(high, low, close, specs=DEFAULT_SPECS):
+    """지표 배열 dict 반환 (모든 배열 길이 = len(close))"""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    out = {}
+    for spec in specs:
+        name, p = parse_spec(spec)
+        if name == 'sma':
+            out[f'sma_{p[0]}'] = _sma(close, p[0])
+        elif name == 'ema':
+            out[f'ema_{p[0]}'] = _ema(close, 2.0 / (p[0] + 1))
+        elif name == 'rsi':
+            delta = np.diff(close, prepend=close[:1])
+            avg_gain = _ema(np.clip(delta, 0, None), 1.0 / p[0])
+            avg_loss = _ema(np.clip(-delta, 0, None), 1.0 / p[0])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            rsi[avg_loss == 0] = 100.0
+            rsi[:p[0]] = np.nan
+            out[f'rsi_{p[0]}'] = rsi
+        elif name == 'macd':
+            fast, slow, signal = p
+            macd = _ema(close, 2.0 / (fast + 1)) - _ema(close, 2.0 / (slow + 1))
+            macd_signal = _ema(macd, 2.0 / (signal + 1))
+            out['macd'] = macd
+            out['macd_signal'] = macd_signal
+            out['macd_hist'] = macd - macd_signal
+        elif name == 'bb':
+            n, k = p
+            mid = _sma(close, n)
+            std = _rolling_std(close, n)
+            out[f'bb_mid_{n}'] = mid
+            out[f'bb_upper_{n}'] = mid + k * std
+            out[f'bb_lower_{n}'] = mid - k * std
+        elif name == 'atr':
+            out[f'atr_{p[0]}'] = _ema(_true_range(high, low, close), 1.0 / p[0])
+        elif name == 'drawdown':
+            out['drawdown'] = close / np.maximum.accumulate(close) - 1.0 if len(close) else close.copy()
+        else:
+            raise ValueError(f"unknown indicator: {spec}")
+    for arr in out.values():
+        arr.setflags(write=False)
+    return out
+
+
+def price_summary(high, low, close):
+    """현재가 / 기간 수익률 / 기간 최고·최저 (AI 요약, 워치리스트 공용)"""
+    close = _as_array(close)
+    last_close, first_close = float(close[-1]), float(close[0])
+    return {
+        'last_close': last_close,
+        'first_close': first_close,
+        'return_pct': (last_close - first_close) / first_close * 100,
+        'high_max': float(np.max(high)),
+        'low_min': float(np.min(low)),
+    }
+
+
+class IncrementalIndicators:
+    """새 봉이 붙을 때 지표를 봉당 O(1)로 갱신 (히스토리 길이와 무관)"""
+
+    def __init__(self, specs=DEFAULT_SPECS):
+        self.specs = tuple(specs)
+        self._parsed = [parse_spec(s) for s in self.specs]
+        self.values = {}        # 지표 이름 -> 최신 값
+        self._windows = {}      # SMA/BB용 최근 n개 종가와 합계
+        self._ema = {}          # EMA 계열 직전 값
+        self._prev_close = None
+        self._peak = None
+        self.count = 0
+
+    @classmethod
+    def from_arrays(cls, high, low, close, specs=DEFAULT_SPECS):
+        state = cls(specs)
+        for h, l, c in zip(_as_array(high), _as_array(low), _as_array(close)):
+            state.append(h, l, c)
+        return state
+
+    @classmethod
+    def from_values(cls, close, values, specs=DEFAULT_SPECS):
+        """compute_indicators 결과의 마지막 값으로 상태를 만듦 (봉을 다시 재생하지 않음)
+
+        지표 값으로 남지 않는 내부 EMA(RSI 평균 상승/하락폭, MACD 단/장기)는 벡터 연산으로 한 번 구함
+        """
+        close = _as_array(close)
+        state = cls(specs)
+        if not len(close):
+            return state
+        state.count = len(close)
+        state._prev_close = float(close[-1])
+        state.values = {key: float(arr[-1]) for key, arr in values.items()}
+        for name, p in state._parsed:
+            if name in ('sma', 'bb') and p[0] not in state._windows:
+                tail = close[-p[0]:]
+                state._windows[p[0]] = (deque(tail.tolist(), maxlen=p[0]), float(tail.sum()))
+            elif name == 'ema':
+                state._ema[f'ema_{p[0]}'] = float(values[f'ema_{p[0]}'][-1])
+            elif name == 'rsi':
+                delta = np.diff(close, prepend=close[:1])
+                state._ema[f'rsi_gain_{p[0]}'] = float(_ema(np.clip(delta, 0, None), 1.0 / p[0])[-1])
+                state._ema[f'rsi_loss_{p[0]}'] = float(_ema(np.clip(-delta, 0, None), 1.0 / p[0])[-1])
+            elif name == 'macd':
+                fast, slow, _ = p
+                state._ema['macd_fast'] = float(_ema(close, 2.0 / (fast + 1))[-1])
+                state._ema['macd_slow'] = float(_ema(close, 2.0 / (slow + 1))[-1])
+                state._ema['macd_signal'] = float(values['macd_signal'][-1])
+            elif name == 'atr':
+                state._ema[f'atr_{p[0]}'] = float(values[f'atr_{p[0]}'][-1])
+            elif name == 'drawdown':
+                state._peak = float(close.max())
+        return state
+
+    def _ema_step(self, key, value, alpha):
+        prev = self._ema.get(key)
+        new = value if prev is None else prev + alpha * (value - prev)
+        self._ema[key] = new
+        return new
+
+    def _window(self, n, close):
+        buf, total = self._windows.get(n, (deque(maxlen=n), 0.0))
+        if len(buf) == n:
+            total -= buf[0]
+        buf.append(close)
+        total += close
+        self._windows[n] = (buf, total)
+        return buf, total
+
+    def append(self, high, low, close):
+        """봉 하나 추가 후 최신 지표 값 dict 반환"""
+        high, low, close = float(high), float(low), float(close)
+        prev_close = close if self._prev_close is None else self._prev_close
+        delta = close - prev_close
+        self.count += 1
+        v = self.values
+
+        windows = {}
+        for name, p in self._parsed:
+            if name in ('sma', 'bb') and p[0] not in windows:
+                windows[p[0]] = self._window(p[0], close)
+
+        for name, p in self._parsed:
+            if name == 'sma':
+                buf, total = windows[p[0]]
+                v[f'sma_{p[0]}'] = total / p[0] if len(buf) == p[0] else np.nan
+            elif name == 'ema':
+                v[f'ema_{p[0]}'] = self._ema_step(f'ema_{p[0]}', close, 2.0 / (p[0] + 1))
+            elif name == 'rsi':
+                gain = self._ema_step(f'rsi_gain_{p[0]}', max(delta, 0.0), 1.0 / p[0])
+                loss = self._ema_step(f'rsi_loss_{p[0]}', max(-delta, 0.0), 1.0 / p[0])
+                rsi = 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+                v[f'rsi_{p[0]}'] = rsi if self.count > p[0] else np.nan
+            elif name == 'macd':
+                fast, slow, signal = p
+                macd = (self._ema_step('macd_fast', close, 2.0 / (fast + 1))
+                        - self._ema_step('macd_slow', close, 2.0 / (slow + 1)))
+                macd_signal = self._ema_step('macd_signal', macd, 2.0 / (signal + 1))
+                v['macd'], v['macd_signal'], v['macd_hist'] = macd, macd_signal, macd - macd_signal
+            elif name == 'bb':
+                n, k = p
+                buf, total = windows[n]
+                if len(buf) == n:
+                    mid = total / n
+                    std = float(np.std(buf))
+                    v[f'bb_mid_{n}'], v[f'bb_upper_{n}'], v[f'bb_lower_{n}'] = mid, mid + k * std, mid - k * std
+                else:
+                    v[f'bb_mid_{n}'] = v[f'bb_upper_{n}'] = v[f'bb_lower_{n}'] = np.nan
+            elif name == 'atr':
+                tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+                v[f'atr_{p[0]}'] = self._ema_step(f'atr_{p[0]}', tr, 1.0 / p[0])
+            elif name == 'drawdown':
+                self._peak = close if self._peak is None else max(self._peak, close)
+                v['drawdown'] = close / self._peak - 1.0
+
+        self._prev_close = close
+        return dict(v)
+
+
+# --- (ticker, 마지막 봉) 메모이즈 ---
+
+_memo = OrderedDict()       # (ticker, specs, 첫 봉) -> 캐시 항목 (기간별로 따로 보관)
+_memo_lock = threading.Lock()
+
+
+def _ohlc_arrays(df):
+    return (_as_array(df['High'].to_numpy()), _as_array(df['Low'].to_numpy()),
+            _as_array(df['Close'].to_numpy()))
+
+
+def _extend(entry, high, low, close):
+    """캐시된 결과 뒤에 새 봉만 이어서 계산 -> (지표 dict, 새 상태)
+
+    캐시 항목의 상태는 여러 세션이 함께 읽으므로 건드리지 않고 복사본에 이어 붙인다.
+    """
+    if entry['state'] is None:
+        # 처음 이어붙일 때 캐시된 배열의 마지막 값으로 상태를 만듦
+        state = IncrementalIndicators.from_values(close[:entry['length']], entry['values'], entry['specs'])
+    else:
+        state = copy.deepcopy(entry['state'])
+    start = entry['length']
+    rows = [state.append(h, l, c) for h, l, c in zip(high[start:], low[start:], close[start:])]
+    out = {}
+    for key, arr in entry['values'].items():
+        tail = np.array([row[key] for row in rows], dtype=np.float64)
+        new = np.concatenate((arr, tail))
+        new.setflags(write=False)
+        out[key] = new
+    return out, state
+
+
+def get_indicators(ticker, df, specs=DEFAULT_SPECS):
+    """df(일봉)의 지표 dict. (ticker, 첫 봉, 마지막 봉, 봉 개수)가 같으면 캐시를 그대로 반환"""
+    specs = tuple(specs)
+    if df is None or df.empty:
+        return {}
+    first_bar, last_bar, length = df.index[0], df.index[-1], len(df)
+    key = (ticker, specs, first_bar)
+
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None:
+            _memo.move_to_end(key)
+    if entry is not None and entry['last_bar'] == last_bar and entry['length'] == length:
+        return entry['values']
+
+    high, low, close = _ohlc_arrays(df)
+    appended = (
+        entry is not None and length > entry['length']
+        and df.index[entry['length'] - 1] == entry['last_bar']
+        and close[entry['length'] - 1] == entry['last_close']
+    )
+    if appended:
+        values, state = _extend(entry, high, low, close)
+    else:
+        values = compute_indicators(high, low, close, specs)
+        state = None
+
+    with _memo_lock:
+        _memo[key] = {'last_bar': last_bar, 'length': length, 'last_close': close[-1], 'specs': specs,
+                      'values': values, 'state': state}
+        _memo.move_to_end(key)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return values
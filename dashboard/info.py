@@ -0,0 +1,10 @@
+"""기업 정보 조회 (yfinance Ticker.info)"""
+import yfinance as yf
+
+from dashboard.telemetry import timed
+
+
+@timed('info')
+def fetch_info(ticker):
+    """yfinance info dict (실패 시 예외)"""
+    return yf.Ticker(ticker).info
@@ -0,0 +1,195 @@
+"""분봉(1m/5m) 실시간 모드 - 최신 봉만 받아 이어 붙이는 시리즈 + 차트
+
+처음 한 번만 당일(5m은 5일) 분봉을 받고, 이후에는 poll()이 마지막 봉 이후 구간만 받아
+  - 같은 시각의 봉(아직 만들어지는 봉)은 값만 교체하고
+  - 새 시각의 봉은 리스트 끝에 붙인다.
+차트 figure(dict)의 트레이스는 시리즈의 리스트를 그대로 참조하므로 DataFrame이나 figure를
+다시 만들지 않는다. MA20/MA60은 IncrementalIndicators로 확정된 봉마다 O(1) 갱신하고,
+만들어지는 봉의 값은 상태 복사본(윈도 크기만큼)으로 미리 계산한다.
+같은 요청의 메타데이터(regularMarketPrice)를 시세로 쓰므로 info를 받을 필요가 없다.
+"""
+import copy
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from dashboard.indicators import IncrementalIndicators
+from dashboard.price_sources import COLUMNS
+from dashboard.telemetry import timed
+
+MARKET_TZ = ZoneInfo('America/New_York')
+# 간격 -> 처음 받을 기간 (둘 다 400봉 안팎)
+INTERVALS = {'1m': '1d', '5m': '5d'}
+MA_SPECS = ('sma:20', 'sma:60')
+DEFAULT_POLL_SECONDS = 15
+MAX_BARS = 2000                 # 오래 켜 두면 앞쪽을 잘라 냄 (TRIM_BARS 단위)
+TRIM_BARS = 500
+
+
+def _normalize_intraday(df):
+    """분봉 DataFrame -> COLUMNS 스키마 + 뉴욕 시간(tz 없음) 인덱스"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    df = df.reindex(columns=COLUMNS)
+    index = pd.to_datetime(df.index)
+    index = index.tz_convert(MARKET_TZ) if index.tz is not None else index.tz_localize(MARKET_TZ)
+    df.index = index.tz_localize(None)
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df.dropna(subset=['Close'])
+
+
+@timed('prices.intraday')
+def download_intraday(ticker, interval, start=None):
+    """분봉 + 시세 -> (df, quote). start가 있으면 그 시각 이후만 (마지막 봉 포함)"""
+    tkr = yf.Ticker(ticker)
+    if start is None:
+        raw = tkr.history(period=INTERVALS[interval], interval=interval, auto_adjust=False)
+    else:
+        raw = tkr.history(start=pd.Timestamp(start).tz_localize(MARKET_TZ), interval=interval, auto_adjust=False)
+    meta = tkr.get_history_metadata() or {}
+    quote = {
+        'price': meta.get('regularMarketPrice'),
+        'previous_close': meta.get('chartPreviousClose', meta.get('previousClose')),
+        'time': meta.get('regularMarketTime'),
+        'currency': meta.get('currency', 'USD'),
+    }
+    return _normalize_intraday(raw), quote
+
+
+class IntradaySeries:
+    """분봉 시리즈 (마지막 봉은 아직 만들어지는 중일 수 있음)"""
+
+    def __init__(self, ticker, interval, specs=MA_SPECS):
+        self.ticker = ticker
+        self.interval = interval
+        self.times, self.open, self.high, self.low, self.close, self.volume = [], [], [], [], [], []
+        self.up = []                                # 거래량 색 (1=상승, 0=하락)
+        self.ma = {f'sma_{n}': [] for n in (int(s.split(':')[1]) for s in specs)}
+        self._state = IncrementalIndicators(specs)  # 마지막 봉 직전까지 확정된 상태
+        self.quote = {}
+        self.error = None
+        self._figure = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def _columns(self):
+        return (self.times, self.open, self.high, self.low, self.close, self.volume, self.up,
+                *self.ma.values())
+
+    def _preview(self):
+        """만들어지는 봉까지 넣었을 때의 지표 (확정 상태는 건드리지 않음)"""
+        values = copy.deepcopy(self._state).append(self.high[-1], self.low[-1], self.close[-1])
+        for key, arr in self.ma.items():
+            arr[-1] = values[key]
+
+    def _set_last(self, o, h, l, c, v):
+        self.open[-1], self.high[-1], self.low[-1], self.close[-1] = o, h, l, c
+        self.volume[-1] = v
+        self.up[-1] = int(c >= o)
+
+    def _append(self, ts, o, h, l, c, v):
+        if self.times:
+            # 앞 봉 확정 (지표도 확정 값으로)
+            values = self._state.append(self.high[-1], self.low[-1], self.close[-1])
+            for key, arr in self.ma.items():
+                arr[-1] = values[key]
+        self.times.append(ts)
+        for col, value in ((self.open, o), (self.high, h), (self.low, l), (self.close, c),
+                           (self.volume, v), (self.up, int(c >= o))):
+            col.append(value)
+        for arr in self.ma.values():
+            arr.append(np.nan)
+        if len(self.times) > MAX_BARS + TRIM_BARS:
+            # 리스트 객체는 그대로 두고 앞부분만 삭제 (차트 트레이스가 같은 리스트를 참조)
+            for col in self._columns():
+                del col[:TRIM_BARS]
+
+    def apply(self, df):
+        """새로 받은 봉 반영 -> 새로 붙은 봉 개수"""
+        added = 0
+        last = self.times[-1] if self.times else None
+        rows = df[COLUMNS].itertuples(name=None)
+        for ts, o, h, l, c, _, v in rows:
+            ts = ts.to_pydatetime()
+            v = 0.0 if pd.isna(v) else float(v)
+            if last is not None and ts < last:
+                continue
+            if last is not None and ts == last:
+                self._set_last(float(o), float(h), float(l), float(c), v)
+            else:
+                self._append(ts, float(o), float(h), float(l), float(c), v)
+                last = ts
+                added += 1
+        if self.times:
+            self._preview()
+        return added
+
+    def apply_quote(self, quote):
+        """시세를 만들어지는 봉의 종가/고가/저가에 반영"""
+        self.quote = quote
+        price = quote.get('price')
+        if price is None or not self.times:
+            return
+        price = float(price)
+        self._set_last(self.open[-1], max(self.high[-1], price), min(self.low[-1], price), price,
+                       self.volume[-1])
+        self._preview()
+
+    def poll(self):
+        """마지막 봉 이후만 받아 반영 -> 새로 붙은 봉 개수 (실패하면 기존 값 유지)"""
+        try:
+            df, quote = download_intraday(self.ticker, self.interval, self.times[-1] if self.times else None)
+        except Exception as e:
+            self.error = str(e)[:200]
+            print(f"[intraday:{self.ticker}] poll failed: {e}")
+            return 0
+        self.error = None
+        added = self.apply(df)
+        self.apply_quote(quote)
+        return added
+
+    def figure(self):
+        """캔들 + MA + 거래량 figure dict (트레이스가 시리즈 리스트를 그대로 참조)"""
+        if self._figure is None:
+            line = {'type': 'scatter', 'mode': 'lines', 'x': self.times, 'opacity': 0.7}
+            ma_traces = [dict(line, y=arr, name=f"MA {key.split('_')[1]}",
+                              line={'color': color, 'width': 2})
+                         for (key, arr), color in zip(self.ma.items(), ('orange', 'purple'))]
+            self._figure = {
+                'data': [
+                    {'type': 'candlestick', 'x': self.times, 'open': self.open, 'high': self.high,
+                     'low': self.low, 'close': self.close, 'name': 'OHLC'},
+                    *ma_traces,
+                    {'type': 'bar', 'x': self.times, 'y': self.volume, 'name': 'Volume', 'xaxis': 'x2', 'yaxis': 'y2',
+                     'marker': {'color': self.up, 'colorscale': [[0, 'red'], [1, 'green']], 'cmin': 0, 'cmax': 1}},
+                ],
+                'layout': {
+                    'height': 600,
+                    'showlegend': True,
+                    'title': {'text': f"{self.ticker} {self.interval} Live Chart"},
+                    # 장외 시간/주말은 비워 두지 않음
+                    'xaxis': {'anchor': 'y', 'matches': 'x2', 'showticklabels': False,
+                              'rangeslider': {'visible': False},
+                              'rangebreaks': [{'bounds': ['sat', 'mon']}, {'bounds': [16, 9.5], 'pattern': 'hour'}]},
+                    'xaxis2': {'anchor': 'y2',
+                               'rangebreaks': [{'bounds': ['sat', 'mon']}, {'bounds': [16, 9.5], 'pattern': 'hour'}]},
+                    'yaxis': {'domain': [0.32, 1.0]},
+                    'yaxis2': {'domain': [0.0, 0.28]},
+                    # 갱신할 때 사용자가 확대한 구간 유지
+                    'uirevision': f"{self.ticker}-{self.interval}",
+                },
+            }
+        return self._figure
+
+
+def load_series(ticker, interval):
+    """처음 조회 (당일 분봉) -> IntradaySeries"""
+    series = IntradaySeries(ticker, interval)
+    series.poll()
+    return series
@@ -0,0 +1,94 @@
+"""SQLite 기반 영속 key-value 캐시 (TTL 지원)
+
+재시작 후에도 유지되어야 하는 작은 캐시(og:image, 번역 등)를 위한 저장소.
+값은 JSON으로 직렬화해서 저장한다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.environ.get(
+    'STOCK_DASHBOARD_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+)
+
+
+class KVStore:
+    """테이블 하나짜리 SQLite TTL 캐시. 여러 스레드에서 공유 가능"""
+
+    def __init__(self, name, default_ttl=None, path=None):
+        self.name = name
+        self.default_ttl = default_ttl
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, f"{name}.sqlite")
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    def _expiry(self, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        """만료되지 않은 항목만 {key: value} 로 반환"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하기 위해 나눠서 조회
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value, expires_at FROM kv WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    if expires_at is None or expires_at > now:
+                        found[key] = json.loads(value)
+        return found
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl=ttl)
+
+    def set_many(self, mapping, ttl=None):
+        expires_at = self._expiry(ttl)
+        rows = [(k, json.dumps(v, ensure_ascii=False), expires_at) for k, v in mapping.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv")
+            self._conn.commit()
+
+    def purge_expired(self):
+        """만료된 항목 삭제, 삭제된 개수 반환"""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0]
@@ -0,0 +1,133 @@
+"""Google News 기사 링크 지연 해석 (오프라인 디코딩 + 캐시)
+
+RSS 링크(news.google.com/rss/articles/<id>)는 렌더링할 때 그대로 쓰거나, 구형 id처럼
+원문 URL이 base64로 들어 있으면 네트워크 없이 꺼내 쓴다. 실제 리다이렉트를 따라가는
+해석은 og:image 추출이나 AI 프롬프트처럼 원문 URL이 꼭 필요할 때만 병렬로 수행하고,
+결과는 메모리 LRU와 디스크(KVStore)에 저장한다.
+"""
+import base64
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from dashboard.fanout import fan_out
+from dashboard.http_client import get_client
+from dashboard.kvstore import KVStore
+from dashboard.telemetry import timed
+
+RESOLVE_TIMEOUT = 5.0           # 링크 하나당 리다이렉트 추적 시간
+RESOLVE_BUDGET = 6.0            # resolve_links 전체 예산
+HIT_TTL = 30 * 24 * 3600        # 기사 URL은 바뀌지 않음
+MISS_TTL = 3600                 # 해석 실패 시 원래 링크로 짧게 기억
+LRU_SIZE = 1024
+
+_ARTICLE_RE = re.compile(r'/(?:rss/)?articles/([A-Za-z0-9_-]+)')
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = KVStore('links')
+    return _cache
+
+
+def is_google_news_link(link):
+    return (urlsplit(link or '').hostname or '') == 'news.google.com'
+
+
+def _read_varint(data, pos):
+    value, shift = 0, 0
+    while pos < len(data):
+        b = data[pos]
+        value |= (b & 0x7f) << shift
+        pos += 1
+        if not b & 0x80:
+            return value, pos
+        shift += 7
+    raise ValueError("truncated varint")
+
+
+def decode_google_news_url(link):
+    """기사 id에 원문 URL이 들어 있으면 네트워크 없이 꺼냄 (신형 암호화 id면 None)"""
+    m = _ARTICLE_RE.search(urlsplit(link or '').path)
+    if not m:
+        return None
+    token = m.group(1)
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    except (ValueError, TypeError):
+        return None
+    # protobuf: 0x08 <type> 0x22 <길이 varint> <URL> ...
+    pos = data.find(b'\x22')
+    if pos < 0:
+        return None
+    try:
+        length, start = _read_varint(data, pos + 1)
+    except ValueError:
+        return None
+    url = data[start:start + length].decode('utf-8', errors='ignore')
+    if url.startswith(('http://', 'https://')) and len(url) == length:
+        return url
+    return None
+
+
+def _remember(link, url):
+    with _memo_lock:
+        _memo[link] = url
+        _memo.move_to_end(link)
+        while len(_memo) > LRU_SIZE:
+            _memo.popitem(last=False)
+
+
+def display_link(link):
+    """렌더링용 링크 - 네트워크 요청 없이 (메모 → 오프라인 디코딩 → 원래 링크)"""
+    if not is_google_news_link(link):
+        return link
+    with _memo_lock:
+        url = _memo.get(link)
+    return url or decode_google_news_url(link) or link
+
+
+@timed('links.redirect')
+def follow_redirect(link):
+    """리다이렉트를 따라가서 최종 URL (실패 시 예외)"""
+    return get_client().head(link, allow_redirects=True, timeout=RESOLVE_TIMEOUT, retries=0).url
+
+
+def resolve_link(link):
+    """원문 기사 URL (메모 → 오프라인 디코딩 → 디스크 캐시 → 리다이렉트 추적)"""
+    if not is_google_news_link(link):
+        return link
+    with _memo_lock:
+        url = _memo.get(link)
+    if url:
+        return url
+    url = decode_google_news_url(link) or get_cache().get(link)
+    if url is None:
+        try:
+            url = follow_redirect(link)
+        except Exception as e:
+            print(f"[links] resolve failed for {link[:80]}: {e}")
+            url = link
+        get_cache().set(link, url, ttl=HIT_TTL if url != link else MISS_TTL)
+    _remember(link, url)
+    return url
+
+
+def resolve_links(links, budget=RESOLVE_BUDGET):
+    """링크 목록을 원문 URL 목록으로 (필요한 것만 병렬 해석, 예산 초과 시 원래 링크)"""
+    # 메모나 오프라인 디코딩으로 해결되지 않는 Google 링크만 남김
+    pending = [link for link in dict.fromkeys(links) if is_google_news_link(link) and display_link(link) == link]
+    known = get_cache().get_many(pending) if pending else {}
+    for link, url in known.items():
+        _remember(link, url)
+    misses = [link for link in pending if link not in known]
+    if misses:
+        fan_out([(link, lambda u=link: resolve_link(u), RESOLVE_TIMEOUT) for link in misses],
+                total_timeout=budget)
+    return [display_link(link) for link in links]
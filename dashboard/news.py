@@ -0,0 +1,123 @@
+"""뉴스 수집 파이프라인 (DuckDuckGo / Yahoo Finance / Google News RSS)
+
+소스 동시 수집 → 제목 중복 제거 → 한국어 번역 → og:image 추출
+"""
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import yfinance as yf
+
+from dashboard.dedup import dedup_news
+from dashboard.fanout import fan_out, format_report
+from dashboard.http_client import ddgs_session, get_client
+from dashboard.links import display_link
+from dashboard.og_image import enrich_images
+from dashboard.translation import translate_titles
+
+# 뉴스 소스별 개별 deadline 및 전체 예산 (초)
+NEWS_SOURCE_DEADLINE = 8.0
+NEWS_TOTAL_BUDGET = 12.0
+
+NEWS_TARGET_SITES = [
+    ('CNBC', 'site:cnbc.com'),
+    ('Reuters', 'site:reuters.com'),
+    ('Investing.com', 'site:investing.com'),
+    ('Bloomberg', 'site:bloomberg.com')
+]
+
+
+def fetch_ddgs_news(ticker, source_name, site_query):
+    """DuckDuckGo 금융 미디어 검색 (사이트 하나)"""
+    items = []
+    query = f"{ticker} stock news {site_query}"
+    with ddgs_session() as ddgs:
+        results = ddgs.text(query, max_results=2)
+    for r in results:
+        items.append({
+            'title': r['title'],
+            'link': r['href'],
+            'publisher': source_name,
+            'date': datetime.now().isoformat()
+        })
+    return items
+
+
+def fetch_yahoo_news(ticker):
+    """Yahoo Finance 뉴스"""
+    items = []
+    stock = yf.Ticker(ticker)
+    for item in stock.news[:5]:
+        items.append({
+            'title': item.get('title'),
+            'link': item.get('link'),
+            'publisher': 'Yahoo Finance',
+            'date': str(item.get('providerPublishTime', ''))
+        })
+    return items
+
+
+def fetch_google_news(ticker):
+    """Google News RSS (가장 안정적인 소스)"""
+    items = []
+    url = f"https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+    resp = get_client().get(url, timeout=10)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    root = ET.fromstring(resp.content)
+    for item in root.findall('.//item')[:5]:
+        title_raw = item.find('title').text if item.find('title') is not None else 'No Title'
+        parts = title_raw.rsplit(' - ', 1)
+        pub_date = item.find('pubDate').text if item.find('pubDate') is not None else ''
+        items.append({
+            'title': parts[0].strip(),
+            # 리다이렉트는 따라가지 않음 - 링크에서 원문 URL을 바로 꺼낼 수 있으면 그것을 사용
+            'link': display_link(item.find('link').text) if item.find('link') is not None else '#',
+            'publisher': parts[1].strip() if len(parts) > 1 else 'Google News',
+            'date': pub_date[:16] if pub_date else datetime.now().strftime('%Y-%m-%d')
+        })
+    return items
+
+
+def collect_news(ticker):
+    """DuckDuckGo(사이트별) / Yahoo Finance / Google News RSS 를 동시에 수집해 소스 우선순위 순서로 병합"""
+    sources = [
+        (f"DDGS:{source_name}", lambda s=source_name, q=site_query: fetch_ddgs_news(ticker, s, q), NEWS_SOURCE_DEADLINE)
+        for source_name, site_query in NEWS_TARGET_SITES
+    ]
+    sources.append(('Yahoo', lambda: fetch_yahoo_news(ticker), NEWS_SOURCE_DEADLINE))
+    sources.append(('GoogleRSS', lambda: fetch_google_news(ticker), NEWS_TOTAL_BUDGET))
+
+    results, report = fan_out(sources, total_timeout=NEWS_TOTAL_BUDGET, span='news', source_spans=True)
+    print(f"[news:{ticker}] {format_report(report)}")
+
+    # 병합은 소스 우선순위 순서로 (중복 제거 시 앞선 소스가 남음)
+    news_items = []
+    for name, _, _ in sources:
+        news_items.extend(results.get(name, []))
+    return news_items
+
+
+def translate_news(items):
+    """제목을 한국어로 번역 (한 번에 배치 요청, 캐시 적용). 원문은 title_en에 보관"""
+    titles_en = [item.get('title', '') for item in items]
+    for item, original_title, title_ko in zip(items, titles_en, translate_titles(titles_en)):
+        item['title_en'] = original_title
+        item['title'] = title_ko
+    return items
+
+
+def get_hybrid_news(ticker, deduper=None):
+    """티커 뉴스 최대 10건. deduper를 넘기면 워치리스트 전체에서 중복 제거를 공유"""
+    # 1~3. 소스 동시 수집
+    news_items = collect_news(ticker)
+
+    # 4. 중복 제거 (제목 유사도 80% 이상)
+    unique_news = dedup_news(news_items, deduper)[:10]
+
+    # 5. 뉴스 제목 한국어 번역
+    translate_news(unique_news)
+
+    # 6. 대표 이미지(og:image) 병렬 추출 (URL별 영속 캐시)
+    enrich_images(unique_news)
+
+    return unique_news
@@ -0,0 +1,108 @@
+"""기사 대표 이미지(og:image) 병렬 추출 + 영속 캐시
+
+전체 HTML을 받아 BeautifulSoup으로 파싱하는 대신 <head> 부분만 스트리밍으로
+읽고, 가벼운 정규식 스캐너로 meta 태그를 찾는다.
+"""
+import html
+import re
+
+import requests
+
+from dashboard.fanout import fan_out
+from dashboard.http_client import get_client
+from dashboard.kvstore import KVStore
+from dashboard.links import is_google_news_link, resolve_links
+from dashboard.telemetry import timed
+
+HEAD_BYTE_CAP = 64 * 1024       # <head>가 이보다 길면 중단
+FETCH_TIMEOUT = 5.0             # 기사 하나당 최대 대기 시간
+ENRICH_BUDGET = 8.0             # 전체 enrichment 예산
+MAX_WORKERS = 8
+
+HIT_TTL = 7 * 24 * 3600         # 이미지를 찾은 경우
+MISS_TTL = 24 * 3600            # 페이지에 og:image가 없음 (negative cache)
+FAIL_TTL = 10 * 60              # 시간 초과 / 요청 실패 - 일시적일 수 있으므로 짧게
+
+_META_RE = re.compile(rb'<meta\b[^>]*>', re.IGNORECASE)
+_ATTR_RE = re.compile(rb'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+_HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = KVStore('og_image')
+    return _cache
+
+
+def find_og_image(head_html):
+    """<meta property="og:image" content="..."> 값 찾기 (없으면 '')"""
+    for tag in _META_RE.finditer(head_html):
+        attrs = {}
+        for m in _ATTR_RE.finditer(tag.group(0)):
+            value = m.group(2) if m.group(2) is not None else (m.group(3) if m.group(3) is not None else m.group(4))
+            attrs[m.group(1).lower()] = value
+        key = attrs.get(b'property') or attrs.get(b'name') or b''
+        if key.lower() == b'og:image' and attrs.get(b'content'):
+            return html.unescape(attrs[b'content'].decode('utf-8', errors='replace')).strip()
+    return ''
+
+
+def fetch_head(url, byte_cap=HEAD_BYTE_CAP, timeout=FETCH_TIMEOUT):
+    """</head> 또는 byte_cap 까지만 다운로드 (200이 아니면 HTTPError - 실패로 짧게 캐시)"""
+    buf = b''
+    with get_client().get(url, timeout=timeout, retries=0, stream=True) as resp:
+        if resp.status_code != 200:
+            raise requests.HTTPError(f"HTTP {resp.status_code}", response=resp)
+        for chunk in resp.iter_content(chunk_size=8192):
+            # 태그가 청크 경계에 걸칠 수 있으므로 직전 몇 바이트부터 다시 검색
+            search_from = max(0, len(buf) - 8)
+            buf += chunk
+            m = _HEAD_END_RE.search(buf, search_from)
+            if m:
+                return buf[:m.start()]
+            if len(buf) >= byte_cap:
+                break
+    return buf[:byte_cap]
+
+
+@timed('og_image.fetch')
+def lookup_og_image(url):
+    """원문 기사 URL의 og:image (Google News 링크는 호출 전에 resolve_links로 해석)"""
+    return find_og_image(fetch_head(url))
+
+
+def enrich_images(items):
+    """뉴스 항목마다 item['image_url'] 채우기 (캐시 → 미스만 병렬 요청)"""
+    cache = get_cache()
+    links = [item.get('link', '') for item in items]
+    known = cache.get_many([link for link in links if link])
+
+    misses = [link for link in dict.fromkeys(links) if link and link not in known]
+    cached = len(known)
+    if misses:
+        # Google News 링크는 먼저 원문 URL로 해석 (자체 예산) - og:image 요청의 FETCH_TIMEOUT에는 head 다운로드만 포함
+        articles = dict(zip(misses, resolve_links(misses)))
+        # 해석하지 못한 링크는 Google 페이지의 이미지를 받게 되므로 요청하지 않고 실패로 처리
+        unresolved = [link for link in misses if is_google_news_link(articles[link])]
+        found, report = fan_out(
+            [(link, lambda u=articles[link]: lookup_og_image(u), FETCH_TIMEOUT)
+             for link in misses if link not in unresolved],
+            total_timeout=ENRICH_BUDGET, max_workers=MAX_WORKERS
+        )
+        hits = {link: url for link, url in found.items() if url}
+        # 200 페이지를 받았는데 og:image가 없을 때만 오래 기억 (403/429/5xx는 fan_out에서 실패로 보고됨)
+        negatives = {link: '' for link, url in found.items() if not url}
+        failures = {r['source']: '' for r in report if not r['ok']}
+        failures.update({link: '' for link in unresolved})
+        for entries, ttl in ((hits, HIT_TTL), (negatives, MISS_TTL), (failures, FAIL_TTL)):
+            if entries:
+                cache.set_many(entries, ttl=ttl)
+            known.update(entries)
+        print(f"[og:image] cached={cached} fetched={len(misses)} found={len(hits)} failed={len(failures)}")
+
+    for item, link in zip(items, links):
+        item['image_url'] = known.get(link, '')
+    return items
@@ -0,0 +1,256 @@
+"""일봉 가격 소스 + 헤지(hedged) 요청 리졸버
+
+소스마다 가능한 심볼 형식(stooq: "NVDA.US" / "NVDA")을 두고, 티커별로 통한 형식을 기억해
+다음에는 그 형식부터 시도한다. 리졸버는 건강 점수(최근 성공률 EWMA, 평소 느린 소스는 감점)가
+높은 소스부터 요청하고 (실패로 깎인 점수는 호출이 없어도 시간이 지나면 1.0 쪽으로 회복되어
+우선 소스가 다시 먼저 시도됨), HEDGE_AFTER 초 안에 성공하지 못하면 다음 소스를 동시에 시작해 먼저 온 유효한 결과를 쓴다.
+늦게 끝난 요청의 결과도 건강 점수에는 반영된다. 모든 소스의 결과는 COLUMNS 스키마로 맞춘다.
+
+새 소스는 PriceSource를 상속해 fetch(symbol, start, end)를 구현하고 register_source로 추가한다.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import pandas as pd
+import yfinance as yf
+
+from dashboard.kvstore import KVStore
+from dashboard.telemetry import record, run_in_context, timed
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+HEDGE_AFTER = 2.5           # 이 시간(초) 안에 결과가 없으면 다음 소스도 시작
+TOTAL_TIMEOUT = 25.0        # 모든 소스를 합친 최대 대기 시간
+HEALTH_ALPHA = 0.3          # 건강 점수 EWMA 가중치
+HEALTH_HALF_LIFE = 120.0    # 깎인 점수/느림 감점이 절반으로 회복되는 시간 (초)
+RANK_PRECISION = 1          # 이 자리수까지 같으면 같은 점수로 보고 등록 순서대로
+SYMBOL_TTL = 30 * 24 * 3600
+RESOLVER_WORKERS = 8
+
+
+def normalize_ohlcv(df):
+    """소스별 DataFrame을 COLUMNS 스키마 + 오름차순 날짜 인덱스로 맞춤"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    # yfinance가 MultiIndex 컬럼을 반환할 수 있으므로 평탄화
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    df = df.reindex(columns=COLUMNS)
+    df.columns.name = None
+    if df['Adj Close'].isna().all():
+        df['Adj Close'] = df['Close']
+    index = pd.to_datetime(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize()
+    df.index.name = 'Date'
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df.dropna(subset=['Close'])
+
+
+@timed('prices.yfinance')
+def download_yfinance(ticker, start, end=None):
+    return normalize_ohlcv(yf.download(ticker, start=start.strftime('%Y-%m-%d'),
+                                       end=end.strftime('%Y-%m-%d') if end else None,
+                                       progress=False, auto_adjust=True))
+
+
+@timed('prices.stooq')
+def download_stooq(symbol, start, end=None):
+    """stooq 심볼 하나 조회 (형식 선택은 StooqSource가 담당)"""
+    import pandas_datareader.data as web
+    return normalize_ohlcv(web.DataReader(symbol, 'stooq', start, end or datetime.now()))
+
+
+# --- 소스 ---
+
+class PriceSource:
+    name = 'base'
+
+    def symbols(self, ticker):
+        """시도할 심볼 형식 (기본: 티커 그대로)"""
+        return [ticker]
+
+    def fetch(self, symbol, start, end=None):
+        raise NotImplementedError
+
+
+class YFinanceSource(PriceSource):
+    name = 'yfinance'
+
+    def fetch(self, symbol, start, end=None):
+        return download_yfinance(symbol, start, end)
+
+
+class StooqSource(PriceSource):
+    name = 'stooq'
+
+    def symbols(self, ticker):
+        return [f"{ticker}.US", ticker]
+
+    def fetch(self, symbol, start, end=None):
+        return download_stooq(symbol, start, end)
+
+
+class SourceHealth:
+    """소스별 성공률/지연 EWMA (1.0 = 최근 요청이 모두 성공)"""
+
+    def __init__(self):
+        self.score = 1.0
+        self.latency = None
+        self.calls = 0
+        self.failures = 0
+        self.last_error = None
+        self.updated = None
+
+    def update(self, ok, elapsed, error=None):
+        self.score = self.current()
+        self.calls += 1
+        self.score += HEALTH_ALPHA * ((1.0 if ok else 0.0) - self.score)
+        self.latency = elapsed if self.latency is None else self.latency + HEALTH_ALPHA * (elapsed - self.latency)
+        self.updated = time.monotonic()
+        if not ok:
+            self.failures += 1
+            self.last_error = str(error)[:200] if error else 'empty'
+
+    def _recovery(self, now=None):
+        """마지막 갱신 이후 남은 감점 비율 (1.0 -> 0.0)"""
+        if self.updated is None:
+            return 1.0
+        return 0.5 ** (((now or time.monotonic()) - self.updated) / HEALTH_HALF_LIFE)
+
+    def current(self, now=None):
+        """시간 회복을 반영한 점수 - 다시 호출되지 않는 소스도 영구히 뒤로 밀리지 않음"""
+        return 1.0 - (1.0 - self.score) * self._recovery(now)
+
+    def rank(self, hedge_after, now=None):
+        """정렬 기준 - 성공은 해도 보통 헤지 기준보다 느리면 뒤로 (감점도 시간이 지나면 회복)"""
+        slow = self.latency is not None and self.latency > hedge_after
+        penalty = 0.5 * self._recovery(now) if slow else 0.0
+        return round(self.current(now) * (1.0 - penalty), RANK_PRECISION)
+
+
+class PriceResolver:
+    def __init__(self, sources, hedge_after=HEDGE_AFTER, total_timeout=TOTAL_TIMEOUT):
+        self.sources = list(sources)
+        self.hedge_after = hedge_after
+        self.total_timeout = total_timeout
+        self.health = {s.name: SourceHealth() for s in self.sources}
+        self._lock = threading.Lock()
+        self._symbols = None
+        self._executor = ThreadPoolExecutor(max_workers=RESOLVER_WORKERS, thread_name_prefix='price-source')
+
+    def register(self, source, first=False):
+        with self._lock:
+            self.sources.insert(0 if first else len(self.sources), source)
+            self.health.setdefault(source.name, SourceHealth())
+
+    def symbol_store(self):
+        if self._symbols is None:
+            self._symbols = KVStore('price_symbols', default_ttl=SYMBOL_TTL)
+        return self._symbols
+
+    def ranked(self):
+        """건강 점수 높은 순 (같으면 등록 순서)"""
+        with self._lock:
+            order = {s.name: i for i, s in enumerate(self.sources)}
+            return sorted(self.sources, key=lambda s: (-self.health[s.name].rank(self.hedge_after), order[s.name]))
+
+    def _candidates(self, source, ticker):
+        symbols = source.symbols(ticker)
+        if len(symbols) > 1:
+            known = self.symbol_store().get(f"{source.name}|{ticker}")
+            if known in symbols:
+                symbols = [known] + [s for s in symbols if s != known]
+        return symbols
+
+    def _attempt(self, source, ticker, start, end):
+        """소스 하나에서 통하는 심볼 형식으로 조회 -> 빈 DataFrame이면 실패로 취급"""
+        started = time.perf_counter()
+        errors = []
+        symbols = self._candidates(source, ticker)
+        for symbol in symbols:
+            try:
+                df = normalize_ohlcv(source.fetch(symbol, start, end))
+            except Exception as e:
+                errors.append(f"{symbol}: {e}")
+                continue
+            if df.empty:
+                errors.append(f"{symbol}: empty")
+                continue
+            if len(symbols) > 1:
+                self.symbol_store().set(f"{source.name}|{ticker}", symbol)
+            self._report(source, True, started)
+            return df
+        error = "; ".join(errors)
+        self._report(source, False, started, error)
+        raise RuntimeError(error or "no symbols")
+
+    def _report(self, source, ok, started, error=None):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.health[source.name].update(ok, elapsed, error)
+        record(f"prices.source.{source.name}", elapsed, None if ok else (error or 'empty'))
+
+    def fetch(self, ticker, start, end=None):
+        """start 이후(end 지정 시 end 이전까지) 봉 -> (df, source 이름, error)"""
+        pending = list(self.ranked())
+        running = {}
+        errors = []
+        deadline = time.monotonic() + self.total_timeout
+        hedge_at = time.monotonic()     # 다음 소스를 시작해도 되는 시각 (첫 소스는 바로)
+        while pending or running:
+            if pending and (not running or time.monotonic() >= hedge_at):
+                source = pending.pop(0)
+                fn = run_in_context(lambda s=source: self._attempt(s, ticker, start, end))
+                running[self._executor.submit(fn)] = source
+                hedge_at = time.monotonic() + self.hedge_after
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # 다음 소스를 시작할 시각이나 전체 마감 중 먼저 오는 쪽까지만 기다림
+            timeout = min(remaining, max(hedge_at - time.monotonic(), 0.0)) if pending else remaining
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = running.pop(future)
+                try:
+                    return future.result(), source.name, None
+                except Exception as e:
+                    errors.append(f"{source.name}: {e}")
+                    # 실패했으면 헤지 대기 없이 바로 다음 소스
+                    hedge_at = time.monotonic()
+        errors += [f"{source.name}: timeout" for source in running.values()]
+        return pd.DataFrame(columns=COLUMNS), None, "; ".join(errors)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(vars(h), score=h.current()) for name, h in self.health.items()}
+
+    def reset(self):
+        with self._lock:
+            self.health = {s.name: SourceHealth() for s in self.sources}
+        self.symbol_store().clear()
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = PriceResolver([YFinanceSource(), StooqSource()])
+        return _resolver
+
+
+def register_source(source, first=False):
+    """새 가격 소스 추가 (first=True면 건강 점수가 같을 때 가장 먼저 시도)"""
+    get_resolver().register(source, first)
+
+
+def source_stats():
+    """{소스 이름: 건강 점수/평균 지연/호출 수/실패 수/마지막 오류}"""
+    return get_resolver().stats()
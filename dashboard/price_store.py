@@ -0,0 +1,331 @@
+"""일봉 OHLCV 영속 저장소 (SQLite) + 증분 갱신
+
+티커별 마지막 저장 봉을 기억해 두고, 부족한 구간만 가격 소스(price_sources - yfinance/stooq
+헤지 요청)에서 받아 병합한다. 신선도는 미국 정규장 세션 기준으로 판단한다.
+  - 장중: PRICE_TTL_OPEN 초가 지나면 갱신
+  - 장 마감 후/주말: 마지막 세션 마감 이후에 받은 적이 있으면 로컬에서만 읽음
+가격은 분할/배당 조정 값(yfinance auto_adjust)으로 저장한다. 분할이나 배당이 생기면 과거 봉 전체가
+다시 조정되므로, 갱신할 때 마지막 봉 앞 며칠을 겹쳐 받아 저장값과 비교하고 다르면 전체 구간을 다시 받는다.
+소스마다 조정 기준이 다르므로 봉마다 받은 소스를 기록하고, 한 티커의 시리즈에 다른 소스의 봉을
+섞지 않는다 (새 구간이 다른 소스에서 오면 전체 구간을 그 소스 기준으로 다시 받음).
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, time as dtime
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import yfinance as yf
+
+from dashboard.kvstore import CACHE_DIR
+from dashboard.price_sources import COLUMNS, get_resolver, normalize_ohlcv
+from dashboard.telemetry import timed
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+PRICE_TTL_OPEN = 60             # 장중 갱신 주기 (초)
+HISTORY_DAYS = 365
+REFRESH_OVERLAP_DAYS = 7        # 조정 여부 비교용으로 겹쳐 받는 기간 (주말/휴장일 포함)
+ADJUST_TOLERANCE = 1e-4         # 겹치는 봉 종가의 상대 오차가 이보다 크면 다시 조정된 것으로 봄
+
+_DB_COLUMNS = ['open', 'high', 'low', 'close', 'adj_close', 'volume']
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(CACHE_DIR, 'prices.sqlite'), check_same_thread=False, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bars ("
+            " ticker TEXT NOT NULL, date TEXT NOT NULL,"
+            " open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL, source TEXT,"
+            " PRIMARY KEY (ticker, date))"
+        )
+        if 'source' not in {row[1] for row in conn.execute("PRAGMA table_info(bars)")}:
+            # 봉별 소스 기록 이전에 만든 DB (기존 봉은 소스 미상으로 둠)
+            conn.execute("ALTER TABLE bars ADD COLUMN source TEXT")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS fetch_log ("
+            " ticker TEXT PRIMARY KEY, fetched_at REAL NOT NULL, source TEXT)"
+        )
+        # 티커별로 어느 날짜부터의 히스토리를 받아 두었는지 (긴 기간 요청 시 앞부분 보충용)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            " ticker TEXT PRIMARY KEY, covered_from TEXT NOT NULL)"
+        )
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def clear_store():
+    """저장된 봉/수집 기록 전부 삭제 (벤치마크/테스트용)"""
+    with _lock:
+        conn = _db()
+        for table in ('bars', 'fetch_log', 'coverage'):
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
+
+
+# --- 장 세션 계산 (휴장일은 고려하지 않음 - 휴장일에는 빈 응답만 받고 끝남) ---
+
+def is_market_open(now=None):
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def last_session_close(now=None):
+    """now 기준 가장 최근에 끝난 정규장 마감 시각 (aware datetime)"""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now.date()
+    if now.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return datetime.combine(day, MARKET_CLOSE, tzinfo=MARKET_TZ)
+
+
+def is_fresh(fetched_at, now=None):
+    """마지막 다운로드 시각(epoch)이 아직 유효한지"""
+    if fetched_at is None:
+        return False
+    now = now or datetime.now(MARKET_TZ)
+    if is_market_open(now):
+        return now.timestamp() - fetched_at < PRICE_TTL_OPEN
+    return fetched_at >= last_session_close(now).timestamp()
+
+
+# --- 다운로드 ---
+
+@timed('prices.yfinance_batch')
+def download_many_yfinance(tickers, start):
+    """여러 티커를 yf.download 한 번으로 받아 {ticker: df} 로 분리"""
+    raw = yf.download(tickers, start=start.strftime('%Y-%m-%d'), group_by='ticker',
+                      progress=False, auto_adjust=True, threads=True)
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+    if not isinstance(raw.columns, pd.MultiIndex):
+        # 티커가 하나면 단일 레벨 컬럼으로 올 수 있음
+        frames[tickers[0]] = normalize_ohlcv(raw)
+        return frames
+    # group_by='ticker' 이면 (Ticker, Price) 순서의 MultiIndex
+    level = 0 if set(tickers) & set(raw.columns.get_level_values(0)) else 1
+    for ticker in tickers:
+        if ticker in raw.columns.get_level_values(level):
+            frames[ticker] = normalize_ohlcv(raw.xs(ticker, axis=1, level=level))
+    return frames
+
+
+def download_bars(ticker, start, end=None):
+    """start 이후(end 지정 시 end 이전까지) 봉 다운로드 -> (df, source, error)
+
+    소스 선택/헤지/심볼 형식은 price_sources.PriceResolver가 담당
+    """
+    return get_resolver().fetch(ticker, start, end)
+
+
+# --- 저장/조회 ---
+
+def read_bars(ticker, since=None):
+    query = f"SELECT date, {', '.join(_DB_COLUMNS)} FROM bars WHERE ticker = ?"
+    params = [ticker]
+    if since is not None:
+        query += " AND date >= ?"
+        params.append(since.strftime('%Y-%m-%d'))
+    with _lock:
+        rows = _db().execute(query + " ORDER BY date", params).fetchall()
+    df = pd.DataFrame(rows, columns=['Date'] + COLUMNS)
+    df.index = pd.to_datetime(df.pop('Date'))
+    df.index.name = 'Date'
+    return df
+
+
+def write_bars(ticker, df, source, fetched=True):
+    """봉 upsert (봉마다 source 기록). fetched면 최신 구간을 받은 것으로 보고 다운로드 시각도 기록"""
+    rows = [
+        (ticker, idx.strftime('%Y-%m-%d'), *[None if pd.isna(v) else float(v) for v in values], source)
+        for idx, values in zip(df.index, df[COLUMNS].itertuples(index=False, name=None))
+    ]
+    with _lock:
+        conn = _db()
+        conn.executemany(
+            f"INSERT OR REPLACE INTO bars (ticker, date, {', '.join(_DB_COLUMNS)}, source)"
+            f" VALUES (?, ?, {', '.join('?' * len(COLUMNS))}, ?)", rows
+        )
+        if fetched:
+            conn.execute("INSERT OR REPLACE INTO fetch_log VALUES (?, ?, ?)", (ticker, time.time(), source))
+        conn.commit()
+
+
+def series_source(ticker):
+    """저장된 시리즈의 소스 (마지막 봉 기준, 기록 이전 봉이면 None)"""
+    with _lock:
+        row = _db().execute("SELECT source FROM bars WHERE ticker = ? ORDER BY date DESC LIMIT 1",
+                            (ticker,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_coverage(ticker, since):
+    with _lock:
+        conn = _db()
+        conn.execute("INSERT OR REPLACE INTO coverage VALUES (?, ?)", (ticker, since.strftime('%Y-%m-%d')))
+        conn.commit()
+
+
+def _fetch_state(ticker):
+    """(첫 봉, 마지막 봉, 마지막 다운로드 시각, 받아 둔 히스토리 시작일)"""
+    with _lock:
+        conn = _db()
+        first, last = conn.execute("SELECT MIN(date), MAX(date) FROM bars WHERE ticker = ?", (ticker,)).fetchone()
+        row = conn.execute("SELECT fetched_at FROM fetch_log WHERE ticker = ?", (ticker,)).fetchone()
+        cov = conn.execute("SELECT covered_from FROM coverage WHERE ticker = ?", (ticker,)).fetchone()
+    return ((pd.Timestamp(first) if first else None), (pd.Timestamp(last) if last else None),
+            (row[0] if row else None), (pd.Timestamp(cov[0]) if cov else None))
+
+
+def _refresh_start(since, last_bar):
+    """갱신 시작일 - 저장된 봉이 없거나 오래됐으면 since, 아니면 마지막 봉 며칠 전부터 (겹치는 구간 비교용)"""
+    if last_bar is None or last_bar < since:
+        return since
+    return (last_bar - timedelta(days=REFRESH_OVERLAP_DAYS)).to_pydatetime()
+
+
+def _rebuild_reason(ticker, df_new, source, last_bar):
+    """새 구간을 저장된 시리즈에 이어 붙이면 안 되는 이유 (없으면 None)
+    - 다른 소스에서 받음 (조정 기준/Adj Close 유무가 다름)
+    - 겹치는 확정 봉(마지막 저장 봉 이전)의 종가가 저장값과 다름 (분할/배당으로 다시 조정됨)
+    """
+    if last_bar is None:
+        return None
+    stored_source = series_source(ticker)
+    if stored_source is not None and stored_source != source:
+        return f"source {stored_source} -> {source}"
+    overlap = df_new[df_new.index < last_bar]
+    if overlap.empty:
+        return None
+    stored = read_bars(ticker, overlap.index[0])['Close'].reindex(overlap.index)
+    changed = (overlap['Close'] - stored).abs() > ADJUST_TOLERANCE * stored.abs()
+    return "re-adjusted" if changed.fillna(False).any() else None
+
+
+def _rebuild(ticker, since, reason):
+    """저장된 봉을 버리고 since부터 전체 구간을 (한 소스에서) 다시 받음 -> 성공 여부"""
+    df, source, error = download_bars(ticker, since)
+    if df.empty:
+        print(f"[prices:{ticker}] rebuild failed, serving stored bars: {error}")
+        return False
+    with _lock:
+        conn = _db()
+        conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+        conn.commit()
+    write_bars(ticker, df, source)
+    _set_coverage(ticker, since)
+    print(f"[prices:{ticker}] rebuild ({reason}) {source} {len(df)} rows from {since:%Y-%m-%d}")
+    return True
+
+
+def _backfill(ticker, since, first_bar):
+    """저장된 첫 봉 이전 구간만 받아서 보충"""
+    df_old, source, error = download_bars(ticker, since, end=first_bar.to_pydatetime())
+    stored_source = series_source(ticker)
+    if not df_old.empty and stored_source is not None and stored_source != source:
+        # 앞부분만 다른 소스로 채우지 않고 전체를 한 소스로
+        _rebuild(ticker, since, f"backfill source {stored_source} -> {source}")
+        return
+    if not df_old.empty:
+        write_bars(ticker, df_old, source, fetched=False)
+        print(f"[prices:{ticker}] backfill {source} +{len(df_old)} rows from {since:%Y-%m-%d}")
+    elif first_bar - pd.Timestamp(since) > pd.Timedelta(days=7):
+        # 상장일 이전이거나 일시적 실패일 수 있음 - 일시적 실패면 다음에 다시 시도
+        print(f"[prices:{ticker}] backfill returned nothing: {error}")
+        return
+    _set_coverage(ticker, since)
+
+
+def load_prices(ticker, days=HISTORY_DAYS):
+    """최근 days일 일봉 반환 -> (df, error_msg)
+
+    저장된 데이터가 신선하면 로컬에서만 읽고, 아니면 마지막 저장 봉부터
+    (미완성 봉 갱신을 위해 해당 봉 포함) 다시 받아 병합한다.
+    """
+    since = datetime.now() - timedelta(days=days)
+    first_bar, last_bar, fetched_at, covered_from = _fetch_state(ticker)
+    error_msg = None
+
+    if last_bar is not None and last_bar >= since and (covered_from is None or covered_from > since):
+        _backfill(ticker, since, first_bar)
+
+    if last_bar is None or not is_fresh(fetched_at):
+        start = _refresh_start(since, last_bar)
+        df_new, source, error = download_bars(ticker, start)
+        reason = _rebuild_reason(ticker, df_new, source, last_bar) if not df_new.empty else None
+        if reason:
+            # 이어 붙이면 저장된 구간과 기준이 달라짐
+            _rebuild(ticker, min(first_bar.to_pydatetime(), since), reason)
+        elif not df_new.empty:
+            write_bars(ticker, df_new, source)
+            if start == since:
+                _set_coverage(ticker, since)
+            print(f"[prices:{ticker}] {source} +{len(df_new)} rows since {start:%Y-%m-%d}")
+        elif last_bar is None:
+            error_msg = f"데이터 수신 실패: {error}"
+        else:
+            print(f"[prices:{ticker}] refresh failed, serving stored bars: {error}")
+
+    df = read_bars(ticker, since)
+    if df.empty and error_msg is None:
+        error_msg = "데이터가 비어있습니다"
+    return df, error_msg
+
+
+def load_prices_many(tickers, days=HISTORY_DAYS):
+    """워치리스트용 - 오래된 티커만 모아 한 번의 배치 다운로드 후 {ticker: (df, error_msg)}"""
+    since = datetime.now() - timedelta(days=days)
+    stale = {}
+    states = {}
+    for ticker in tickers:
+        first_bar, last_bar, fetched_at, _ = _fetch_state(ticker)
+        if last_bar is None or not is_fresh(fetched_at):
+            stale[ticker] = _refresh_start(since, last_bar)
+            states[ticker] = (first_bar, last_bar)
+
+    failed = set()
+    if stale:
+        frames = {}
+        try:
+            frames = download_many_yfinance(list(stale), min(stale.values()))
+        except Exception as e:
+            print(f"[prices] batch download failed: {e}")
+        for ticker in stale:
+            df_new = frames.get(ticker)
+            if df_new is None or df_new.empty:
+                failed.add(ticker)
+                continue
+            first_bar, last_bar = states[ticker]
+            reason = _rebuild_reason(ticker, df_new, 'yfinance', last_bar)
+            if reason:
+                _rebuild(ticker, min(first_bar.to_pydatetime(), since), reason)
+                continue
+            write_bars(ticker, df_new, 'yfinance')
+            if stale[ticker] == since:
+                _set_coverage(ticker, since)
+        print(f"[prices] batch {len(stale)} stale / {len(tickers)} tickers, {len(failed)} missing")
+
+    results = {}
+    for ticker in tickers:
+        if ticker in failed:
+            # 배치에서 빠진 티커는 개별 경로(stooq 포함)로 재시도
+            results[ticker] = load_prices(ticker, days)
+            continue
+        df = read_bars(ticker, since)
+        results[ticker] = (df, None if not df.empty else "데이터가 비어있습니다")
+    return results
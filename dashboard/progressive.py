@@ -0,0 +1,59 @@
+"""점진적 페이지 렌더링 도우미 (백그라운드 작업 + 단계별 시간 기록)
+
+Streamlit 요소는 스크립트 스레드에서만 그릴 수 있으므로, 느린 단계(기업 정보, 뉴스,
+기업 이미지)는 여기 executor에서 미리 시작하고 페이지는 자리(placeholder)만 만들어 둔다.
+스크립트는 주가 차트를 먼저 그린 뒤 끝나는 순서대로 각 자리를 채운다.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dashboard.telemetry import record, run_in_context
+
+PAGE_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=PAGE_WORKERS, thread_name_prefix='page')
+
+
+def submit(fn, *args, **kwargs):
+    """백그라운드 작업 시작 -> Future"""
+    return _executor.submit(run_in_context(lambda: fn(*args, **kwargs)))
+
+
+def fill_as_completed(jobs):
+    """jobs: {Future: (이름, 렌더 함수)}. 끝나는 순서대로 렌더 함수(결과, 오류) 호출 후 이름 yield"""
+    for future in as_completed(jobs):
+        name, render = jobs[future]
+        try:
+            result, error = future.result(), None
+        except Exception as e:
+            print(f"[page] {name} failed: {e}")
+            result, error = None, e
+        render(result, error)
+        yield name
+
+
+class PageTimer:
+    """페이지 시작 시점부터 각 단계가 화면에 나온 시간 기록"""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter() - self.started
+        record(f"page.{name}", self.marks[name])
+        return self.marks[name]
+
+    @property
+    def total(self):
+        return max(self.marks.values()) if self.marks else 0.0
+
+    def finish(self):
+        """페이지 완성 시간 기록 후 로그 문자열 반환"""
+        record('page.total', self.total)
+        return self.describe()
+
+    def describe(self):
+        parts = ", ".join(f"{name} {sec:.2f}s" for name, sec in self.marks.items())
+        return f"[page:{self.label}] {parts} | total {self.total:.2f}s"
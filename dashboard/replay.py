@@ -0,0 +1,506 @@
+"""외부 소스 녹화/재생 하네스 (오프라인 벤치마크용)
+
+녹화: 실제 네트워크로 파이프라인을 한 번 돌리면서 외부 호출 결과를 fixture 파일에 저장
+  python -m dashboard.replay record NVDA AAPL --out bench/fixtures/sample.pkl
+재생: Replayer가 같은 함수들을 fixture 응답으로 바꾸고, 지연 프로필에 따라 응답 시간을 흉내 낸다.
+녹화본이 없으면 synthetic_fixtures()로 결정적인 합성 fixture를 만들어 쓸 수 있다.
+
+대상 외부 호출 (모두 함수 경계에서 교체)
+  - 주가: price_sources.download_yfinance / download_stooq, price_store.download_many_yfinance
+  - 기업 정보: info.fetch_info
+  - 뉴스: news.fetch_ddgs_news / fetch_yahoo_news / fetch_google_news
+  - 링크/이미지: links.follow_redirect, og_image.lookup_og_image, images.search_images
+  - 번역: 번역 서비스 백엔드, AI: ai_router.Provider.stream
+fixture는 DataFrame을 그대로 담기 위해 pickle로 저장한다 (직접 녹화한 파일만 읽을 것).
+"""
+import hashlib
+import importlib
+import json
+import math
+import pickle
+import random
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# (이름, 모듈, 함수, 키 함수) - 키는 fixture 안에서 응답을 찾는 문자열
+SOURCES = [
+    ('prices', 'dashboard.price_sources', 'download_yfinance', lambda ticker, start, end=None: ticker),
+    # stooq는 "NVDA.US" / "NVDA" 두 형식을 같은 응답으로 취급
+    ('prices_stooq', 'dashboard.price_sources', 'download_stooq',
+     lambda symbol, start, end=None: symbol.removesuffix('.US')),
+    ('info', 'dashboard.info', 'fetch_info', lambda ticker: ticker),
+    ('ddgs_news', 'dashboard.news', 'fetch_ddgs_news',
+     lambda ticker, source_name, site_query: f"{ticker}|{source_name}"),
+    ('yahoo_news', 'dashboard.news', 'fetch_yahoo_news', lambda ticker: ticker),
+    ('google_news', 'dashboard.news', 'fetch_google_news', lambda ticker: ticker),
+    ('redirect', 'dashboard.links', 'follow_redirect', lambda link: link),
+    ('og_image', 'dashboard.og_image', 'lookup_og_image', lambda url: url),
+    ('company_images', 'dashboard.images', 'search_images', lambda keyword, max_results=4: keyword),
+]
+
+# 교체한 함수를 `from ... import` 로 가져다 쓰는 모듈까지 모두 바꾸기 위해 미리 import
+PIPELINE_MODULES = ['dashboard.data', 'dashboard.watchlist', 'dashboard.batch', 'dashboard.ai_report',
+                    'dashboard.translation', 'dashboard.ai_router']
+
+# 소스별 (중앙값 초, 로그정규 sigma). 'ai_chunk'는 스트리밍 청크 사이 간격
+_TYPICAL = {
+    'prices': (0.6, 0.4), 'prices_stooq': (1.0, 0.5), 'info': (0.5, 0.5),
+    'ddgs_news': (0.9, 0.6), 'yahoo_news': (0.4, 0.4), 'google_news': (0.35, 0.4),
+    'redirect': (0.3, 0.5), 'og_image': (0.4, 0.6), 'company_images': (1.0, 0.6),
+    'translate': (0.45, 0.4), 'ai_ttft': (1.2, 0.4), 'ai_chunk': (0.03, 0.3),
+}
+LATENCY_PROFILES = {
+    'none': {},
+    'fast': {k: (m * 0.2, s) for k, (m, s) in _TYPICAL.items()},
+    'typical': _TYPICAL,
+    'slow': {k: (m * 3, s + 0.3) for k, (m, s) in _TYPICAL.items()},
+}
+
+
+class MissingFixture(KeyError):
+    """재생 중 녹화되지 않은 호출"""
+
+
+class RecordedError:
+    """녹화 당시 발생한 예외 (재생 시 RuntimeError로 다시 발생)"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+class Fixtures:
+    def __init__(self, sources=None, meta=None):
+        self.sources = sources or {}
+        self.meta = meta or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        return cls(data['sources'], data.get('meta'))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump({'meta': self.meta, 'sources': self.sources}, f)
+
+    def put(self, source, key, value):
+        with self._lock:
+            self.sources.setdefault(source, {})[key] = value
+
+    def get(self, source, key):
+        try:
+            return self.sources[source][key]
+        except KeyError:
+            raise MissingFixture(f"{source}:{key}") from None
+
+    def counts(self):
+        return {source: len(entries) for source, entries in self.sources.items()}
+
+
+# --- 함수 교체 ---
+
+def _import_pipeline():
+    for name in PIPELINE_MODULES + sorted({module for _, module, _, _ in SOURCES}):
+        importlib.import_module(name)
+
+
+def _replace_everywhere(original, replacement):
+    """original을 참조하는 dashboard.* 모듈 속성을 모두 replacement로 -> 되돌리기 목록"""
+    undo = []
+    for name, module in list(sys.modules.items()):
+        if module is None or not name.startswith('dashboard'):
+            continue
+        for attr, value in list(vars(module).items()):
+            if value is original:
+                setattr(module, attr, replacement)
+                undo.append((module, attr, original))
+    return undo
+
+
+class _Patcher:
+    """SOURCES 함수와 번역/AI 경계를 교체하는 녹화기·재생기 공통 부분"""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self._undo = []
+        self._saved_service = None
+
+    def wrap(self, name, fn, key_fn):
+        raise NotImplementedError
+
+    def translation_backend(self, service):
+        raise NotImplementedError
+
+    def ai_stream(self, original):
+        raise NotImplementedError
+
+    def many_prices(self, original):
+        raise NotImplementedError
+
+    def __enter__(self):
+        _import_pipeline()
+        from dashboard import ai_router, price_store, translation
+
+        for name, module_name, attr, key_fn in SOURCES:
+            original = getattr(sys.modules[module_name], attr)
+            self._undo += _replace_everywhere(original, self.wrap(name, original, key_fn))
+        self._undo += _replace_everywhere(price_store.download_many_yfinance,
+                                          self.many_prices(price_store.download_many_yfinance))
+        self._undo.append((ai_router.Provider, 'stream', ai_router.Provider.stream))
+        ai_router.Provider.stream = self.ai_stream(ai_router.Provider.stream)
+
+        self._saved_service = translation._service
+        translation.set_service(translation.TranslationService(
+            backend=self.translation_backend(translation.get_service()),
+            store=translation.get_service().store))
+        return self
+
+    def __exit__(self, *exc):
+        from dashboard import translation
+        for owner, attr, original in reversed(self._undo):
+            setattr(owner, attr, original)
+        self._undo = []
+        translation.set_service(self._saved_service)
+        return False
+
+
+class Recorder(_Patcher):
+    """실제 호출을 그대로 실행하면서 결과(또는 예외)를 fixture에 기록"""
+
+    def wrap(self, name, fn, key_fn):
+        def recorded(*args, **kwargs):
+            key = key_fn(*args, **kwargs)
+            try:
+                value = fn(*args, **kwargs)
+            except Exception as e:
+                if key not in self.fixtures.sources.get(name, {}):
+                    self.fixtures.put(name, key, RecordedError(str(e)))
+                raise
+            stored = self.merge_bars(name, key, value) if name in ('prices', 'prices_stooq') else value
+            self.fixtures.put(name, key, stored)
+            return value
+        return recorded
+
+    def merge_bars(self, name, key, df):
+        # 백필/증분 갱신으로 같은 티커를 여러 구간 받으므로 구간을 합쳐서 보관
+        import pandas as pd
+        existing = self.fixtures.sources.get(name, {}).get(key)
+        if existing is None or isinstance(existing, RecordedError) or existing.empty:
+            return df
+        merged = pd.concat([existing, df])
+        return merged[~merged.index.duplicated(keep='last')].sort_index()
+
+    def many_prices(self, original):
+        def recorded(tickers, start):
+            frames = original(tickers, start)
+            for ticker, df in frames.items():
+                self.fixtures.put('prices', ticker, self.merge_bars('prices', ticker, df))
+            return frames
+        return recorded
+
+    def translation_backend(self, service):
+        fixtures = self.fixtures
+        backend = service.backend
+
+        class RecordingBackend:
+            name = f"record:{backend.name}"
+
+            def translate_batch(self, texts):
+                out, requests_made = backend.translate_batch(texts)
+                for text, value in zip(texts, out):
+                    fixtures.put('translate', text, value)
+                return out, requests_made
+        return RecordingBackend()
+
+    def ai_stream(self, original):
+        fixtures = self.fixtures
+
+        def recorded(provider, prompt, stats):
+            chunks = []
+            for text in original(provider, prompt, stats):
+                chunks.append(text)
+                yield text
+            value = {'provider': provider.name, 'chunks': chunks, 'tokens': stats.tokens}
+            fixtures.put('ai', _prompt_key(prompt), value)
+            fixtures.put('ai', '*', value)
+        return recorded
+
+
+class Replayer(_Patcher):
+    """fixture 응답을 지연 프로필에 맞춰 돌려줌 (네트워크 사용 없음)"""
+
+    def __init__(self, fixtures, profile='none', seed=0):
+        super().__init__(fixtures)
+        self.latency = LATENCY_PROFILES[profile] if isinstance(profile, str) else profile
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.calls = {}
+
+    def delay(self, name):
+        median, sigma = self.latency.get(name, (0.0, 0.0))
+        with self._rng_lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if median <= 0:
+                return
+            seconds = self._rng.lognormvariate(math.log(median), sigma)
+        time.sleep(seconds)
+
+    def wrap(self, name, fn, key_fn):
+        def replayed(*args, **kwargs):
+            key = key_fn(*args, **kwargs)
+            self.delay(name)
+            value = self.fixtures.get(name, key)
+            if isinstance(value, RecordedError):
+                raise RuntimeError(value.message)
+            if name in ('prices', 'prices_stooq'):
+                start = args[1] if len(args) > 1 else kwargs.get('start')
+                end = args[2] if len(args) > 2 else kwargs.get('end')
+                return _slice_bars(value, start, end)
+            return value
+        return replayed
+
+    def many_prices(self, original):
+        def replayed(tickers, start):
+            self.delay('prices')
+            frames = {}
+            for ticker in tickers:
+                df = self.fixtures.sources.get('prices', {}).get(ticker)
+                if df is not None and not isinstance(df, RecordedError):
+                    frames[ticker] = _slice_bars(df, start)
+            return frames
+        return replayed
+
+    def translation_backend(self, service):
+        replayer = self
+        table = self.fixtures.sources.get('translate', {})
+
+        class ReplayBackend:
+            name = 'replay'
+
+            def translate_batch(self, texts):
+                replayer.delay('translate')
+                return [table.get(t, t) for t in texts], 1
+        return ReplayBackend()
+
+    def ai_stream(self, original):
+        replayer = self
+
+        def replayed(provider, prompt, stats):
+            entries = replayer.fixtures.sources.get('ai', {})
+            value = entries.get(_prompt_key(prompt)) or entries.get('*')
+            if value is None:
+                raise MissingFixture(f"ai:{_prompt_key(prompt)}")
+            replayer.delay('ai_ttft')
+            for i, text in enumerate(value['chunks']):
+                if i:
+                    replayer.delay('ai_chunk')
+                stats.on_chunk(text)
+                yield text
+            stats.finish(value.get('tokens'))
+        return replayed
+
+
+def _prompt_key(prompt):
+    return hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+
+
+def _slice_bars(df, start=None, end=None):
+    import pandas as pd
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start).normalize()]
+    if end is not None:
+        df = df[df.index < pd.Timestamp(end)]
+    return df
+
+
+@contextmanager
+def block_network():
+    """재생 중 교체되지 않은 경로가 실제로 네트워크에 나가지 않도록 연결 차단"""
+    def refuse(*args, **kwargs):
+        raise OSError("network disabled during replay")
+
+    saved = (socket.socket.connect, socket.create_connection, socket.getaddrinfo)
+    socket.socket.connect = refuse
+    socket.create_connection = refuse
+    socket.getaddrinfo = refuse
+    try:
+        yield
+    finally:
+        socket.socket.connect, socket.create_connection, socket.getaddrinfo = saved
+
+
+def reset_caches():
+    """프로세스 안의 모든 캐시(단계 캐시, 디스크 캐시, 메모)를 비워 콜드 실행 상태로"""
+    _import_pipeline()
+    from dashboard import (charts, images, indicators, links, og_image, price_sources, price_store, shared_cache,
+                           stage_cache, translation)
+    stage_cache.clear_stages()
+    backend = shared_cache.get_backend()
+    if backend is not None:
+        backend.clear()
+    price_store.clear_store()
+    price_sources.get_resolver().reset()
+    for cache in (og_image.get_cache(), links.get_cache(), images.get_cache()):
+        cache.clear()
+    service = translation.get_service()
+    with service._lock:
+        service._lru.clear()
+    if service.store is not None:
+        service.store.clear()
+    for memo, lock in ((links._memo, links._memo_lock), (indicators._memo, indicators._memo_lock),
+                       (charts._figures, charts._figures_lock)):
+        with lock:
+            memo.clear()
+
+
+# --- 합성 fixture (녹화본이 없을 때) ---
+
+_SUBJECTS = ['shares', 'stock', 'earnings', 'revenue', 'guidance', 'chip sales', 'AI spending', 'buyback']
+_VERBS = ['jumps', 'falls', 'surges', 'slips', 'beats estimates', 'misses estimates', 'hits record']
+_TAILS = ['after earnings', 'ahead of Fed meeting', 'amid AI boom', 'in premarket trading', 'this week',
+          'on China export curbs', 'as investors rotate', 'following CEO comments']
+
+
+def _synthetic_bars(seed, years):
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end=pd.Timestamp(datetime.now().date()), periods=years * 252, name='Date')
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0004, 0.02, len(idx))))
+    spread = close * rng.uniform(0.002, 0.02, len(idx))
+    open_ = close * (1 + rng.normal(0, 0.005, len(idx)))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(1_000_000, 50_000_000, len(idx)).astype(float),
+    }, index=idx)
+
+
+def _legacy_google_link(url):
+    # 구형 Google News 기사 id 형식 (URL이 base64로 들어 있어 오프라인 디코딩 가능)
+    import base64
+    raw = url.encode('utf-8')
+    payload = b'\x08\x13\x22' + bytes([len(raw)]) + raw + b'\xd2\x01\x00'
+    return f"https://news.google.com/rss/articles/{base64.urlsafe_b64encode(payload).decode().rstrip('=')}?oc=5"
+
+
+def synthetic_fixtures(tickers, seed=7, years=20):
+    """네트워크 없이 만든 결정적 fixture (가격 years년, 소스별 뉴스, 번역, 이미지, AI 응답)"""
+    from dashboard.images import image_keyword
+    from dashboard.news import NEWS_TARGET_SITES
+
+    fx = Fixtures(meta={'kind': 'synthetic', 'seed': seed, 'tickers': list(tickers),
+                        'created_at': datetime.now().isoformat(timespec='seconds')})
+    rng = random.Random(seed)
+    now = datetime.now()
+    for n, ticker in enumerate(tickers):
+        df = _synthetic_bars(seed + n, years)
+        fx.put('prices', ticker, df)
+        fx.put('prices_stooq', ticker, df)
+        info = {'longName': f"{ticker} Holdings Inc.", 'shortName': ticker,
+                'currentPrice': float(df['Close'].iloc[-1]), 'regularMarketPrice': float(df['Close'].iloc[-1]),
+                'marketCap': rng.randint(10, 3000) * 10 ** 9, 'trailingPE': round(rng.uniform(8, 80), 2)}
+        # 실제 info처럼 화면에서 쓰지 않는 필드가 많음
+        info.update({f"field_{i}": rng.random() for i in range(150)})
+        fx.put('info', ticker, info)
+
+        titles = []
+
+        def headline():
+            if titles and rng.random() < 0.35:
+                base = rng.choice(titles)
+                return f"{base} - {rng.choice(['Reuters', 'CNBC', 'Bloomberg'])}"
+            return f"{ticker} {rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_TAILS)}"
+
+        def items(publisher, count, google=False):
+            out = []
+            for _ in range(count):
+                title = headline()
+                titles.append(title)
+                url = f"https://example.com/{ticker.lower()}/{len(titles)}"
+                out.append({'title': title, 'link': _legacy_google_link(url) if google else url,
+                            'publisher': publisher, 'date': (now - timedelta(hours=len(titles))).isoformat()})
+            return out
+
+        for source_name, _ in NEWS_TARGET_SITES:
+            fx.put('ddgs_news', f"{ticker}|{source_name}", items(source_name, 2))
+        fx.put('yahoo_news', ticker, items('Yahoo Finance', 5))
+        fx.put('google_news', ticker, items('Google News', 5, google=True))
+        for i, title in enumerate(titles):
+            fx.put('translate', title, f"[번역] {title}")
+            fx.put('og_image', f"https://example.com/{ticker.lower()}/{i + 1}",
+                   f"https://img.example.com/{ticker.lower()}/{i + 1}.jpg" if i % 3 else '')
+        fx.put('company_images', image_keyword(ticker, info['longName']),
+               [{'url': f"https://img.example.com/{ticker.lower()}/product{i}.jpg",
+                 'title': f"{ticker} product {i}", 'source': 'example.com'} for i in range(4)])
+
+    report = "ㅡㅡㅡㅡㅡ\n\n" + "이 종목은 최근 변동성이 커졌습니다. " * 80
+    fx.put('ai', '*', {'provider': 'gemini-1', 'chunks': [report[i:i + 40] for i in range(0, len(report), 40)],
+                       'tokens': len(report) // 3})
+    return fx
+
+
+# --- 녹화 CLI ---
+
+def record(tickers, path, with_ai=False):
+    """실제 네트워크로 단일 종목 화면과 같은 데이터를 수집하면서 녹화"""
+    import os
+    import tempfile
+    # 기존 캐시에 걸리면 외부 호출이 일어나지 않으므로 빈 캐시 폴더에서 실행
+    os.environ['STOCK_DASHBOARD_CACHE_DIR'] = tempfile.mkdtemp(prefix='replay-record-')
+    from dashboard.ai_report import (collect_image_list, generate_ai_analysis, summarize_news,
+                                     summarize_price_data)
+    from dashboard.batch import load_keys
+    from dashboard.data import get_company_name, get_dashboard_data, get_prices
+    from dashboard.images import get_company_images
+    from dashboard.watchlist import build_watchlist_summary
+
+    fixtures = Fixtures(meta={'kind': 'recorded', 'tickers': list(tickers),
+                              'created_at': datetime.now().isoformat(timespec='seconds')})
+    with Recorder(fixtures):
+        for ticker in tickers:
+            df, info, news, error_msg = get_dashboard_data(ticker)
+            get_prices(ticker, 40 * 365)
+            images = get_company_images(ticker, get_company_name(ticker))
+            if with_ai:
+                generate_ai_analysis(ticker, summarize_price_data(ticker, df), summarize_news(news),
+                                     collect_image_list(ticker, images, news), load_keys())
+            print(f"[record] {ticker}: {0 if df is None else len(df)} bars, {len(news)} news"
+                  + (f" ({error_msg})" if error_msg else ""))
+        build_watchlist_summary(list(tickers), with_info=True, with_news=False)
+    fixtures.save(path)
+    print(f"[record] saved {fixtures.counts()} -> {path}")
+    return fixtures
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="외부 소스 녹화 (재생은 bench/bench_pipeline.py)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help="실제 네트워크로 fixture 녹화")
+    rec.add_argument('tickers', nargs='+')
+    rec.add_argument('--out', required=True, help="저장할 fixture 파일 (.pkl)")
+    rec.add_argument('--with-ai', action='store_true', help="AI 리포트도 녹화 (API 키 필요)")
+    show = sub.add_parser('show', help="fixture 내용 요약")
+    show.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record([t.upper() for t in args.tickers], args.out, args.with_ai)
+    else:
+        fixtures = Fixtures.load(args.path)
+        print(json.dumps({'meta': fixtures.meta, 'counts': fixtures.counts()}, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    # fixture 안의 RecordedError가 __main__이 아닌 dashboard.replay 경로로 pickle 되도록 모듈로 다시 import
+    from dashboard.replay import main as module_main
+    module_main()
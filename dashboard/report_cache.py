@@ -0,0 +1,161 @@
+"""AI 리포트 캐시 (프롬프트 입력 해시 기반, SQLite)
+
+같은 data_summary / 뉴스 요약 / 이미지 목록이면 저장된 리포트를 재사용한다. 키에는 리포트를 실제로
+쓴 모델이 들어간다 (Groq가 쓴 리포트는 Groq 모델 키로 저장). 생성 전에는 어느 모델이 쓸지 모르므로
+report_keys()로 모델별 키를 만들고, find()는 REPORT_MODELS 순서(주 모델 우선)로 찾는다.
+ignore_dates=True면 뉴스의 날짜 필드(DDGS 결과는 매번 datetime.now()로 채워짐)처럼
+사소한 차이는 무시하고 같은 입력으로 취급한다.
+TTL이 지난 항목은 조회되지 않으며, 전체 크기가 MAX_BYTES를 넘으면 오래 안 쓴 순서로 지운다.
+리포트 생성은 report_flight(key)로 감싸서 같은 입력의 리포트를 여러 세션/프로세스가 동시에
+만들지 않게 한다 (나중에 온 쪽은 먼저 시작한 쪽이 끝날 때까지 기다렸다가 저장된 리포트를 씀).
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from dashboard.ai_router import GEMINI_MODEL, GROQ_MODEL
+from dashboard.kvstore import CACHE_DIR
+from dashboard.shared_cache import get_shared
+
+REPORT_TTL = 24 * 3600
+REPORT_LEASE_TTL = 180.0     # 생성 중 프로세스가 죽었을 때 다른 곳이 이어받기까지
+REPORT_WAIT = 120.0
+MAX_BYTES = 20 * 1024 * 1024
+REPORT_MODELS = (GEMINI_MODEL, GROQ_MODEL)     # 조회 우선순위
+
+_DATE_FIELD_RE = re.compile(r'(날짜: )[^,)\n]*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_inputs(df_summary, news_summary, image_list, ignore_dates=False):
+    news = news_summary or ''
+    if ignore_dates:
+        news = _DATE_FIELD_RE.sub(r'\1', news)
+    return {
+        'data': _WHITESPACE_RE.sub(' ', df_summary or '').strip(),
+        'news': _WHITESPACE_RE.sub(' ', news).strip(),
+        'images': [img.get('url', '') for img in image_list or []],
+    }
+
+
+def report_key(ticker, df_summary, news_summary, image_list, model=GEMINI_MODEL, ignore_dates=False):
+    payload = {
+        'ticker': ticker,
+        'model': model,
+        'inputs': normalize_inputs(df_summary, news_summary, image_list, ignore_dates),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()
+
+
+def report_keys(ticker, df_summary, news_summary, image_list, ignore_dates=False):
+    """{모델: 키} (REPORT_MODELS 순서)"""
+    return {model: report_key(ticker, df_summary, news_summary, image_list, model, ignore_dates)
+            for model in REPORT_MODELS}
+
+
+class ReportCache:
+    def __init__(self, path=None, ttl=REPORT_TTL, max_bytes=MAX_BYTES):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'reports.sqlite')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                " key TEXT PRIMARY KEY, ticker TEXT, provider TEXT, text TEXT NOT NULL,"
+                " size INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.commit()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evicted': 0}
+
+    def get(self, key):
+        """{'text', 'provider', 'created_at'} 또는 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, provider, created_at FROM reports WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self._conn.execute("UPDATE reports SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+        return {'text': row[0], 'provider': row[1], 'created_at': row[2]}
+
+    def find(self, keys):
+        """report_keys() 중 먼저 찾은 리포트 (주 모델 우선) 또는 None"""
+        for key in keys.values():
+            report = self.get(key)
+            if report is not None:
+                return report
+        return None
+
+    def has(self, keys):
+        """report_keys() 중 하나라도 저장돼 있는지 (통계/접근 시각은 건드리지 않음)"""
+        keys = list(keys.values())
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM reports WHERE key IN ({','.join('?' * len(keys))}) AND created_at > ? LIMIT 1",
+                (*keys, time.time() - self.ttl)
+            ).fetchone()
+        return row is not None
+
+    def store(self, keys, text, ticker, stats):
+        """리포트를 실제로 쓴 모델(stats.model)의 키로 저장"""
+        self.put(keys[stats.model], text, ticker, stats.provider)
+
+    def put(self, key, text, ticker='', provider=''):
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, ticker, provider, text, size, now, now)
+            )
+            self.stats['stores'] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        """만료 항목 삭제 후 크기 한도를 넘으면 last_access 오래된 순으로 삭제"""
+        cur = self._conn.execute("DELETE FROM reports WHERE created_at <= ?", (now - self.ttl,))
+        self.stats['evicted'] += cur.rowcount
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM reports").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM reports ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM reports WHERE key = ?", (key,))
+            total -= size
+            self.stats['evicted'] += 1
+
+
+_cache = None
+
+
+def get_report_cache():
+    global _cache
+    if _cache is None:
+        _cache = ReportCache()
+    return _cache
+
+
+def report_flight(keys):
+    """with report_flight(keys): 안에서 캐시를 다시 확인한 뒤 없을 때만 리포트 생성 (입력이 같으면 같은 잠금)
+
+    리포트는 ReportCache에 저장되므로 기다리는 쪽은 그곳에 리포트가 생기는 즉시 빠져나온다.
+    """
+    return get_shared('reports').single_flight(keys[REPORT_MODELS[0]], lease_ttl=REPORT_LEASE_TTL,
+                                               wait=REPORT_WAIT, ready=lambda: get_report_cache().has(keys))
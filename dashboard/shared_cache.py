@@ -0,0 +1,337 @@
+"""프로세스/레플리카 간 공유 캐시 + single-flight 잠금
+
+여러 Streamlit 워커(로드 밸런서 뒤 레플리카)가 같은 종목의 뉴스/기업 정보/주가/AI 리포트를
+각자 받지 않도록, 단계 결과를 공유 백엔드에 저장하고 같은 키의 원본 조회는 한 곳에서만 실행한다.
+  - 같은 프로세스: 키별 threading.Lock (기다리는 쪽이 없으면 지움, wait 초까지만 기다림)
+  - 다른 프로세스: 백엔드 lease (만료 시간이 있는 소유권). lease를 못 잡으면 주인이 끝낼 때까지
+    값이 생기는지 보면서 기다리고, WAIT_TIMEOUT이 지나면 직접 조회한다.
+
+백엔드 인터페이스 (CacheBackend) - Redis로 옮길 때의 대응
+  get(key)                      -> GET
+  set(key, value, ttl)          -> SET key value PX ttl
+  acquire(key, owner, ttl)      -> SET lock:key owner NX PX ttl
+  release(key, owner)           -> owner가 같을 때만 DEL (Lua)
+  clear()                       -> 네임스페이스 키 삭제
+값은 pickle bytes로 저장한다. 빈 결과(None, 빈 dict/list)는 일시적 실패일 수 있으므로 EMPTY_TTL까지만
+저장하고, 만료된 항목/lease는 PRUNE_INTERVAL마다 백엔드에서 지운다. 백엔드는 STOCK_DASHBOARD_SHARED_CACHE 환경 변수
+(sqlite / memory / off, 기본 sqlite: CACHE_DIR/shared.sqlite)나 set_backend()로 정한다.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from dashboard.kvstore import CACHE_DIR
+from dashboard.telemetry import record, span
+
+LEASE_TTL = 30.0            # 조회 중 프로세스가 죽어도 이 시간이 지나면 다른 곳이 이어받음
+WAIT_TIMEOUT = 20.0         # 다른 프로세스의 조회를 기다리는 최대 시간
+POLL_INTERVAL = 0.1
+EMPTY_TTL = 60.0            # 빈 결과를 공유 캐시에 두는 최대 시간
+PRUNE_INTERVAL = 300.0      # 만료 항목 정리 주기
+
+_MISSING = object()
+
+
+def is_empty(value):
+    """None / 빈 dict·list·tuple·str (일시적 실패일 수 있어 짧게만 캐시)"""
+    return value is None or (isinstance(value, (dict, list, tuple, str)) and not value)
+
+
+class CacheBackend:
+    """공유 캐시 백엔드 인터페이스 (값은 bytes)"""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def acquire(self, key, owner, ttl):
+        """lease 획득 성공 여부 (이미 다른 owner가 갖고 있고 만료 전이면 False)"""
+        raise NotImplementedError
+
+    def release(self, key, owner):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class SQLiteBackend(CacheBackend):
+    """같은 호스트(또는 공유 볼륨)의 프로세스끼리 공유. 잠금은 SQLite 파일 잠금에 맡김"""
+
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, 'shared.sqlite')
+        self.path = path
+        self._lock = threading.Lock()
+        self._pruned_at = time.time()
+        # 문장 하나가 곧 트랜잭션 (acquire의 upsert가 원자적으로 실행됨)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, value, expires_at))
+            if now - self._pruned_at >= PRUNE_INTERVAL:
+                self._pruned_at = now
+                self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+                self._conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def acquire(self, key, owner, ttl):
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE"
+                " SET owner = excluded.owner, expires_at = excluded.expires_at WHERE leases.expires_at <= ?",
+                (key, owner, now + ttl, now)
+            )
+        return cur.rowcount == 1
+
+    def release(self, key, owner):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM leases")
+
+
+class MemoryBackend(CacheBackend):
+    """프로세스 안에서만 공유 (테스트/벤치마크, 원격 백엔드 대역)"""
+
+    def __init__(self):
+        self._entries = {}
+        self._leases = {}
+        self._lock = threading.Lock()
+        self._pruned_at = time.time()
+
+    def get(self, key):
+        with self._lock:
+            value, expires_at = self._entries.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return value
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (value, now + ttl if ttl else None)
+            if now - self._pruned_at >= PRUNE_INTERVAL:
+                self._pruned_at = now
+                for k in [k for k, (_, exp) in self._entries.items() if exp is not None and exp <= now]:
+                    del self._entries[k]
+                for k in [k for k, (_, exp) in self._leases.items() if exp <= now]:
+                    del self._leases[k]
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def acquire(self, key, owner, ttl):
+        now = time.time()
+        with self._lock:
+            held = self._leases.get(key)
+            if held is not None and held[1] > now:
+                return False
+            self._leases[key] = (owner, now + ttl)
+            return True
+
+    def release(self, key, owner):
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._leases.clear()
+
+
+class SharedCache:
+    """네임스페이스 하나 (키 앞에 "<namespace>:" 를 붙여 백엔드에 저장)"""
+
+    def __init__(self, namespace, backend=None):
+        self.namespace = namespace
+        self._backend = backend
+        self._key_locks = {}
+        self._key_locks_lock = threading.Lock()
+        self._owner = uuid.uuid4().hex
+        self.stats = {'hits': 0, 'misses': 0, 'waits': 0, 'fetches': 0}
+
+    @property
+    def backend(self):
+        return self._backend or get_backend()
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _local_lock(self, key):
+        """키별 잠금 + 사용 중인 수 (0이 되면 _release_local에서 지움)"""
+        with self._key_locks_lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _release_local(self, key):
+        with self._key_locks_lock:
+            entry = self._key_locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[key]
+
+    def get(self, key, default=None):
+        backend = self.backend
+        raw = backend.get(self._key(key)) if backend is not None else None
+        return default if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        backend = self.backend
+        if backend is not None:
+            backend.set(self._key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ttl)
+
+    @contextmanager
+    def single_flight(self, key, lease_ttl=LEASE_TTL, wait=WAIT_TIMEOUT, ready=None):
+        """같은 키의 원본 조회를 한 곳에서만. yield True = 내가 조회, False = 다른 곳이 끝냄(캐시 다시 확인)
+
+        ready: 값이 이미 저장됐는지 확인하는 함수. 값을 공유 백엔드가 아닌 곳(ReportCache, KVStore 등)에
+        저장할 때 넘기면 기다리던 쪽이 잠금 해제를 기다리지 않고 값이 생기는 즉시 빠져나온다.
+        """
+        backend = self.backend
+        if ready is None:
+            def ready():
+                return backend is not None and backend.get(self._key(key)) is not None
+        started = time.perf_counter()
+        deadline = time.monotonic() + wait
+        lock = self._local_lock(key)
+        try:
+            acquired = lock.acquire(blocking=False)
+            while not acquired and time.monotonic() < deadline and not ready():
+                acquired = lock.acquire(timeout=min(POLL_INTERVAL, max(deadline - time.monotonic(), 0.0)))
+            if not acquired:
+                # 같은 프로세스의 다른 세션이 끝냈거나 wait 안에 끝내지 못함 - 값이 없으면 직접 조회
+                self._waited(started)
+                yield not ready()
+                return
+            try:
+                if backend is None:
+                    yield True
+                    return
+                name = f"lock:{self._key(key)}"
+                owner = f"{self._owner}:{threading.get_ident()}"
+                leader = backend.acquire(name, owner, lease_ttl)
+                while not leader and time.monotonic() < deadline:
+                    if ready():
+                        break
+                    time.sleep(POLL_INTERVAL)
+                    leader = backend.acquire(name, owner, lease_ttl)
+                if not leader:
+                    self._waited(started)
+                    # 기다려도 값이 없으면(주인이 실패/시간 초과) 직접 조회
+                    yield not ready()
+                    return
+                try:
+                    yield True
+                finally:
+                    backend.release(name, owner)
+            finally:
+                lock.release()
+        finally:
+            self._release_local(key)
+
+    def _waited(self, started):
+        self.stats['waits'] += 1
+        record(f"shared.{self.namespace}.wait", time.perf_counter() - started)
+
+    def get_or_fetch(self, key, fn, ttl, lease_ttl=LEASE_TTL, wait=WAIT_TIMEOUT):
+        """공유 캐시 값, 없으면 single-flight로 fn() 실행 후 저장 (fn의 예외는 저장하지 않음)"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats['hits'] += 1
+            return value
+        self.stats['misses'] += 1
+        with self.single_flight(key, lease_ttl, wait):
+            # 기다리는 동안(또는 lease를 잡기 직전에) 다른 곳이 채웠을 수 있음
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            self.stats['fetches'] += 1
+            with span(f"shared.{self.namespace}.fetch"):
+                value = fn()
+            self.set(key, value, min(ttl, EMPTY_TTL) if is_empty(value) else ttl)
+            return value
+
+
+_backend = None
+_backend_ready = False
+_backend_lock = threading.Lock()
+_caches = {}
+
+
+def _default_backend():
+    kind = os.environ.get('STOCK_DASHBOARD_SHARED_CACHE', 'sqlite').lower()
+    if kind == 'off':
+        return None
+    if kind == 'memory':
+        return MemoryBackend()
+    return SQLiteBackend()
+
+
+def get_backend():
+    global _backend, _backend_ready
+    with _backend_lock:
+        if not _backend_ready:
+            _backend, _backend_ready = _default_backend(), True
+        return _backend
+
+
+def set_backend(backend):
+    """백엔드 교체 (예: Redis 구현). None이면 공유 캐시 끔"""
+    global _backend, _backend_ready
+    with _backend_lock:
+        _backend, _backend_ready = backend, True
+
+
+def get_shared(namespace):
+    with _backend_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = SharedCache(namespace)
+        return cache
+
+
+def shared_stats():
+    """{네임스페이스: hits/misses/waits/fetches}"""
+    with _backend_lock:
+        return {name: dict(cache.stats) for name, cache in _caches.items()}
@@ -0,0 +1,167 @@
+"""단계별 인메모리 캐시 (TTL + max_entries + stale-while-revalidate)
+
+st.cache_data는 TTL이 지나면 다음 요청이 새 값을 받을 때까지 기다려야 한다.
+여기서는 TTL이 지난 값도 stale_ttl 동안은 즉시 반환하고, 같은 키의 갱신은
+백그라운드 스레드에서 한 번만 실행한다. 반환값은 복사하지 않으므로 호출자는
+결과를 수정하지 않아야 한다. 로컬 미스도 같은 키는 한 번만 조회하고 (동시에 들어온 요청은
+그 결과를 기다림), 예외는 캐시하지 않는다. 빈 결과는 공유 캐시와 같이 EMPTY_TTL까지만 두고
+stale로도 반환하지 않는다.
+
+shared=True인 단계는 로컬에 없을 때 공유 캐시(shared_cache)를 먼저 보고, 없으면 다른 프로세스와
+겹치지 않게 single-flight로 한 번만 원본을 조회해 공유 캐시에도 저장한다.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError
+
+from dashboard.compact import deep_sizeof
+from dashboard.shared_cache import EMPTY_TTL, get_shared, is_empty
+from dashboard.telemetry import span
+
+REFRESH_WORKERS = 4
+INFLIGHT_WAIT = 30.0        # 같은 키를 조회 중인 세션을 기다리는 최대 시간 (지나면 직접 조회)
+
+_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='stage-refresh')
+_stages = {}
+
+
+class StageCache:
+    def __init__(self, name, fn, ttl, max_entries=128, stale_ttl=None, shared=False, restore=None):
+        self.name = name
+        self.fn = fn
+        # 공유 캐시 사용 시 키는 인자 repr, restore는 공유 캐시에서 읽은 값을 로컬용으로 되돌리는 함수
+        self.shared = get_shared(f"stage.{name}") if shared else None
+        self.restore = restore
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # stale 값을 허용하는 추가 시간 (None이면 TTL의 10배)
+        self.stale_ttl = ttl * 10 if stale_ttl is None else stale_ttl
+        self._entries = OrderedDict()   # key -> (value, stored_at, ttl, stale_ttl)
+        self._refreshing = set()
+        self._inflight = {}             # key -> Future (같은 키 미스를 한 번만 조회)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'waits': 0, 'refreshes': 0, 'errors': 0}
+
+    def _store(self, key, value):
+        ttl, stale_ttl = (min(self.ttl, EMPTY_TTL), 0.0) if is_empty(value) else (self.ttl, self.stale_ttl)
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), ttl, stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _compute(self, key, args, kwargs):
+        if self.shared is None:
+            return self.fn(*args, **kwargs)
+        value = self.shared.get_or_fetch(repr(key), lambda: self.fn(*args, **kwargs), self.ttl)
+        return self.restore(value) if self.restore else value
+
+    def _refresh(self, key, args, kwargs):
+        try:
+            with span(f"stage.{self.name}.refresh"):
+                self._store(key, self._compute(key, args, kwargs))
+            with self._lock:
+                self.stats['refreshes'] += 1
+        except Exception as e:
+            print(f"[cache:{self.name}] background refresh failed for {key}: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, ttl, stale_ttl = entry
+                age = now - stored_at
+                if age < ttl:
+                    self.stats['hits'] += 1
+                    self._entries.move_to_end(key)
+                    return value
+                if age < ttl + stale_ttl:
+                    self.stats['stale_hits'] += 1
+                    self._entries.move_to_end(key)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        _executor.submit(self._refresh, key, args, kwargs)
+                    return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                self.stats['misses'] += 1
+                flight = self._inflight[key] = Future()
+            else:
+                self.stats['waits'] += 1
+        if not leader:
+            # 다른 세션이 같은 키를 조회 중 - 그 결과(또는 예외)를 그대로 씀
+            try:
+                return flight.result(timeout=INFLIGHT_WAIT)
+            except (CancelledError, TimeoutError):
+                # 조회하던 세션이 중단됐거나(리런 등) 너무 오래 걸림 - 직접 조회
+                with span(f"stage.{self.name}"):
+                    value = self._compute(key, args, kwargs)
+                self._store(key, value)
+                return value
+
+        try:
+            with span(f"stage.{self.name}"):
+                value = self._compute(key, args, kwargs)
+            self._store(key, value)
+            flight.set_result(value)
+            return value
+        except Exception as e:
+            with self._lock:
+                self.stats['errors'] += 1
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            # Exception이 아닌 중단(KeyboardInterrupt, Streamlit 리런 등)은 기다리는 쪽에 넘기지 않고 취소로 알림
+            flight.cancel()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def memory_by_key(self):
+        """{(args, kwargs): 캐시 값의 대략적인 바이트 수}"""
+        with self._lock:
+            entries = [(key, entry[0]) for key, entry in self._entries.items()]
+        return {key: deep_sizeof(value) for key, value in entries}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def cached_stage(name, ttl, max_entries=128, stale_ttl=None, shared=False, restore=None):
+    """함수를 StageCache로 감싸는 데코레이터. wrapper.cache 로 통계/clear 접근"""
+    def decorator(fn):
+        cache = StageCache(name, fn, ttl, max_entries, stale_ttl, shared, restore)
+        _stages[name] = cache
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return cache.get(*args, **kwargs)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def stage_stats():
+    """{단계 이름: 통계 + 현재 항목 수}"""
+    return {name: dict(cache.stats, entries=len(cache), bytes=sum(cache.memory_by_key().values()))
+            for name, cache in _stages.items()}
+
+
+def clear_stages():
+    """모든 단계 캐시 비우기 (벤치마크/테스트용)"""
+    for cache in _stages.values():
+        cache.clear()
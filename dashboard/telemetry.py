@@ -0,0 +1,134 @@
+"""단계별 소요 시간/오류 집계 (span API)
+
+외부 호출과 계산 단계를 span("이름")으로 감싸면 호출 수, 오류 수, 총/최대/최근 소요 시간이
+프로세스 전체와 현재 세션(bind_session으로 연결한 Registry)에 함께 쌓인다.
+세션은 contextvars로 전달되므로 fan_out / progressive.submit 워커에서 기록한 값도
+요청한 세션에 합산된다. 집계는 JSON lines나 Prometheus 텍스트 형식으로 내보낼 수 있다.
+
+이름 규칙: "<영역>.<세부>" (예: prices.yfinance, news.DDGS:CNBC, ai.gemini-1, chart.build)
+"""
+import contextvars
+import functools
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Registry:
+    """span 이름별 집계 (count / errors / total / max / last / last_error)"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, name, elapsed, error=None):
+        with self._lock:
+            s = self._stats.get(name)
+            if s is None:
+                s = self._stats[name] = {'count': 0, 'errors': 0, 'total': 0.0, 'max': 0.0,
+                                         'last': 0.0, 'last_error': None}
+            s['count'] += 1
+            s['total'] += elapsed
+            s['max'] = max(s['max'], elapsed)
+            s['last'] = elapsed
+            if error is not None:
+                s['errors'] += 1
+                s['last_error'] = str(error)[:200]
+
+    def rows(self):
+        """[{span, count, errors, total, avg, max, last, last_error}] (총 소요 시간 순)"""
+        with self._lock:
+            rows = [dict(s, span=name, avg=s['total'] / s['count'] if s['count'] else 0.0)
+                    for name, s in self._stats.items()]
+        return sorted(rows, key=lambda r: r['total'], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+PROCESS = Registry()
+_session = contextvars.ContextVar('telemetry_session', default=None)
+
+
+def bind_session(registry):
+    """현재 실행 흐름(과 여기서 시작한 워커)의 기록을 registry에도 합산"""
+    _session.set(registry)
+
+
+def current_session():
+    return _session.get()
+
+
+def record(name, elapsed, error=None):
+    PROCESS.record(name, elapsed, error)
+    session = _session.get()
+    if session is not None:
+        session.record(name, elapsed, error)
+
+
+@contextmanager
+def span(name):
+    """with span("news.yahoo"): ... - 예외는 오류로 기록한 뒤 그대로 전달"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        record(name, time.perf_counter() - start, e)
+        raise
+    record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """함수 전체를 span으로 감싸는 데코레이터"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def run_in_context(fn):
+    """다른 스레드에서 실행할 fn을 현재 context(세션 연결 포함)로 감싸서 반환"""
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, fn)
+
+
+# --- 내보내기 ---
+
+def to_jsonl(registry=PROCESS, scope='process'):
+    ts = time.time()
+    return "".join(json.dumps(dict(row, scope=scope, ts=ts), ensure_ascii=False) + "\n"
+                   for row in registry.rows())
+
+
+_LABEL_ESCAPE = re.compile(r'(["\\])')
+
+
+def to_prometheus(registry=PROCESS, prefix='stock_dashboard_span'):
+    """Prometheus 텍스트 노출 형식 (summary의 _count/_sum + 최대값/오류 수)"""
+    rows = registry.rows()
+    lines = [
+        f"# HELP {prefix}_seconds Time spent in each pipeline span.",
+        f"# TYPE {prefix}_seconds summary",
+    ]
+    for row in rows:
+        label = _LABEL_ESCAPE.sub(r'\\\1', row['span'])
+        lines.append(f'{prefix}_seconds_count{{span="{label}"}} {row["count"]}')
+        lines.append(f'{prefix}_seconds_sum{{span="{label}"}} {row["total"]:.6f}')
+    lines += [f"# HELP {prefix}_max_seconds Slowest single call per span.",
+              f"# TYPE {prefix}_max_seconds gauge"]
+    for row in rows:
+        label = _LABEL_ESCAPE.sub(r'\\\1', row['span'])
+        lines.append(f'{prefix}_max_seconds{{span="{label}"}} {row["max"]:.6f}')
+    lines += [f"# HELP {prefix}_errors_total Failed calls per span.",
+              f"# TYPE {prefix}_errors_total counter"]
+    for row in rows:
+        label = _LABEL_ESCAPE.sub(r'\\\1', row['span'])
+        lines.append(f'{prefix}_errors_total{{span="{label}"}} {row["errors"]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,200 @@
+"""뉴스 제목 번역 서비스 (배치 요청 + LRU/디스크 캐시)
+
+제목 여러 개를 줄바꿈으로 이어 붙여 한 번의 요청으로 번역하고, 결과는
+내용 해시 기준으로 메모리 LRU와 디스크(KVStore)에 저장한다.
+백엔드는 교체 가능하며, STOCK_DASHBOARD_TRANSLATOR=stub 이면 네트워크 없이 동작한다.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dashboard.http_client import host_slot
+from dashboard.kvstore import KVStore
+from dashboard.telemetry import span
+
+TARGET_LANG = 'ko'
+BATCH_CHAR_LIMIT = 4500     # Google 번역 요청 1회 최대 5000자
+LRU_SIZE = 2048
+DISK_TTL = 30 * 24 * 3600
+FALLBACK_TTL = 3600         # 빈 결과/원문 그대로인 결과 - 일시적 실패일 수 있어 짧게만 보관
+
+
+class GoogleBackend:
+    """deep_translator GoogleTranslator 기반 백엔드 (인스턴스 재사용)"""
+    name = 'google'
+
+    def __init__(self, target=TARGET_LANG):
+        from deep_translator import GoogleTranslator
+        self._translator = GoogleTranslator(source='auto', target=target)
+        self._lock = threading.Lock()
+
+    def _translate(self, text):
+        with span('translate.request'), host_slot('translate.google.com'):
+            return self._translator.translate(text)
+
+    def translate_batch(self, texts):
+        """texts를 BATCH_CHAR_LIMIT 단위로 묶어 요청. 요청 횟수도 함께 반환"""
+        out = []
+        requests_made = 0
+        for chunk in _chunk_texts(texts, BATCH_CHAR_LIMIT):
+            with self._lock:
+                translated = self._translate("\n".join(chunk))
+                requests_made += 1
+                lines = (translated or '').split("\n")
+                if len(lines) != len(chunk):
+                    # 줄 수가 어긋나면 해당 묶음만 개별 번역으로 대체
+                    lines = []
+                    for text in chunk:
+                        lines.append(self._translate(text) or text)
+                        requests_made += 1
+            out.extend(line.strip() for line in lines)
+        return out, requests_made
+
+
+class StubBackend:
+    """오프라인/테스트용 백엔드 - 네트워크 없이 접두어만 붙여 반환"""
+    name = 'stub'
+
+    def __init__(self, prefix='[ko] '):
+        self.prefix = prefix
+
+    def translate_batch(self, texts):
+        return [f"{self.prefix}{t}" for t in texts], 1
+
+
+def _chunk_texts(texts, limit):
+    chunk, size = [], 0
+    for text in texts:
+        if chunk and size + len(text) + 1 > limit:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 1
+    if chunk:
+        yield chunk
+
+
+def _key(text, target):
+    return hashlib.sha1(f"{target}\x00{text}".encode('utf-8')).hexdigest()
+
+
+class TranslationService:
+    def __init__(self, backend=None, target=TARGET_LANG, store=None, lru_size=LRU_SIZE):
+        self._backend = backend
+        self.target = target
+        self.store = store
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'texts': 0, 'lru_hits': 0, 'disk_hits': 0, 'translated': 0,
+            'requests': 0, 'chars': 0, 'seconds': 0.0, 'errors': 0,
+        }
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = GoogleBackend(self.target)
+        return self._backend
+
+    def _remember(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def translate_many(self, texts):
+        """texts 순서대로 번역 결과 반환 (실패한 항목은 원문 유지)"""
+        keys = [_key(t, self.target) for t in texts]
+        result = {}
+        with self._lock:
+            self.stats['texts'] += len(texts)
+            for key in keys:
+                if key in self._lru:
+                    result[key] = self._lru[key]
+                    self._lru.move_to_end(key)
+            self.stats['lru_hits'] += len(result)
+
+        missing = {k: t for k, t in zip(keys, texts) if k not in result and t}
+        if missing and self.store is not None:
+            on_disk = self.store.get_many(list(missing))
+            with self._lock:
+                self.stats['disk_hits'] += len(on_disk)
+                for key, value in on_disk.items():
+                    if value != missing[key]:
+                        self._remember(key, value)
+            result.update(on_disk)
+            missing = {k: t for k, t in missing.items() if k not in on_disk}
+
+        if missing:
+            todo = list(missing.items())
+            start = time.perf_counter()
+            try:
+                translated, requests_made = self.backend.translate_batch([t for _, t in todo])
+            except Exception as e:
+                print(f"Translation error: {e}")
+                with self._lock:
+                    self.stats['errors'] += 1
+                translated, requests_made = None, 0
+            elapsed = time.perf_counter() - start
+
+            if translated:
+                fresh, fallback = {}, {}
+                for (key, text), value in zip(todo, translated):
+                    if value and value != text:
+                        fresh[key] = value
+                    else:
+                        fallback[key] = text
+                result.update(fresh)
+                result.update(fallback)
+                if self.store is not None:
+                    self.store.set_many(fresh, ttl=DISK_TTL)
+                    self.store.set_many(fallback, ttl=FALLBACK_TTL)
+                with self._lock:
+                    # 원문 대체값은 TTL이 없는 LRU에 넣지 않음 (디스크의 짧은 TTL이 지나면 다시 번역)
+                    for key, value in fresh.items():
+                        self._remember(key, value)
+                    self.stats['translated'] += len(fresh)
+                    self.stats['chars'] += sum(len(t) for _, t in todo)
+            with self._lock:
+                self.stats['requests'] += requests_made
+                self.stats['seconds'] += elapsed
+
+        return [result.get(k, t) for k, t in zip(keys, texts)]
+
+    def summary(self):
+        """캐시 적중률과 처리량 요약"""
+        s = dict(self.stats)
+        hits = s['lru_hits'] + s['disk_hits']
+        s['hit_rate'] = hits / s['texts'] if s['texts'] else 0.0
+        s['chars_per_sec'] = s['chars'] / s['seconds'] if s['seconds'] else 0.0
+        return s
+
+
+_service = None
+
+
+def get_service():
+    """프로세스 공용 번역 서비스"""
+    global _service
+    if _service is None:
+        backend = StubBackend() if os.environ.get('STOCK_DASHBOARD_TRANSLATOR') == 'stub' else None
+        _service = TranslationService(backend=backend, store=KVStore('translation'))
+    return _service
+
+
+def set_service(service):
+    """번역 서비스 교체 (테스트/오프라인 실행용)"""
+    global _service
+    _service = service
+
+
+def translate_titles(texts):
+    service = get_service()
+    out = service.translate_many(texts)
+    s = service.summary()
+    print(f"[translate] {len(texts)} titles, hit_rate={s['hit_rate']:.0%}, "
+          f"requests={s['requests']}, {s['chars_per_sec']:.0f} chars/s")
+    return out
@@ -0,0 +1,56 @@
+"""무거운 모듈 백그라운드 예열
+
+첫 화면(사이드바 + 안내 문구)은 streamlit만으로 그리고, pandas / yfinance / plotly /
+google.ai.generativelanguage 같은 무거운 모듈은 사용자가 분석을 누르기 전에 백그라운드 스레드에서
+미리 불러 둔다. 예열이 끝나기 전에 분석을 누르면 그 스레드가 import를 마칠 때까지만 기다린다
+(모듈 import 잠금은 파이썬이 처리).
+"""
+import importlib
+import sys
+import threading
+import time
+
+from dashboard.telemetry import record
+
+# 먼저 쓰이는 순서대로 (주가/차트 -> 뉴스/이미지 -> AI)
+HEAVY_MODULES = (
+    'dashboard.data',
+    'dashboard.charts',
+    'dashboard.images',
+    'dashboard.ai_report',
+    'dashboard.report_cache',
+    'deep_translator',
+    'google.ai.generativelanguage',
+    'groq',
+)
+
+_lock = threading.Lock()
+_thread = None
+
+
+def _import_all(modules):
+    for name in modules:
+        if name in sys.modules:
+            continue
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            record(f"import.{name}", time.perf_counter() - start)
+        except Exception as e:
+            # 선택 의존성이 없어도 앱은 돌아가야 함 (실제 사용 시점에 다시 오류가 남)
+            record(f"import.{name}", time.perf_counter() - start, e)
+            print(f"[warmup] import {name} failed: {e}")
+
+
+def warm_up(modules=HEAVY_MODULES):
+    """프로세스당 한 번 백그라운드 import 시작 -> Thread"""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_import_all, args=(modules,), name='warmup', daemon=True)
+            _thread.start()
+    return _thread
+
+
+def is_loaded(name):
+    return name in sys.modules
@@ -0,0 +1,143 @@
+"""워치리스트 모드 - 여러 종목 요약 테이블
+
+주가는 yf.download 배치 한 번으로 받고(price_store.load_prices_many),
+info / 뉴스 조회는 fan_out 동시성 제한 안에서 실행한다.
+"""
+import math
+import re
+
+import pandas as pd
+
+from dashboard.dedup import TitleDeduper
+from dashboard.fanout import fan_out, format_report
+from dashboard.indicators import get_indicators, price_summary
+from dashboard.info import fetch_info
+from dashboard.news import get_hybrid_news
+from dashboard.price_store import load_prices_many
+
+MAX_TICKERS = 200
+INFO_CONCURRENCY = 8
+NEWS_CONCURRENCY = 4
+INFO_DEADLINE = 15.0            # 종목 하나의 조회가 시작된 뒤 기다리는 최대 시간
+NEWS_DEADLINE = 30.0
+
+
+class TooManyTickers(ValueError):
+    """티커가 MAX_TICKERS를 넘음. tickers에 앞쪽 MAX_TICKERS개를 담아 호출한 쪽이 쓸지 정함"""
+
+    def __init__(self, tickers, total):
+        super().__init__(f"티커가 {total}개입니다. 최대 {MAX_TICKERS}개까지 처리합니다.")
+        self.tickers = tickers
+        self.total = total
+
+
+def parse_tickers(text):
+    """쉼표/공백/줄바꿈으로 구분된 티커 문자열 -> 중복 없는 대문자 리스트
+
+    MAX_TICKERS를 넘으면 말없이 자르지 않고 TooManyTickers를 던진다.
+    """
+    tickers = list(dict.fromkeys(t for t in re.split(r'[\s,;]+', (text or '').upper()) if t))
+    if len(tickers) > MAX_TICKERS:
+        raise TooManyTickers(tickers[:MAX_TICKERS], len(tickers))
+    return tickers
+
+
+def ma_state(close, ma20, ma60):
+    if pd.isna(ma20) or pd.isna(ma60):
+        return '데이터 부족'
+    if close > ma20 > ma60:
+        return '정배열'
+    if close < ma20 < ma60:
+        return '역배열'
+    return '혼조'
+
+
+def summarize_prices(ticker, df):
+    """일봉 DataFrame -> 요약 한 줄(dict)"""
+    row = {'종목': ticker}
+    if df is None or df.empty:
+        return row
+    summary = price_summary(df['High'], df['Low'], df['Close'])
+    indicators = get_indicators(ticker, df)
+    last_close = summary['last_close']
+    high_52w, low_52w = summary['high_max'], summary['low_min']
+    ma20, ma60 = indicators['sma_20'][-1], indicators['sma_60'][-1]
+    row.update({
+        '종가': round(last_close, 2),
+        '1년 수익률(%)': round(summary['return_pct'], 2),
+        '52주 최고': round(high_52w, 2),
+        '52주 최저': round(low_52w, 2),
+        '고점대비(%)': round((last_close - high_52w) / high_52w * 100, 2),
+        'MA20': None if pd.isna(ma20) else round(float(ma20), 2),
+        'MA60': None if pd.isna(ma60) else round(float(ma60), 2),
+        'RSI(14)': None if pd.isna(indicators['rsi_14'][-1]) else round(float(indicators['rsi_14'][-1]), 1),
+        '이평 상태': ma_state(last_close, ma20, ma60),
+    })
+    return row
+
+
+def _budget(deadline, count, concurrency):
+    """전체 예산 = 동시성 한도로 나눈 회차 수 x 종목당 deadline (모든 종목이 한 번씩은 실행되도록)"""
+    return deadline * max(1, math.ceil(count / concurrency))
+
+
+def _failures(report):
+    return {r['source']: r['error'] for r in report if not r['ok']}
+
+
+def fetch_infos(tickers):
+    """티커별 info (이름, 시가총액, PER) 동시 조회 -> (결과, {티커: 오류})"""
+    def fetch(ticker):
+        info = fetch_info(ticker)
+        return {
+            '이름': info.get('longName', info.get('shortName', ticker)),
+            '시가총액': info.get('marketCap'),
+            'PER': info.get('trailingPE'),
+        }
+
+    results, report = fan_out(
+        [(t, lambda t=t: fetch(t), INFO_DEADLINE) for t in tickers],
+        total_timeout=_budget(INFO_DEADLINE, len(tickers), INFO_CONCURRENCY),
+        max_workers=INFO_CONCURRENCY, span='watchlist.info'
+    )
+    print(f"[watchlist:info] {format_report(report)}")
+    return results, _failures(report)
+
+
+def fetch_news_many(tickers):
+    """티커별 뉴스 동시 수집 - 워치리스트 전체에서 중복 제거 공유 -> (결과, {티커: 오류})"""
+    deduper = TitleDeduper()
+    results, report = fan_out(
+        [(t, lambda t=t: get_hybrid_news(t, deduper), NEWS_DEADLINE) for t in tickers],
+        total_timeout=_budget(NEWS_DEADLINE, len(tickers), NEWS_CONCURRENCY),
+        max_workers=NEWS_CONCURRENCY, span='watchlist.news'
+    )
+    print(f"[watchlist:news] {format_report(report)}")
+    return results, _failures(report)
+
+
+def build_watchlist_summary(tickers, with_info=True, with_news=False):
+    """워치리스트 요약 DataFrame과 티커별 뉴스 dict 반환"""
+    prices = load_prices_many(tickers)
+    infos, info_errors = fetch_infos(tickers) if with_info else ({}, {})
+    news, news_errors = fetch_news_many(tickers) if with_news else ({}, {})
+
+    rows = []
+    for ticker in tickers:
+        df, error_msg = prices.get(ticker, (None, None))
+        row = summarize_prices(ticker, df)
+        row.update(infos.get(ticker, {}))
+        if with_news:
+            items = news.get(ticker, [])
+            row['뉴스 수'] = len(items)
+            row['최신 뉴스'] = items[0]['title'] if items else ''
+        # 시간 초과/실패한 단계도 표에 남김 (빈 칸만 보이면 원인을 알 수 없음)
+        errors = [error_msg] if error_msg else []
+        if ticker in info_errors:
+            errors.append(f"info: {info_errors[ticker]}")
+        if ticker in news_errors:
+            errors.append(f"뉴스: {news_errors[ticker]}")
+        if errors:
+            row['오류'] = " / ".join(errors)
+        rows.append(row)
+    return pd.DataFrame(rows), news